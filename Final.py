@@ -5,15 +5,18 @@
 target_force   = 150.0   # N — Y väärtus; kui force_n > target_force -> alustab loendurit
 TIMER_SECONDS  = 10      # s — loenduri pikkus
 
-import argparse, struct, time, sys
-from smbus2 import SMBus
+import argparse, time, sys
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkfont
-
-REG_CMD   = 0x22
-REG_PRESS = 0x30
-REG_STAT  = 0x32
+from pte7300_driver import PTE7300Driver
+from force_lut import ForceConverter
+from calibration import load_calibration, sensor_key
+from tk_render import Renderer
+from tk_layout import FontScaler
+from pte_daemon import DaemonClient
+from pte_profile import profiler, bind_key
+from deadline import Deadline
 
 # -------------------- EDIT HERE: conversion logic --------------------
 # Full-scale mapping for pressure (bar). counts in [-16000 .. +16000]
@@ -31,32 +34,36 @@ def bar_to_newtons(pressure_bar: float) -> float:
     return pressure_bar * N_PER_BAR + ZERO_FORCE_OFFSET_N
 # --------------------------------------------------------------------
 
-def read_s16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)  # smbus returns LE word
-    val_be = struct.unpack('<H', struct.pack('<H', raw))[0]
-    return struct.unpack('<h', struct.pack('<H', val_be))[0]
-
-def read_u16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)
-    return struct.unpack('<H', struct.pack('<H', raw))[0]
-
-def write_u16_be(bus: SMBus, addr: int, reg: int, value: int) -> None:
-    msb, lsb = (value >> 8) & 0xFF, value & 0xFF
-    bus.write_i2c_block_data(addr, reg, [msb, lsb])
-
 class PTE7300Gui:
-    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float):
+    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float,
+                 burst: bool = False, render_stats: bool = False, daemon_path: str = None,
+                 calibration_path: str = None):
         self.busnum   = busnum
         self.addr     = addr
         self.interval = max(50, interval_ms)  # ms
+        self.deadline = Deadline(self.interval / 1000.0)
         self.fs_min   = fs_min
         self.fs_max   = fs_max
-        self.bus      = SMBus(self.busnum)
-
-        # Device init
-        self._reset()
-        time.sleep(0.005)
-        self._start()
+        # As a pte_daemon client the bus stays closed; each update asks the daemon for its latest sample
+        self.client   = DaemonClient(daemon_path) if daemon_path else None
+        self.dev      = None
+        if self.client is None:
+            # addr=None probes 0x6D/0x6C (cached); CRC/NACK retries, backoff and sensor recovery included
+            self.dev = PTE7300Driver.open(self.busnum, addr, burst=burst or None)
+            self.addr = self.dev.addr
+            # Device init: reset, start, learn the conversion time (data-ready polling, no fixed sleep)
+            self.dev.init()
+
+        # Multi-point calibration (--calibration): counts -> bar -> N compiled into lookup tables;
+        # without it the linear counts_to_bar() / bar_to_newtons() above are used
+        self.force_lut = None
+        if calibration_path:
+            if self.client is not None:
+                info = self.client.info()        # the daemon's sensor picks the calibration entry
+                self.busnum, self.addr = info["bus"], info["addr"]
+            key = sensor_key(self.busnum, self.addr)
+            self.force_lut = ForceConverter(fs_min, fs_max, N_PER_BAR, ZERO_FORCE_OFFSET_N, offset_by_fs_min=False,
+                                            table=load_calibration(calibration_path, key))
 
         # ---- GUI (täisekraan + skaleeruv tekst) ----
         self.root = tk.Tk()
@@ -116,28 +123,40 @@ class PTE7300Gui:
         self.lbl_bar.grid(   row=2, column=0, sticky="w")
         self.lbl_thr.grid(   row=3, column=0, sticky="w")
 
-        # Resize hook for dynamic font scaling
-        self.root.bind("<Configure>", self._on_resize)
-        self.root.after(50, self._on_resize)
+        # All label text/colour changes go through the renderer: only changed values are
+        # configured, batched into one idle callback per tick
+        self.render = Renderer(self.root)
+        self.prof = profiler()   # PTE7300_PROFILE=1, F9 prints the breakdown
+        bind_key(self.root)
+        self.render.hidden(self.lbl_timer)
+        self.render_stats = render_stats
+
+        # Dynamic font scaling: only on real root size changes, once per idle
+        # Force number prominent, timer smaller, info compact
+        self.layout = FontScaler(self.root, [(self.font_force, 0.12, 24),
+                                             (self.font_timer, 0.08, 18),
+                                             (self.font_info, 0.035, 12)])
+        self.layout.attach()
 
         # Start periodic updates
         self._schedule_next()
 
     # -------- Device control --------
     def _schedule_next(self):
-        self.root.after(self.interval, self.update_once)
+        # next slot on the monotonic grid, not `interval` after this update finished
+        self.root.after(self.deadline.delay_ms(), self.update_once)
 
     def _reset(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0xB169)
+        self.dev.reset()
 
     def _start(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x8B93)
+        self.dev.start()
 
     def _idle(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x7BBA)
+        self.dev.idle()
 
     def _sleep(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x6C32)
+        self.dev.sleep()
 
     def _reset_then_start(self):
         self._reset()
@@ -146,30 +165,12 @@ class PTE7300Gui:
 
     # -------- UI helpers --------
     def _set_bg(self, color: str):
-        self.root.configure(bg=color)
-        self.wrapper.configure(bg=color)
-        self.lbl_force.configure(bg=color)
-        self.lbl_timer.configure(bg=color)
-        self.lbl_status.configure(bg=color)
-        self.lbl_raw.configure(bg=color)
-        self.lbl_bar.configure(bg=color)
-        self.lbl_thr.configure(bg=color)
+        self.render.set_bg((self.root, self.wrapper, self.lbl_force, self.lbl_timer,
+                            self.lbl_status, self.lbl_raw, self.lbl_bar, self.lbl_thr), color)
 
     def _reset_bg(self):
         self._set_bg(self.default_bg)
 
-    def _on_resize(self, event=None):
-        w = max(self.root.winfo_width(), 1)
-        h = max(self.root.winfo_height(), 1)
-        short = min(w, h)
-        # Force number prominent, timer smaller, info compact
-        size_force = max(24, int(short * 0.12))
-        size_timer = max(18, int(short * 0.08))
-        size_info  = max(12, int(short * 0.035))
-        self.font_force.configure(size=size_force)
-        self.font_timer.configure(size=size_timer)
-        self.font_info.configure(size=size_info)
-
     def _toggle_fullscreen(self, event=None):
         self.fullscreen = not self.fullscreen
         self.root.attributes("-fullscreen", self.fullscreen)
@@ -182,12 +183,12 @@ class PTE7300Gui:
     def _start_countdown(self, seconds: int):
         self._reset_bg()  # just in case previous cycle was green
         self.countdown_remaining = int(seconds)
-        self.lbl_timer.config(text=f"{self.countdown_remaining} s")
-        self.lbl_timer.grid()  # show timer
+        self.render.set(self.lbl_timer, text=f"{self.countdown_remaining} s")
+        self.render.show(self.lbl_timer)  # show timer
         self._tick()
 
     def _tick(self):
-        self.lbl_timer.config(text=f"{self.countdown_remaining} s")
+        self.render.set(self.lbl_timer, text=f"{self.countdown_remaining} s")
         if self.countdown_remaining <= 0:
             self.countdown_job = None
             self._set_bg("green")
@@ -200,43 +201,67 @@ class PTE7300Gui:
             self.root.after_cancel(self.countdown_job)
             self.countdown_job = None
         self.countdown_remaining = 0
-        self.lbl_timer.grid_remove()
+        self.render.show(self.lbl_timer, False)
         self._reset_bg()
 
     # -------- Data update --------
+    def _read_sample(self):
+        # on-demand measurement: start, data-ready, read (spans recorded by the driver)
+        return self.dev.sample()
+
     def update_once(self):
+        self.deadline.tick()
         try:
-            # on-demand measurement
-            self._start()
-            time.sleep(0.003)
-
-            status = read_u16_be(self.bus, self.addr, REG_STAT)
-            raw    = read_s16_be(self.bus, self.addr, REG_PRESS)
-            p_bar  = counts_to_bar(raw, self.fs_min, self.fs_max)
-            force_n = bar_to_newtons(p_bar)  # <-- X
+            if self.client is not None:
+                sample = self.client.latest()
+                if sample is None:
+                    raise IOError("daemon has no sample yet")
+                status, raw = sample.status, sample.raw
+            else:
+                status, raw = self._read_sample()
+            prof = self.prof
+            with prof.span("convert"):
+                if self.force_lut is not None:
+                    p_bar, force_n = self.force_lut.convert(raw)
+                else:
+                    p_bar  = counts_to_bar(raw, self.fs_min, self.fs_max)
+                    force_n = bar_to_newtons(p_bar)  # <-- X
 
             # Update GUI
             # Force value big (no "X="), show 0.1 N resolution
-            self.lbl_force.config(text=f"{force_n:.1f} N")
-            self.lbl_status.config(text=f"STATUS: 0x{status:04X}")
-            self.lbl_raw.config(text=f"RAW: {raw:+d}")
-            self.lbl_bar.config(text=f"PRESSURE: {p_bar:.3f} bar")
+            with prof.span("tk_labels"):
+                self.render.set(self.lbl_force, text=f"{force_n:.1f} N")
+                self.render.set(self.lbl_status, text=f"STATUS: 0x{status:04X}")
+                self.render.set(self.lbl_raw, text=f"RAW: {raw:+d}")
+                self.render.set(self.lbl_bar, text=f"PRESSURE: {p_bar:.3f} bar")
 
             # Threshold logic
-            if force_n > target_force:
-                if self.countdown_job is None and self.countdown_remaining == 0:
-                    self._start_countdown(TIMER_SECONDS)
-            else:
-                self._stop_countdown()
+            with prof.span("logic"):
+                if force_n > target_force:
+                    if self.countdown_job is None and self.countdown_remaining == 0:
+                        self._start_countdown(TIMER_SECONDS)
+                else:
+                    self._stop_countdown()
 
         except Exception as e:
-            self.lbl_status.config(text=f"ERROR: {e}")
+            self.render.set(self.lbl_status, text=f"ERROR: {e}")
         finally:
             self._schedule_next()
 
     def on_close(self):
+        self.render.cancel()
+        self.layout.cancel()
+        if self.render_stats:
+            self.render.print_summary()
+            self.layout.print_summary()
+            print(self.deadline.summary("update"), file=sys.stderr)
+            if self.dev is not None:
+                print(self.dev.bus.summary(), file=sys.stderr)
         try:
-            self.bus.close()
+            if self.dev is not None:
+                self.dev.close()
+            if self.client is not None:
+                self.client.close()
         except:
             pass
         self.root.destroy()
@@ -248,11 +273,20 @@ class PTE7300Gui:
 def parse_args():
     ap = argparse.ArgumentParser(description="PTE7300 GUI reader → Newtons (fullscreen)")
     ap.add_argument("--bus", type=int, default=0, help="I2C bus number (e.g. 0 or 1). Default 0.")
-    ap.add_argument("--addr", type=lambda x: int(x,0), default=0x6c,
-                    help="7-bit I2C address (default 0x6c for no-CRC; CRC addr is 0x6d).")
+    ap.add_argument("--addr", type=lambda x: int(x,0), default=None,
+                    help="7-bit I2C address (default: probe 0x6d (CRC), then 0x6c (no CRC); result is cached).")
     ap.add_argument("--interval", type=int, default=500, help="Update interval in ms (default 500).")
     ap.add_argument("--fs", type=str, default="0:40",
                     help="Full-scale range in bar as min:max (e.g. 0:200). Default 0:40.")
+    ap.add_argument("--burst", action="store_true",
+                    help="Read PRESS+STAT in one block transfer (CRC-checked on 0x6d).")
+    ap.add_argument("--daemon", type=str, default=None, metavar="SOCKET",
+                    help="Read the latest sample from a running pte_daemon.py instead of the I2C bus.")
+    ap.add_argument("--render-stats", action="store_true",
+                    help="Print redraw and font-scaling counters when the window closes.")
+    ap.add_argument("--calibration", type=str, default=None, metavar="PATH",
+                    help="Multi-point counts->bar / bar->N calibration (JSON, see calibration.py); "
+                         "entry for this sensor (i2c-BUS@0xADDR) or \"default\".")
     args = ap.parse_args()
 
     try:
@@ -261,9 +295,16 @@ def parse_args():
         print("Bad --fs format, expected like 0:40", file=sys.stderr)
         sys.exit(2)
 
-    return args.bus, args.addr, args.interval, fs_min, fs_max
+    return (args.bus, args.addr, args.interval, fs_min, fs_max, args.burst, args.render_stats, args.daemon,
+            args.calibration)
 
 if __name__ == "__main__":
-    bus, addr, interval, fs_min, fs_max = parse_args()
-    app = PTE7300Gui(bus, addr, interval, fs_min, fs_max)
+    bus, addr, interval, fs_min, fs_max, burst, render_stats, daemon, calibration = parse_args()
+    try:
+        app = PTE7300Gui(bus, addr, interval, fs_min, fs_max, burst=burst, render_stats=render_stats,
+                         daemon_path=daemon, calibration_path=calibration)
+    except (OSError, KeyError, ValueError) as e:
+        # no sensor / daemon, or a bad --calibration file
+        print(f"Final: {e}", file=sys.stderr)
+        sys.exit(1)
     app.run()
@@ -9,6 +9,7 @@ TIMER_SECONDS = 10  # sekundeid loenduri pikkus
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkfont
+from tk_layout import FontScaler
 
 class App(tk.Tk):
     def __init__(self):
@@ -85,11 +86,23 @@ class App(tk.Tk):
         self.bind("<F11>", self.toggle_fullscreen)
         self.bind("<Escape>", self.exit_fullscreen)
 
-        # Fondi skaleerimine akna muutumisel
-        self.bind("<Configure>", self._on_resize)
+        # Seo fondid vidinate külge üks kord; fondi suuruse muutus jõuab vidinateni ise
+        self.entry.configure(font=self.font_entry)
+        self.lbl_prompt.configure(font=self.font_label)
+        # Ttk nuppude stiil tkfondiga (üks Style, mitte igal skaleerimisel uus)
+        self.style = ttk.Style()
+        self.style.configure("Scaled.TButton", font=self.font_btn)
+        self.btn_minus.configure(style="Scaled.TButton")
+        self.btn_plus.configure(style="Scaled.TButton")
+
+        # Fondi skaleerimine ainult akna tegeliku suuruse muutusel (debounce, vahemälu suuruse kohta)
+        self.layout = FontScaler(self, [(self.font_x,     0.12,  24),   # peamine suur number
+                                        (self.font_timer, 0.08,  18),   # taimer
+                                        (self.font_entry, 0.04,  14),   # sisend
+                                        (self.font_label, 0.035, 12),   # "Sisesta..." silt
+                                        (self.font_btn,   0.04,  14)])  # nupud
+        self.layout.attach()  # esmane skaleerimine 50 ms pärast, kui aknal on suurus
 
-        # Rakendame algse skaleerimise ja seisu
-        self.after(50, self._on_resize)  # lase aknal esmane suurus võtta
         self.update_state()
 
     # --- Abi ---
@@ -164,38 +177,5 @@ class App(tk.Tk):
         self.fullscreen = False
         self.attributes("-fullscreen", False)
 
-    # --- Dünaamiline fondi skaleerimine ---
-    def _on_resize(self, event=None):
-        # Kasuta akna sisemõõte; vali konservatiivne baas suurus
-        w = max(self.winfo_width(),  1)
-        h = max(self.winfo_height(), 1)
-        short = min(w, h)
-
-        # Skaalafaktorid (tunned vabalt timmida)
-        size_x     = max(24, int(short * 0.12))  # peamine suur number
-        size_timer = max(18, int(short * 0.08))  # taimer
-        size_entry = max(14, int(short * 0.04))  # sisend
-        size_label = max(12, int(short * 0.035)) # "Sisesta..." silt
-        size_btn   = max(14, int(short * 0.04))  # nupud
-
-        # Rakenda
-        self.font_x.configure(size=size_x)
-        self.font_timer.configure(size=size_timer)
-        self.font_entry.configure(size=size_entry)
-        self.font_label.configure(size=size_label)
-        self.font_btn.configure(size=size_btn)
-
-        # Seo fondid vidinate külge (kui OS/teema ei rakenda automaatselt)
-        self.label_x.configure(font=self.font_x)
-        self.label_timer.configure(font=self.font_timer)
-        self.entry.configure(font=self.font_entry)
-        self.lbl_prompt.configure(font=self.font_label)
-        self.btn_minus.configure(style="Scaled.TButton")
-        self.btn_plus.configure(style="Scaled.TButton")
-
-        # Ttk nuppude jaoks loome stiili, mis kasutab tkfonti
-        style = ttk.Style()
-        style.configure("Scaled.TButton", font=self.font_btn)
-
 if __name__ == "__main__":
     App().mainloop()
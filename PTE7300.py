@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
 # PTE7300 quick GUI reader with CRC (I2C 0x6D)
-import argparse, struct, time, sys
-from smbus2 import SMBus, i2c_msg
+import argparse, time, sys
 import tkinter as tk
-
-REG_CMD   = 0x22
-REG_PRESS = 0x30
-REG_STAT  = 0x32
+from pte7300_driver import PTE7300Driver
+from force_filters import parse_chain
+from pte_profile import profiler, bind_key
+from deadline import Deadline
 
 # ===========================================================
 # === CONFIGURABLE SECTION: CONVERSION PARAMETERS & LOGIC ===
@@ -31,76 +30,29 @@ def bar_to_newtons(pressure_bar: float) -> float:
 # ===========================================================
 # === END CONFIGURABLE SECTION ==============================
 # ===========================================================
-# CRC-8 with polynomial 0x31, initial 0xFF (per PTE7300 datasheet)
-def crc8(data: bytes) -> int:
-    crc = 0xFF
-    for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x80:
-                crc = ((crc << 1) ^ 0x31) & 0xFF
-            else:
-                crc = (crc << 1) & 0xFF
-    return crc
-
-# ----------------------------------------------------------
-
-def read_s16_be_crc(bus: SMBus, addr: int, reg: int) -> int:
-    # Write register address with CRC
-    reg_bytes = bytes([reg])
-    crc_reg = crc8(reg_bytes)
-    write = i2c_msg.write(addr, [reg, crc_reg])
-    bus.i2c_rdwr(write)
-
-    # Read 2 data bytes + CRC
-    read = i2c_msg.read(addr, 3)
-    bus.i2c_rdwr(read)
-    b = bytes(read)
-    val = (b[0] << 8) | b[1]
-    crc_recv = b[2]
-    crc_calc = crc8(b[:2])
-    if crc_recv != crc_calc:
-        raise IOError(f"CRC mismatch: got {crc_recv:02X}, expected {crc_calc:02X}")
-    return struct.unpack('>h', b[:2])[0]
-
-def read_u16_be_crc(bus: SMBus, addr: int, reg: int) -> int:
-    # Write register address with CRC
-    reg_bytes = bytes([reg])
-    crc_reg = crc8(reg_bytes)
-    write = i2c_msg.write(addr, [reg, crc_reg])
-    bus.i2c_rdwr(write)
-
-    # Read 2 data bytes + CRC
-    read = i2c_msg.read(addr, 3)
-    bus.i2c_rdwr(read)
-    b = bytes(read)
-    val = (b[0] << 8) | b[1]
-    crc_recv = b[2]
-    crc_calc = crc8(b[:2])
-    if crc_recv != crc_calc:
-        raise IOError(f"CRC mismatch: got {crc_recv:02X}, expected {crc_calc:02X}")
-    return val
-
-def write_u16_be_crc(bus: SMBus, addr: int, reg: int, value: int) -> None:
-    msb, lsb = (value >> 8) & 0xFF, value & 0xFF
-    data_bytes = bytes([reg, msb, lsb])
-    crc_cmd = crc8(data_bytes)
-    write = i2c_msg.write(addr, [reg, msb, lsb, crc_cmd])
-    bus.i2c_rdwr(write)
+# Register access (CRC-8 poly 0x31 / init 0xFF, reply byte order, retries) is in
+# pte7300_driver.py; the address, CRC mode and byte order are probed and cached.
 
 class PTE7300Gui:
-    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float, sample_count: int = 10):
+    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float, sample_count: int = 10,
+                 continuous: bool = False, filter_spec: str = None):
         self.busnum = busnum
-        self.addr = addr
         self.interval = max(50, interval_ms)
+        self.deadline = Deadline(self.interval / 1000.0)
         self.fs_min = fs_min
         self.fs_max = fs_max
-        self.bus = SMBus(self.busnum)
+        # addr=None: probe 0x6D/0x6C (cached); CRC/NACK retries and sensor recovery included
+        self.dev = PTE7300Driver.open(busnum, addr)
+        self.addr = self.dev.addr
         self.sample_count = sample_count  # <-- Number of readings to average
+        # optional streaming filter on raw counts (e.g. "median:5,ema:0.5"); replaces the block mean
+        self.filter = parse_chain(filter_spec) if filter_spec else None
 
-        self._reset()
-        time.sleep(0.005)
-        self._start()
+        # reset, START, learn the conversion time (samples poll STAT instead of a fixed sleep);
+        # continuous: START once, then every sample is only a read
+        self.dev.init(continuous=continuous)
+        self.cont = self.dev.cont
+        self.conv = self.dev.conv
 
         self.root = tk.Tk()
         self.root.title("PTE7300 (CRC) → Newtons")
@@ -133,22 +85,27 @@ class PTE7300Gui:
         self.btn_sleep.grid(row=0, column=2, **pad)
         self.btn_reset.grid(row=0, column=3, **pad)
 
+        # PTE7300_PROFILE=1: per-stage timings, F9 prints the breakdown
+        self.prof = profiler()
+        bind_key(self.root)
+
         self._schedule_next()
 
     def _schedule_next(self):
-        self.root.after(self.interval, self.update_once)
+        # next slot on the monotonic grid, not `interval` after this update finished
+        self.root.after(self.deadline.delay_ms(), self.update_once)
 
     def _reset(self):
-        write_u16_be_crc(self.bus, self.addr, REG_CMD, 0xB169)
+        self.dev.reset()
 
     def _start(self):
-        write_u16_be_crc(self.bus, self.addr, REG_CMD, 0x8B93)
+        self.dev.start()
 
     def _idle(self):
-        write_u16_be_crc(self.bus, self.addr, REG_CMD, 0x7BBA)
+        self.dev.idle()
 
     def _sleep(self):
-        write_u16_be_crc(self.bus, self.addr, REG_CMD, 0x6C32)
+        self.dev.sleep()
 
     def _reset_then_start(self):
         self._reset()
@@ -157,27 +114,51 @@ class PTE7300Gui:
 
     def update_once(self):
         """Take several samples, average, then update GUI."""
+        self.deadline.tick()
+        prof = self.prof
         try:
             raw_samples = []
             bar_samples = []
-            for _ in range(self.sample_count):
-                self._start()
-                time.sleep(0.003)  # tiny wait
-                # Only sample pressure; status can be from last reading
-                raw = read_s16_be_crc(self.bus, self.addr, REG_PRESS)
-                raw_samples.append(raw)
-                bar_samples.append(counts_to_bar(raw, self.fs_min, self.fs_max))
-                time.sleep(0.001)  # brief pause between samples
-
-            avg_raw = sum(raw_samples) / len(raw_samples)
-            avg_bar = sum(bar_samples) / len(bar_samples)
-            force_n = bar_to_newtons(avg_bar)
-            status = read_u16_be_crc(self.bus, self.addr, REG_STAT)
-
-            self.lbl_status.config(text=f"STATUS: 0x{status:04X}")
-            self.lbl_raw.config(text=f"RAW: {avg_raw:+.1f}")
-            self.lbl_bar.config(text=f"PRESSURE: {avg_bar:.3f} bar")
-            self.lbl_n.config(text=f"FORCE: {force_n:.1f} N")
+            status = None
+            last_error = None
+            for i in range(self.sample_count):
+                try:
+                    if self.cont is not None and i:
+                        # continuous conversion: no START, just read at the sensor's rate
+                        with prof.span("conv_wait"):
+                            time.sleep(self.conv.period())
+                    status, raw = self.dev.sample()
+                except IOError as e:
+                    # retries exhausted: drop this reading, average the rest
+                    last_error = e
+                    continue
+                with prof.span("convert"):
+                    raw_samples.append(raw)
+                    bar_samples.append(counts_to_bar(raw, self.fs_min, self.fs_max))
+                    if self.filter is not None:
+                        self.filter.push(raw, time.monotonic())
+
+            if not raw_samples:
+                raise last_error
+            with prof.span("convert"):
+                if self.filter is not None and self.filter.value is not None:
+                    avg_raw = self.filter.value
+                    avg_bar = counts_to_bar(avg_raw, self.fs_min, self.fs_max)
+                else:
+                    # no filter, or it is still warming up: block mean
+                    avg_raw = sum(raw_samples) / len(raw_samples)
+                    avg_bar = sum(bar_samples) / len(bar_samples)
+                force_n = bar_to_newtons(avg_bar)
+
+            with prof.span("tk_labels"):
+                self.lbl_status.config(text=f"STATUS: 0x{status:04X}")
+                self.lbl_raw.config(text=f"RAW: {avg_raw:+.1f}")
+                self.lbl_bar.config(text=f"PRESSURE: {avg_bar:.3f} bar")
+                self.lbl_n.config(text=f"FORCE: {force_n:.1f} N")
+            if prof.enabled:
+                # redraw now instead of at idle, only to time it
+                with prof.span("tk_redraw"):
+                    self.root.update_idletasks()
         except Exception as e:
             self.lbl_status.config(text=f"ERROR: {e}")
         finally:
@@ -185,7 +166,7 @@ class PTE7300Gui:
 
     def on_close(self):
         try:
-            self.bus.close()
+            self.dev.close()
         except:
             pass
         self.root.destroy()
@@ -196,13 +177,18 @@ class PTE7300Gui:
 def parse_args():
     ap = argparse.ArgumentParser(description="PTE7300 GUI reader (CRC) → Newtons")
     ap.add_argument("--bus", type=int, default=0, help="I2C bus number (default 0).")
-    ap.add_argument("--addr", type=lambda x: int(x,0), default=0x6d,
-                    help="7-bit I2C address (default 0x6d for CRC).")
+    ap.add_argument("--addr", type=lambda x: int(x,0), default=None,
+                    help="7-bit I2C address (default: probe 0x6d (CRC), then 0x6c; result is cached).")
     ap.add_argument("--interval", type=int, default=500, help="Update interval in ms (default 500).")
     ap.add_argument("--fs", type=str, default="0:200",
                     help="Full-scale range in bar as min:max (default 0:200).")
     ap.add_argument("--samples", type=int, default=10,
                     help="Number of samples per update (default 10).")
+    ap.add_argument("--continuous", action="store_true",
+                    help="Start the sensor once and only read PRESS (no START per sample).")
+    ap.add_argument("--filter", type=str, default=None,
+                    help='Streaming filter instead of the block mean, e.g. "median:5,ema:0.5" '
+                         '(stages: ema:<tau_s>, ema_a:<alpha>, median:<n>, boxcar:<n>).')
     args = ap.parse_args()
 
     try:
@@ -211,9 +197,10 @@ def parse_args():
         print("Bad --fs format, expected like 0:200", file=sys.stderr)
         sys.exit(2)
 
-    return args.bus, args.addr, args.interval, fs_min, fs_max, args.samples
+    return args.bus, args.addr, args.interval, fs_min, fs_max, args.samples, args.continuous, args.filter
 
 if __name__ == "__main__":
-    bus, addr, interval, fs_min, fs_max, samples = parse_args()
-    app = PTE7300Gui(bus, addr, interval, fs_min, fs_max, sample_count=samples)
+    bus, addr, interval, fs_min, fs_max, samples, continuous, filter_spec = parse_args()
+    app = PTE7300Gui(bus, addr, interval, fs_min, fs_max, sample_count=samples, continuous=continuous,
+                     filter_spec=filter_spec)
     app.run()
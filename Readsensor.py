@@ -7,13 +7,10 @@
 # >>> EDIT HERE section <<<  for easy conversion tweaking:
 #   counts_to_bar() and bar_to_newtons() can be adjusted for your calibration.
 
-import argparse, struct, time, sys
-from smbus2 import SMBus
+import argparse, time, sys
 import tkinter as tk
-
-REG_CMD   = 0x22
-REG_PRESS = 0x30
-REG_STAT  = 0x32
+from pte7300_driver import PTE7300Driver
+from deadline import Deadline
 
 # -------------------- EDIT HERE: conversion logic --------------------
 # Full-scale mapping for pressure (bar). counts in [-16000 .. +16000]
@@ -31,32 +28,20 @@ def bar_to_newtons(pressure_bar: float) -> float:
     return pressure_bar * N_PER_BAR + ZERO_FORCE_OFFSET_N
 # --------------------------------------------------------------------
 
-def read_s16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)  # smbus returns LE word
-    val_be = struct.unpack('<H', struct.pack('<H', raw))[0]
-    return struct.unpack('<h', struct.pack('<H', val_be))[0]
-
-def read_u16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)
-    return struct.unpack('<H', struct.pack('<H', raw))[0]
-
-def write_u16_be(bus: SMBus, addr: int, reg: int, value: int) -> None:
-    msb, lsb = (value >> 8) & 0xFF, value & 0xFF
-    bus.write_i2c_block_data(addr, reg, [msb, lsb])
-
 class PTE7300Gui:
-    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float):
+    def __init__(self, busnum: int, addr: int, interval_ms: int, fs_min: float, fs_max: float,
+                 burst: bool = False):
         self.busnum = busnum
-        self.addr = addr
         self.interval = max(50, interval_ms)  # avoid too-fast refresh
+        self.deadline = Deadline(self.interval / 1000.0)
         self.fs_min = fs_min
         self.fs_max = fs_max
-        self.bus = SMBus(self.busnum)
+        # addr=None: probe 0x6D/0x6C (cached); --burst forces PRESS+STAT in one block transfer
+        self.dev = PTE7300Driver.open(busnum, addr, burst=burst or None)
+        self.addr = self.dev.addr
 
-        # Soft reset + tiny wait, then do a first start
-        self._reset()
-        time.sleep(0.005)
-        self._start()
+        # Soft reset + first start, then learn the conversion time (data-ready polling, no fixed sleep)
+        self.dev.init()
 
         # Build GUI
         self.root = tk.Tk()
@@ -94,19 +79,20 @@ class PTE7300Gui:
         self._schedule_next()
 
     def _schedule_next(self):
-        self.root.after(self.interval, self.update_once)
+        # next slot on the monotonic grid, not `interval` after this update finished
+        self.root.after(self.deadline.delay_ms(), self.update_once)
 
     def _reset(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0xB169)
+        self.dev.reset()
 
     def _start(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x8B93)
+        self.dev.start()
 
     def _idle(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x7BBA)
+        self.dev.idle()
 
     def _sleep(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x6C32)
+        self.dev.sleep()
 
     def _reset_then_start(self):
         self._reset()
@@ -114,13 +100,10 @@ class PTE7300Gui:
         self._start()
 
     def update_once(self):
+        self.deadline.tick()
         try:
-            # start a new measurement every cycle (on-demand)
-            self._start()
-            time.sleep(0.003)  # tiny wait
-
-            status = read_u16_be(self.bus, self.addr, REG_STAT)
-            raw = read_s16_be(self.bus, self.addr, REG_PRESS)
+            # start a new measurement every cycle (on-demand), wait for data-ready, read
+            status, raw = self.dev.sample()
             p_bar = counts_to_bar(raw, self.fs_min, self.fs_max)
             force_n = bar_to_newtons(p_bar)
 
@@ -135,7 +118,7 @@ class PTE7300Gui:
 
     def on_close(self):
         try:
-            self.bus.close()
+            self.dev.close()
         except:
             pass
         self.root.destroy()
@@ -146,11 +129,13 @@ class PTE7300Gui:
 def parse_args():
     ap = argparse.ArgumentParser(description="PTE7300 GUI reader → Newtons")
     ap.add_argument("--bus", type=int, default=0, help="I2C bus number (e.g. 0 or 1). Default 1.")
-    ap.add_argument("--addr", type=lambda x: int(x,0), default=0x6c,
-                    help="7-bit I2C address (default 0x6c for no-CRC; CRC addr is 0x6d).")
+    ap.add_argument("--addr", type=lambda x: int(x,0), default=None,
+                    help="7-bit I2C address (default: probe 0x6d (CRC), then 0x6c (no CRC); result is cached).")
     ap.add_argument("--interval", type=int, default=500, help="Update interval in ms (default 500).")
     ap.add_argument("--fs", type=str, default="0:40",
                     help="Full-scale range in bar as min:max (e.g. 0:200). Default 0:200.")
+    ap.add_argument("--burst", action="store_true",
+                    help="Read PRESS+STAT in one block transfer (CRC-checked on 0x6d).")
     args = ap.parse_args()
 
     try:
@@ -159,9 +144,9 @@ def parse_args():
         print("Bad --fs format, expected like 0:40", file=sys.stderr)
         sys.exit(2)
 
-    return args.bus, args.addr, args.interval, fs_min, fs_max
+    return args.bus, args.addr, args.interval, fs_min, fs_max, args.burst
 
 if __name__ == "__main__":
-    bus, addr, interval, fs_min, fs_max = parse_args()
-    app = PTE7300Gui(bus, addr, interval, fs_min, fs_max)
+    bus, addr, interval, fs_min, fs_max, burst = parse_args()
+    app = PTE7300Gui(bus, addr, interval, fs_min, fs_max, burst=burst)
     app.run()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# Background acquisition for the GUIs
+# - SampleRing         preallocated fixed-size ring of (ts, force, status, raw, p_bar)
+# - AcquisitionThread  calls a read function on a drift-free monotonic grid
+#                      (deadline.Deadline) and appends to the ring
+#
+# One writer (the acquisition thread), any number of readers. The writer fills
+# the slot first and only then bumps `seq`, so a reader never sees a half
+# written sample; readers copy without a lock and afterwards drop whatever the
+# writer may have overwritten during the copy.
+
+import threading
+import pte_metrics
+from array import array
+from deadline import Deadline
+
+class SampleRing:
+    def __init__(self, capacity: int = 1024):
+        self.capacity = int(capacity)
+        n = self.capacity
+        self.ts     = array('d', bytes(8 * n))
+        self.force  = array('d', bytes(8 * n))
+        self.status = array('H', bytes(2 * n))
+        self.raw    = array('h', bytes(2 * n))
+        self.p_bar  = array('d', bytes(8 * n))
+        self.seq = 0  # total samples ever written
+
+    def append(self, ts: float, force: float, status: int, raw: int, p_bar: float) -> None:
+        i = self.seq % self.capacity
+        self.ts[i] = ts
+        self.force[i] = force
+        self.status[i] = status
+        self.raw[i] = raw
+        self.p_bar[i] = p_bar
+        self.seq += 1  # publish
+
+    def __len__(self):
+        return min(self.seq, self.capacity)
+
+    def snapshot(self, since_ts: float = None) -> list:
+        """
+        Consistent copy of the ring as [(ts, force, status, raw, p_bar), ...], oldest first.
+        With since_ts only samples with ts >= since_ts are returned.
+        """
+        cap = self.capacity
+        end = self.seq
+        start = max(0, end - cap)
+        out = []
+        for k in range(start, end):
+            i = k % cap
+            out.append((self.ts[i], self.force[i], self.status[i], self.raw[i], self.p_bar[i]))
+        # anything the writer lapped while we were copying is not trustworthy;
+        # the slot of index seq - cap may be the one being written right now
+        lapped = self.seq - cap + 1 - start
+        if lapped > 0:
+            del out[:lapped]
+        if since_ts is not None:
+            k = 0
+            while k < len(out) and out[k][0] < since_ts:
+                k += 1
+            del out[:k]
+        return out
+
+    def read_from(self, seq: int):
+        """
+        Samples written since sequence number seq -> (next_seq, [samples...]).
+        If the writer lapped the reader, the oldest missed samples are skipped.
+        """
+        cap = self.capacity
+        end = self.seq
+        start = max(seq, end - cap)
+        out = []
+        for k in range(start, end):
+            i = k % cap
+            out.append((self.ts[i], self.force[i], self.status[i], self.raw[i], self.p_bar[i]))
+        lapped = self.seq - cap + 1 - start
+        if lapped > 0:
+            del out[:lapped]
+        return end, out
+
+    def latest(self):
+        """Most recent sample or None."""
+        end = self.seq
+        if end == 0:
+            return None
+        i = (end - 1) % self.capacity
+        return (self.ts[i], self.force[i], self.status[i], self.raw[i], self.p_bar[i])
+
+    def latest_seq(self):
+        """(seq, sample) of the most recent sample, both from one read of `seq`; None if empty."""
+        cap = self.capacity
+        for _ in range(3):
+            end = self.seq
+            if end == 0:
+                return None
+            i = (end - 1) % cap
+            sample = (self.ts[i], self.force[i], self.status[i], self.raw[i], self.p_bar[i])
+            # same lap rule as read_from: the slot may have been rewritten while we copied it
+            if self.seq - cap + 1 <= end - 1:
+                return end - 1, sample
+        return None
+
+class AcquisitionThread(threading.Thread):
+    """
+    Calls read_fn() every interval_s seconds and appends the returned
+    (ts, force, status, raw, p_bar) tuple to ring. Exceptions from read_fn
+    are counted in `errors` and the sample is skipped. on_sample(), if
+    given, runs in this thread after each append (e.g. to wake a consumer).
+    Slots are on absolute monotonic deadlines; a read that overruns whole
+    periods skips those slots (counted in deadline.missed) instead of drifting.
+    """
+    def __init__(self, read_fn, ring: SampleRing, interval_s: float, on_sample=None):
+        super().__init__(name="pte7300-acq", daemon=True)
+        self.read_fn = read_fn
+        self.ring = ring
+        self.interval = interval_s
+        self.on_sample = on_sample
+        self.errors = 0
+        self.last_error = None
+        self.deadline = Deadline(interval_s)
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        m = pte_metrics.registry
+        if m is not None:
+            m.set_target_rate(1.0 / self.interval)
+        d = self.deadline
+        d.start()
+        while not self._stop_evt.is_set():
+            late_ns, missed = d.tick()
+            m = pte_metrics.registry
+            if m is not None:
+                m.sample(late_ns)   # lateness of this tick
+                if missed:
+                    m.inc("missed_slots", missed)
+            try:
+                self.ring.append(*self.read_fn())
+                if self.on_sample is not None:
+                    self.on_sample()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                if m is not None:
+                    m.error("sample", e)
+            self._stop_evt.wait(d.remaining())
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_evt.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def rate(self, window_s: float = 1.0) -> float:
+        """Samples per second over the last window_s seconds (from ring timestamps)."""
+        snap = self.ring.snapshot()
+        if len(snap) < 2:
+            return 0.0
+        t_end = snap[-1][0]
+        recent = [s for s in snap if s[0] >= t_end - window_s]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(1e-9, recent[-1][0] - recent[0][0])
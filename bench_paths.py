@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# Throughput benchmark for every PTE7300 read path, on the simulated bus
+# Reports samples/s, per-sample latency percentiles and CPU time per sample.
+#
+# Example: python bench_paths.py -n 300 --bus-khz 400 --ber 1e-4
+
+import argparse, asyncio, time
+
+from fake_pte7300 import FakePTE7300, FakeSMBus
+from pte_conversion import ConversionWaiter, ContinuousReader
+import pte_i2c
+from pte_i2c import REG_CMD, REG_PRESS, REG_STAT, CMD_START, read_word, write_word, to_s16
+from pte7300_driver import PTE7300Driver
+
+def percentile(sorted_vals, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+def run_path(fn, n: int) -> dict:
+    lat = []
+    errors = 0
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        s = time.perf_counter_ns()
+        try:
+            fn()
+        except (IOError, OSError):
+            errors += 1
+        lat.append(time.perf_counter_ns() - s)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    lat.sort()
+    return {"rate": n / wall, "p50": percentile(lat, 50) / 1e3, "p90": percentile(lat, 90) / 1e3,
+            "p99": percentile(lat, 99) / 1e3, "cpu": cpu / n * 1e6, "errors": errors}
+
+def build_paths(args):
+    """{name: (bus, callable)} – one fresh simulated bus per path."""
+    def mkbus(addr, byteorder="big"):
+        dev = FakePTE7300(addr, byteorder=byteorder, conversion_s=args.conv_ms / 1000.0,
+                          bit_error_rate=args.ber, seed=1)
+        return FakeSMBus(0, [dev], byte_s=9.0 / (args.bus_khz * 1000.0), ioctl_s=args.ioctl_us / 1e6)
+
+    def start(bus, addr=0x6C):
+        write_word(bus, addr, REG_CMD, CMD_START)
+
+    paths = {}
+
+    # ---- no-CRC (0x6C), register helpers ----
+    b = mkbus(0x6C)
+    def plain_fixed(bus=b):
+        start(bus)
+        time.sleep(0.003)
+        read_word(bus, 0x6C, REG_STAT)
+        to_s16(read_word(bus, 0x6C, REG_PRESS))
+    paths["plain: START+3ms+STAT+PRESS"] = plain_fixed
+
+    b = mkbus(0x6C)
+    w = ConversionWaiter(lambda bus=b: read_word(bus, 0x6C, REG_STAT))
+    w.calibrate(lambda bus=b: start(bus))
+    def plain_poll(bus=b, w=w):
+        start(bus)
+        w.wait()
+        to_s16(read_word(bus, 0x6C, REG_PRESS))
+    paths["plain: START+poll+PRESS"] = plain_poll
+
+    b = mkbus(0x6C)
+    w2 = ConversionWaiter(lambda bus=b: read_word(bus, 0x6C, REG_STAT))
+    w2.calibrate(lambda bus=b: start(bus))
+    def plain_burst(bus=b, w=w2):
+        start(bus)
+        w.wait()
+        pte_i2c.read_stat_press_burst(bus, 0x6C)
+    paths["plain: START+poll+burst"] = plain_burst
+
+    b = mkbus(0x6C)
+    cont = ContinuousReader(lambda bus=b: start(bus), lambda bus=b: pte_i2c.read_stat_press_burst(bus, 0x6C))
+    paths["plain: continuous burst"] = cont.read
+
+    # ---- CRC (0x6D), register helpers, both reply byte orders ----
+    b = mkbus(0x6D)
+    def crc_be_split(bus=b):
+        pte_i2c._crc_read_word_split(bus, 0x6D, REG_STAT)
+        pte_i2c._crc_read_word_split(bus, 0x6D, REG_PRESS)
+    paths["crc BE: split (2 ioctl/reg)"] = crc_be_split
+
+    for order, tag in (("big", "BE"), ("little", "LE")):
+        b = mkbus(0x6D, order)
+        def crc_combined(bus=b, order=order):
+            pte_i2c.crc_read_word(bus, 0x6D, REG_STAT, order)
+            to_s16(pte_i2c.crc_read_word(bus, 0x6D, REG_PRESS, order))
+        paths[f"crc {tag}: combined"] = crc_combined
+
+        b = mkbus(0x6D, order)
+        paths[f"crc {tag}: batched"] = lambda bus=b, order=order: pte_i2c.crc_read_stat_press(bus, 0x6D, order)
+
+        b = mkbus(0x6D, order)
+        paths[f"crc {tag}: burst"] = lambda bus=b, order=order: pte_i2c.crc_read_press_stat_block(bus, 0x6D, order)
+
+    # ---- PTE7300Driver.sample(): what the scripts run (probed setup, ResilientBus) ----
+    for addr, order, tag in ((0x6C, "big", "plain"), (0x6D, "big", "crc BE"), (0x6D, "little", "crc LE")):
+        for continuous in (False, True):
+            b = mkbus(addr, order)
+            dev = PTE7300Driver.open(0, addr, state_path=None, bus_factory=lambda n, bus=b: bus)
+            dev.init(continuous=continuous)
+            paths[f"driver {tag}: {'continuous' if continuous else 'on-demand'}"] = dev.sample
+
+    # ---- asyncio driver, one sensor ----
+    from pte_async import BusWorker, AsyncPTE7300
+    loop = asyncio.new_event_loop()
+    b = mkbus(0x6C)
+    worker = BusWorker(0, bus_factory=lambda n, bus=b: bus)
+    sensor = AsyncPTE7300(worker, 0x6C, conversion_s=args.conv_ms / 1000.0)
+    paths["async: sample()"] = lambda: loop.run_until_complete(sensor.sample())
+
+    return paths, (loop, worker)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark all PTE7300 read paths on a simulated bus")
+    ap.add_argument("-n", type=int, default=300, help="Samples per path (default 300).")
+    ap.add_argument("--bus-khz", type=float, default=400.0, help="Simulated I2C clock (default 400).")
+    ap.add_argument("--ioctl-us", type=float, default=30.0, help="Simulated cost per ioctl (default 30 us).")
+    ap.add_argument("--conv-ms", type=float, default=1.2, help="Simulated conversion time (default 1.2 ms).")
+    ap.add_argument("--ber", type=float, default=0.0, help="Bit error probability per byte (default 0).")
+    ap.add_argument("--only", type=str, default=None, help="Run only paths containing this text.")
+    args = ap.parse_args()
+
+    paths, (loop, worker) = build_paths(args)
+    print(f"{'path':<30} {'samples/s':>10} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'cpu us':>8} {'err':>5}")
+    try:
+        for name, fn in paths.items():
+            if args.only and args.only not in name:
+                continue
+            r = run_path(fn, args.n)
+            print(f"{name:<30} {r['rate']:10.1f} {r['p50']:9.0f} {r['p90']:9.0f} {r['p99']:9.0f} "
+                  f"{r['cpu']:8.1f} {r['errors']:5d}")
+    finally:
+        worker.close()
+        loop.close()
+
+if __name__ == "__main__":
+    main()
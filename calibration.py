@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Multi-point calibration per sensor: counts -> bar and bar -> N as piecewise-linear curves
+# - Curve(points)         breakpoints (x, y); scalar evaluation by binary search over the
+#                         segments, .array() vectorized (NumPy if available), straight-line
+#                         extrapolation past the first/last point
+# - Calibration           counts_bar and/or bar_n curve for one sensor; a missing curve means
+#                         "keep the linear fs / N_PER_BAR map" (ForceConverter fills it in)
+# - load_calibration()    one entry from a JSON file, by sensor key ("i2c-0@0x6d") or "default"
+# The per-sample path does not use these curves directly: ForceConverter(..., table=cal)
+# compiles them into its dense 65536-entry tables, so a sample is still one index lookup.
+#
+# File format (points need not be sorted, at least two per curve):
+#     {
+#       "i2c-0@0x6d": {"counts_bar": [[-16000, 0.0], [0, 19.6], [16000, 40.0]],
+#                      "bar_n":      [[0.0, 0.0], [1.0, 402.0], [3.3, 1500.0]]},
+#       "default":    {"bar_n": [[0.0, 0.0], [3.3, 1500.0]]}
+#     }
+#
+# Example:
+#     cal = load_calibration("cylinders.json", sensor_key(0, 0x6d))
+#     lut = ForceConverter(0.0, 40.0, N_PER_BAR, table=cal)
+#     python calibration.py cylinders.json --sensor i2c-0@0x6d     (print the curves)
+
+import json
+from bisect import bisect_right
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+def sensor_key(busnum: int, addr: int) -> str:
+    """Key of one sensor in a calibration file – same form as the driver state file."""
+    return f"i2c-{busnum}@0x{addr:02x}"
+
+class Curve:
+    """Piecewise-linear y(x) through sorted breakpoints."""
+    def __init__(self, points):
+        pts = sorted((float(x), float(y)) for x, y in points)
+        if len(pts) < 2:
+            raise ValueError("a calibration curve needs at least two points")
+        for (x0, _), (x1, _) in zip(pts, pts[1:]):
+            if x1 == x0:
+                raise ValueError(f"duplicate calibration point at x={x0:g}")
+        self.points = tuple(pts)
+        self.xs = [p[0] for p in pts]
+        self.ys = [p[1] for p in pts]
+        self._slopes = [(y1 - y0) / (x1 - x0) for (x0, y0), (x1, y1) in zip(pts, pts[1:])]
+        self._last = len(pts) - 2           # index of the last segment
+        if HAS_NUMPY:
+            self._xs = np.array(self.xs)
+            self._ys = np.array(self.ys)
+            self._k = np.array(self._slopes)
+
+    @classmethod
+    def linear(cls, slope: float, intercept: float) -> "Curve":
+        return cls([(0.0, intercept), (1.0, intercept + slope)])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Curve) and self.points == other.points
+
+    def __hash__(self) -> int:
+        return hash(self.points)
+
+    def __repr__(self) -> str:
+        return f"Curve({list(self.points)!r})"
+
+    def __call__(self, x: float) -> float:
+        i = min(max(bisect_right(self.xs, x) - 1, 0), self._last)
+        return self.ys[i] + (x - self.xs[i]) * self._slopes[i]
+
+    def array(self, xs):
+        """Evaluate a batch; NumPy array in, NumPy array out (list without NumPy)."""
+        if HAS_NUMPY:
+            x = np.asarray(xs, dtype=np.float64)
+            i = np.clip(np.searchsorted(self._xs, x, side="right") - 1, 0, self._last)
+            return self._ys[i] + (x - self._xs[i]) * self._k[i]
+        return [self(x) for x in xs]
+
+    def table(self, start: int, count: int):
+        """y at the consecutive integers start .. start+count-1 (for the dense lookup tables)."""
+        if HAS_NUMPY:
+            return self.array(np.arange(start, start + count, dtype=np.float64))
+        # one sweep over the segments instead of a search per entry
+        out = []
+        xs, ys, k = self.xs, self.ys, self._slopes
+        i = 0
+        for x in range(start, start + count):
+            while i < self._last and x >= xs[i + 1]:
+                i += 1
+            out.append(ys[i] + (x - xs[i]) * k[i])
+        return out
+
+class Calibration:
+    """counts -> bar and bar -> N curves of one sensor; either may be None (linear default)."""
+    def __init__(self, counts_bar: Curve = None, bar_n: Curve = None, name: str = ""):
+        self.counts_bar = counts_bar
+        self.bar_n = bar_n
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, d: dict, name: str = "") -> "Calibration":
+        unknown = set(d) - {"counts_bar", "bar_n"}
+        if unknown:
+            raise ValueError(f"{name or 'calibration'}: unknown keys {sorted(unknown)}")
+        return cls(Curve(d["counts_bar"]) if d.get("counts_bar") else None,
+                   Curve(d["bar_n"]) if d.get("bar_n") else None, name)
+
+    def to_dict(self) -> dict:
+        d = {}
+        if self.counts_bar is not None:
+            d["counts_bar"] = [list(p) for p in self.counts_bar.points]
+        if self.bar_n is not None:
+            d["bar_n"] = [list(p) for p in self.bar_n.points]
+        return d
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, Calibration) and self.counts_bar == other.counts_bar
+                and self.bar_n == other.bar_n)
+
+    def __hash__(self) -> int:
+        return hash((self.counts_bar, self.bar_n))
+
+    def describe(self) -> str:
+        parts = []
+        if self.counts_bar is not None:
+            parts.append(f"counts->bar {len(self.counts_bar.points)} points")
+        if self.bar_n is not None:
+            parts.append(f"bar->N {len(self.bar_n.points)} points")
+        return f"calibration {self.name or '?'}: " + (", ".join(parts) or "linear")
+
+def load_calibration(path: str, key: str = None) -> Calibration:
+    """Entry `key` from the JSON file, else its "default" entry. KeyError if neither exists."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    for name in (key, "default"):
+        if name is not None and name in data:
+            return Calibration.from_dict(data[name], name)
+    raise KeyError(f"{path}: no calibration for {key or 'default'}")
+
+if __name__ == "__main__":
+    import argparse, sys
+    ap = argparse.ArgumentParser(description="Show a sensor's calibration curves from a JSON file")
+    ap.add_argument("path", help="Calibration file (JSON).")
+    ap.add_argument("--sensor", type=str, default=None, help='Sensor key, e.g. i2c-0@0x6d (default: "default").')
+    ap.add_argument("--step", type=int, default=4000, help="Counts between printed rows (default 4000).")
+    args = ap.parse_args()
+    try:
+        cal = load_calibration(args.path, args.sensor)
+    except (OSError, KeyError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(cal.describe())
+    if cal.counts_bar is not None:
+        for raw in range(-16000, 16001, args.step):
+            bar = cal.counts_bar(raw)
+            n = f"{cal.bar_n(bar):10.1f} N" if cal.bar_n is not None else ""
+            print(f"{raw:+7d}  {bar:9.3f} bar {n}")
+    elif cal.bar_n is not None:
+        for x, _ in cal.bar_n.points:
+            print(f"{x:9.3f} bar  {cal.bar_n(x):10.1f} N")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# Drift-free periodic scheduling on time.monotonic_ns()
+# - Deadline    slot k is due at t0 + k * period; tick() at the start of each slot
+#               returns how late it started and how many whole slots were missed
+#               (those are skipped, the grid is kept – no catch-up burst, no drift)
+# - TkPeriodic  the same for a Tk callback, rescheduled with root.after() for the
+#               time left until the next slot instead of a fixed delay after the work
+# - achieved_rate() / jitter_us() / summary() over the last `window` slot starts
+#
+# Example:
+#     d = Deadline(0.08); d.start()
+#     while running:
+#         late_ns, missed = d.tick()
+#         work()
+#         time.sleep(d.remaining())
+
+import math, time
+from collections import deque
+
+class Deadline:
+    def __init__(self, period_s: float, window: int = 256, clock_ns=time.monotonic_ns):
+        if not period_s > 0:
+            raise ValueError(f"Deadline: period must be > 0 (got {period_s!r})")
+        self.period_ns = max(1, int(round(period_s * 1e9)))
+        self.clock_ns = clock_ns
+        self.next_ns = None          # due time of the next slot
+        self.ticks = 0               # slots serviced
+        self.missed = 0              # slots skipped because we were more than a period late
+        self.late_ns = 0             # lateness of the last tick
+        self.max_late_ns = 0
+        self._starts = deque(maxlen=window)
+
+    @property
+    def period_s(self) -> float:
+        return self.period_ns / 1e9
+
+    def start(self, now_ns: int = None) -> None:
+        """First slot is due now."""
+        self.next_ns = self.clock_ns() if now_ns is None else now_ns
+        self._starts.clear()
+
+    def remaining(self) -> float:
+        """Seconds until the next slot is due (0 if it already is)."""
+        if self.next_ns is None:
+            self.start()
+        return max(0, self.next_ns - self.clock_ns()) / 1e9
+
+    def delay_ms(self) -> int:
+        """remaining() rounded up to whole ms (Tk after()), so we never fire early."""
+        return int(math.ceil(self.remaining() * 1000.0))
+
+    def tick(self):
+        """Mark the start of a slot -> (late_ns, missed). Advances the grid by whole periods."""
+        now = self.clock_ns()
+        if self.next_ns is None:
+            self.next_ns = now
+        late = now - self.next_ns
+        missed = 0
+        if late >= self.period_ns:
+            missed = late // self.period_ns
+            self.next_ns += missed * self.period_ns
+            late -= missed * self.period_ns
+            self.missed += missed
+        self.next_ns += self.period_ns
+        self.ticks += 1
+        self.late_ns = late
+        if late > self.max_late_ns:
+            self.max_late_ns = late
+        self._starts.append(now)
+        return late, missed
+
+    # ---- derived ----
+    def achieved_rate(self) -> float:
+        s = self._starts
+        if len(s) < 2 or s[-1] <= s[0]:
+            return 0.0
+        return (len(s) - 1) * 1e9 / (s[-1] - s[0])
+
+    def jitter_us(self) -> float:
+        """Standard deviation of the interval between slot starts (µs)."""
+        s = self._starts
+        n = len(s) - 1
+        if n < 2:
+            return 0.0
+        d = [s[i + 1] - s[i] for i in range(n)]
+        mean = sum(d) / n
+        return math.sqrt(sum((x - mean) ** 2 for x in d) / (n - 1)) / 1e3
+
+    def summary(self, name: str = "loop") -> str:
+        return (f"{name}: {self.achieved_rate():.2f}/s (target {1e9 / self.period_ns:.2f}), "
+                f"jitter {self.jitter_us():.0f} us, max late {self.max_late_ns / 1e6:.1f} ms, "
+                f"{self.ticks} ticks, {self.missed} missed")
+
+class TkPeriodic:
+    """Call fn() every period_s from the Tk loop, on the Deadline grid."""
+    def __init__(self, root, period_s: float, fn):
+        self.root = root
+        self.fn = fn
+        self.deadline = Deadline(period_s)
+        self._job = None
+
+    def start(self, delay_s: float = 0.0) -> None:
+        self.deadline.start(time.monotonic_ns() + int(delay_s * 1e9))
+        self._job = self.root.after(self.deadline.delay_ms(), self._run)
+
+    def _run(self) -> None:
+        self.deadline.tick()
+        try:
+            self.fn()
+        finally:
+            if self._job is not None:   # not stopped from inside fn
+                self._job = self.root.after(self.deadline.delay_ms(), self._run)
+
+    def stop(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def summary(self, name: str = "display") -> str:
+        return self.deadline.summary(name)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Event-driven bridge from evdev input devices (IR remote, keypad) to the Tk loop
+# - one input thread waits on all devices at once (select, no timeout while all are open)
+# - key presses are queued and the Tk loop is woken through a pipe registered with
+#   createfilehandler, so nothing polls and an idle GUI stays idle
+# - a burst of key repeats arriving before Tk gets to run is delivered as one
+#   callback: handler(keycode, count)
+# - unplugged devices are reopened every retry_s (the only timed wakeup, and only
+#   while a device is missing)
+#
+# Example:
+#     self.keys = EvdevBridge(self.root, self._on_remote_key, ["/dev/input/event6"],
+#                             keys=("KEY_LEFT", "KEY_RIGHT", "KEY_ESC"))
+#     self.keys.start()
+#     ...
+#     self.keys.stop()
+
+import os, selectors, sys, threading
+import tkinter as tk
+from collections import deque
+
+try:
+    from evdev import InputDevice, ecodes
+    HAS_EVDEV = True
+except Exception:
+    HAS_EVDEV = False
+
+KEY_UP, KEY_DOWN, KEY_REPEAT = 0, 1, 2   # evdev EV_KEY values
+
+def _key_name(code: int):
+    name = ecodes.KEY.get(code) or ecodes.BTN.get(code)
+    if isinstance(name, (list, tuple)):   # aliased codes, e.g. KEY_MUTE/KEY_MIN_INTERESTING
+        name = name[0]
+    return name
+
+class EvdevBridge:
+    def __init__(self, root, handler, paths, keys=None, repeats: bool = True, retry_s: float = 2.0):
+        self.root = root
+        self.handler = handler                       # called in the Tk thread: handler(keycode, count)
+        self.paths = list(paths)
+        self.keys = set(keys) if keys else None      # None = every key
+        self.repeats = repeats                       # deliver autorepeat (held key) as extra presses
+        self.retry_s = retry_s
+        self._pending = deque()                      # keycodes from the input thread
+        self._lock = threading.Lock()
+        self._signalled = False                      # a wake byte is already in the pipe
+        self._rfd, self._wfd = os.pipe()
+        os.set_blocking(self._rfd, False)
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = None
+        self._via_filehandler = False
+        self.presses = 0        # key events accepted
+        self.batches = 0        # handler calls
+        self.wakeups = 0        # times the Tk loop was woken
+        self.open_errors = 0
+
+    # ---- Tk side ----
+    def start(self) -> bool:
+        """Start the input thread. False when evdev is missing (nothing is started)."""
+        if not HAS_EVDEV or not self.paths:
+            return False
+        try:
+            self.root.tk.createfilehandler(self._rfd, tk.READABLE, self._on_readable)
+            self._via_filehandler = True
+        except (AttributeError, tk.TclError):
+            # no file handlers (threaded Tcl on some builds): virtual event from the thread
+            self.root.bind("<<EvdevKeys>>", lambda e: self._drain(), add="+")
+        self._thread = threading.Thread(target=self._run, name="evdev-bridge", daemon=True)
+        self._thread.start()
+        return True
+
+    def _on_readable(self, fd, mask) -> None:
+        try:
+            os.read(self._rfd, 512)
+        except BlockingIOError:
+            pass
+        self._drain()
+
+    def _drain(self) -> None:
+        with self._lock:
+            codes = list(self._pending)
+            self._pending.clear()
+            self._signalled = False
+        self.wakeups += 1
+        # collapse runs of the same key (autorepeat burst) into one call
+        i = 0
+        while i < len(codes):
+            j = i + 1
+            while j < len(codes) and codes[j] == codes[i]:
+                j += 1
+            self.batches += 1
+            try:
+                self.handler(codes[i], j - i)
+            except Exception as e:
+                print(f"evdev handler: {e}", file=sys.stderr)
+            if self._rfd < 0:
+                return          # the handler stopped the bridge (ESC closed the window): drop the rest
+            i = j
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            os.write(self._stop_w, b"x")
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._via_filehandler:
+            try:
+                self.root.tk.deletefilehandler(self._rfd)
+            except tk.TclError:
+                pass
+            self._via_filehandler = False
+        for fd in (self._rfd, self._wfd, self._stop_r, self._stop_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._rfd = self._wfd = self._stop_r = self._stop_w = -1
+
+    # ---- input thread ----
+    def _post(self, name: str) -> None:
+        with self._lock:
+            self._pending.append(name)
+            if self._signalled:
+                return          # Tk has not drained the last wake yet; it will see this too
+            self._signalled = True
+        if self._via_filehandler:
+            os.write(self._wfd, b"\0")
+        else:
+            try:
+                self.root.event_generate("<<EvdevKeys>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                pass
+
+    def _open_missing(self, sel, devs) -> None:
+        for path in self.paths:
+            if path in devs:
+                continue
+            try:
+                dev = InputDevice(path)
+            except OSError:
+                self.open_errors += 1
+                continue
+            devs[path] = dev
+            sel.register(dev.fd, selectors.EVENT_READ, path)
+
+    def _run(self) -> None:
+        sel = selectors.DefaultSelector()
+        sel.register(self._stop_r, selectors.EVENT_READ, None)
+        devs = {}
+        try:
+            while True:
+                if len(devs) < len(self.paths):
+                    self._open_missing(sel, devs)
+                timeout = None if len(devs) == len(self.paths) else self.retry_s
+                for key, _ in sel.select(timeout):
+                    path = key.data
+                    if path is None:
+                        return           # stop()
+                    try:
+                        self._read_device(devs[path])
+                    except OSError:
+                        # unplugged: drop it, reopened on the next retry
+                        sel.unregister(key.fd)
+                        devs.pop(path).close()
+        finally:
+            for dev in devs.values():
+                try:
+                    dev.close()
+                except OSError:
+                    pass
+            sel.close()
+
+    def _read_device(self, dev) -> None:
+        try:
+            for ev in dev.read():
+                if ev.type != ecodes.EV_KEY:
+                    continue
+                if ev.value != KEY_DOWN and not (self.repeats and ev.value == KEY_REPEAT):
+                    continue
+                name = _key_name(ev.code)
+                if name is None or (self.keys is not None and name not in self.keys):
+                    continue
+                self.presses += 1
+                self._post(name)
+        except BlockingIOError:
+            pass
+
+    def summary(self) -> str:
+        return (f"evdev: {self.presses} presses, {self.batches} handler calls, "
+                f"{self.wakeups} Tk wakeups, {self.open_errors} open errors")
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Show key presses from evdev devices through the Tk bridge")
+    ap.add_argument("paths", nargs="+", help="Input devices, e.g. /dev/input/event6")
+    args = ap.parse_args()
+    if not HAS_EVDEV:
+        print("python-evdev is not installed", file=sys.stderr)
+        sys.exit(1)
+    root = tk.Tk()
+    lbl = tk.Label(root, text="press a key", font=("Arial", 24), width=24)
+    lbl.pack(padx=20, pady=20)
+    bridge = EvdevBridge(root, lambda code, n: lbl.config(text=f"{code} x{n}"), args.paths)
+    bridge.start()
+    try:
+        root.mainloop()
+    finally:
+        bridge.stop()
+        print(bridge.summary())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# Simulated PTE7300 + SMBus for benchmarks and offline runs (no hardware)
+# - FakePTE7300  register model: CMD 0x22, PRESS 0x30, STAT 0x32, conversion
+#                latency, CRC framing (0x6D) in big or little endian, bit errors
+# - FakeSMBus    drop-in for smbus2.SMBus: read_word_data, write_i2c_block_data,
+#                read_i2c_block_data, i2c_rdwr; optional per-byte bus time
+#
+# Example:
+#     bus = FakeSMBus(0, devices=[FakePTE7300(0x6D, byteorder="little")])
+#     PTE7300Gui-style code can then use `bus` like a real SMBus.
+
+import ctypes, errno, math, random, time
+from pte_crc import crc8, crc8_word
+
+REG_CMD   = 0x22
+REG_PRESS = 0x30
+REG_STAT  = 0x32
+
+CMD_RESET = 0xB169
+CMD_START = 0x8B93
+CMD_IDLE  = 0x7BBA
+CMD_SLEEP = 0x6C32
+
+STAT_DATA_READY = 0x0008   # same bit pte_conversion polls for
+I2C_M_RD = 0x0001
+
+def sine_pressure(amplitude: int = 12000, period_s: float = 4.0, noise: int = 20):
+    """Raw counts source: slow sine around 0 with a little noise."""
+    def source(t: float) -> int:
+        v = amplitude * math.sin(2 * math.pi * t / period_s) + random.randint(-noise, noise)
+        return max(-32768, min(32767, int(v)))
+    return source
+
+class FakePTE7300:
+    def __init__(self, addr: int = 0x6C, crc: bool = None, byteorder: str = "big",
+                 conversion_s: float = 0.0012, source=None, bit_error_rate: float = 0.0,
+                 continuous: bool = True, seed: int = None):
+        self.addr = addr
+        self.crc = (addr == 0x6D) if crc is None else crc
+        self.byteorder = byteorder
+        self.conversion_s = conversion_s
+        self.source = source or sine_pressure()
+        self.bit_error_rate = bit_error_rate   # probability per returned byte
+        self.continuous = continuous           # keep converting after one START
+        self.rng = random.Random(seed)
+        self.regs = {REG_CMD: 0, REG_PRESS: 0, REG_STAT: 0}
+        self.running = False
+        self._conv_started = None
+        self._ready = False
+        self._selected = REG_PRESS             # register pointer for bare reads
+        self.stats = {"commands": 0, "reads": 0, "bit_errors": 0}
+
+    # ---- conversion model ----
+    def _update(self, now: float) -> None:
+        if not self.running or self._conv_started is None:
+            return
+        done = now - self._conv_started
+        if done < self.conversion_s:
+            return
+        self.regs[REG_PRESS] = self.source(now) & 0xFFFF
+        self._ready = True
+        if self.continuous:
+            # next conversion starts right after the last finished one
+            self._conv_started += self.conversion_s * int(done / self.conversion_s)
+        else:
+            self._conv_started = None
+            self.running = False
+
+    def _status(self) -> int:
+        return (0x0001 if not self.running else 0) | (STAT_DATA_READY if self._ready else 0)
+
+    def command(self, value: int) -> None:
+        self.stats["commands"] += 1
+        now = time.perf_counter()
+        if value == CMD_START:
+            self.running = True
+            self._conv_started = now
+        elif value in (CMD_IDLE, CMD_SLEEP):
+            self.running = False
+            self._conv_started = None
+        elif value == CMD_RESET:
+            self.running = False
+            self._conv_started = None
+            self._ready = False
+            self.regs[REG_PRESS] = 0
+        self.regs[REG_CMD] = value
+
+    def read_reg(self, reg: int) -> int:
+        self._update(time.perf_counter())
+        self.stats["reads"] += 1
+        if reg == REG_STAT:
+            return self._status()
+        if reg == REG_PRESS:
+            self._ready = False
+        return self.regs.get(reg, 0)
+
+    # ---- wire format ----
+    def _corrupt(self, data: bytearray) -> bytearray:
+        if self.bit_error_rate:
+            for i in range(len(data)):
+                if self.rng.random() < self.bit_error_rate:
+                    data[i] ^= 1 << self.rng.randrange(8)
+                    self.stats["bit_errors"] += 1
+        return data
+
+    def word_bytes(self, reg: int) -> bytes:
+        """One register as it appears on the wire ([b0, b1] or [b0, b1, crc])."""
+        v = self.read_reg(reg)
+        if self.crc and self.byteorder == "big":
+            b = bytes([(v >> 8) & 0xFF, v & 0xFF])
+        else:
+            # plain SMBus words and LE CRC replies are LSB first
+            b = bytes([v & 0xFF, (v >> 8) & 0xFF])
+        if self.crc:
+            b += bytes([crc8_word(b[0], b[1])])
+        return b
+
+    def block(self, reg: int, length: int) -> bytes:
+        """Auto-incrementing read from reg: consecutive 16-bit registers."""
+        out = bytearray()
+        while len(out) < length:
+            out += self.word_bytes(reg)
+            reg += 2
+        return bytes(self._corrupt(out[:length]))
+
+    def write(self, data: bytes) -> None:
+        """Raw write message: [reg] / [reg, crc] (register select) or a 16-bit write."""
+        if not data:
+            return
+        reg = data[0]
+        payload = data[1:]
+        if self.crc:
+            if len(payload) in (1, 3) and crc8(data[:-1]) != data[-1]:
+                raise OSError(errno.EIO, "PTE7300 sim: CRC error in write")
+            payload = payload[:-1]
+        self._selected = reg
+        if len(payload) == 2 and reg == REG_CMD:
+            self.command((payload[0] << 8) | payload[1])
+
+class FakeSMBus:
+    """
+    Minimal smbus2.SMBus stand-in. byte_s adds bus time per transferred byte
+    (about 90 us at 100 kHz, 23 us at 400 kHz); ioctl_s per call.
+    """
+    def __init__(self, bus=None, devices=(), byte_s: float = 0.0, ioctl_s: float = 0.0):
+        self.busnum = bus
+        self.devices = {d.addr: d for d in devices}
+        self.byte_s = byte_s
+        self.ioctl_s = ioctl_s
+        self.transactions = 0
+
+    def _dev(self, addr: int) -> FakePTE7300:
+        dev = self.devices.get(addr)
+        if dev is None:
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")  # NACK
+        return dev
+
+    def _spend(self, nbytes: int) -> None:
+        self.transactions += 1
+        t = self.ioctl_s + nbytes * self.byte_s
+        if t > 0:
+            time.sleep(t)
+
+    # ---- SMBus API used by the scripts ----
+    def read_word_data(self, addr: int, reg: int) -> int:
+        dev = self._dev(addr)
+        self._spend(4)
+        b = dev.block(reg, 2)
+        return b[0] | (b[1] << 8)
+
+    def write_i2c_block_data(self, addr: int, reg: int, data) -> None:
+        self._spend(2 + len(data))
+        self._dev(addr).write(bytes([reg]) + bytes(data))
+
+    def read_i2c_block_data(self, addr: int, reg: int, length: int) -> list:
+        dev = self._dev(addr)
+        self._spend(3 + length)
+        return list(dev.block(reg, length))
+
+    def i2c_rdwr(self, *msgs) -> None:
+        total = sum(m.len if hasattr(m, "len") else len(m) for m in msgs)
+        self._spend(total + len(msgs))
+        reg = None
+        for m in msgs:
+            dev = self._dev(m.addr)
+            if m.flags & I2C_M_RD:
+                n = m.len if hasattr(m, "len") else len(m)
+                data = dev.block(reg if reg is not None else dev._selected, n)
+                _fill(m, data)
+                reg = None
+            else:
+                data = bytes(m)
+                dev.write(data)
+                reg = data[0] if data else None
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _fill(msg, data: bytes) -> None:
+    buf = msg.buf
+    if isinstance(buf, (bytearray, memoryview)):
+        buf[:len(data)] = data
+    else:
+        ctypes.memmove(buf, data, len(data))  # smbus2 i2c_msg: ctypes char buffer
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# Streaming filters for force samples, composable into a chain
+# - EMA          exponential (first-order IIR) low-pass, fixed alpha or time constant
+# - Median       running median over the last n samples (spike rejection)
+# - Boxcar       mean of every n samples, emits one value per n (decimation)
+# - FilterChain  stages in order; push() one sample, batch() a whole array
+#
+# push() returns the new output or None (Boxcar between outputs). batch() keeps
+# the same state as push(), so feeding an array gives the same values as pushing
+# it sample by sample. NumPy is used for batch() when available.
+#
+# Example:
+#     chain = FilterChain(Median(5), EMA(tau_s=0.25))
+#     y = chain.push(force, ts)
+
+import bisect, math
+from collections import deque
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+try:
+    from scipy.signal import lfilter
+    HAS_SCIPY = True
+except Exception:
+    HAS_SCIPY = False
+
+class EMA:
+    """
+    y += alpha * (x - y). With tau_s the alpha follows the real sample spacing
+    (alpha = 1 - exp(-dt / tau)), so uneven sample times still give the same
+    time constant; push() then needs ts.
+    """
+    def __init__(self, alpha: float = None, tau_s: float = None):
+        if (alpha is None) == (tau_s is None):
+            raise ValueError("EMA: give either alpha or tau_s")
+        self.alpha = alpha
+        self.tau_s = tau_s
+        self.value = None
+        self._last_ts = None
+
+    def reset(self) -> None:
+        self.value = None
+        self._last_ts = None
+
+    def _alpha(self, ts):
+        if self.tau_s is None:
+            return self.alpha
+        if ts is None:
+            raise ValueError("EMA(tau_s=...) needs timestamps")
+        last, self._last_ts = self._last_ts, ts
+        if last is None:
+            return 1.0
+        return 1.0 - math.exp(-max(0.0, ts - last) / self.tau_s)
+
+    def push(self, x: float, ts: float = None) -> float:
+        a = self._alpha(ts)
+        y = self.value
+        self.value = y = x if y is None else y + a * (x - y)
+        return y
+
+    def batch(self, xs, ts=None):
+        if not (HAS_NUMPY and HAS_SCIPY and self.tau_s is None):
+            # time-based alpha changes per sample; no closed form worth having
+            if ts is None:
+                out = [self.push(x) for x in xs]
+            else:
+                out = [self.push(x, t) for x, t in zip(xs, ts)]
+            return np.asarray(out, dtype=np.float64) if HAS_NUMPY else out
+        xs = np.asarray(xs, dtype=np.float64)
+        if not len(xs):
+            return xs.copy()
+        a = self.alpha
+        if self.value is None:
+            self.value = float(xs[0])
+        out, _ = lfilter([a], [1.0, a - 1.0], xs, zi=[(1.0 - a) * self.value])
+        self.value = float(out[-1])
+        return out
+
+class Median:
+    """Median of the last n samples (fewer until the window has filled)."""
+    def __init__(self, n: int = 5):
+        if n < 1:
+            raise ValueError("Median: n must be >= 1")
+        self.n = int(n)
+        self._q = deque()
+        self._sorted = []
+        self.value = None
+
+    def reset(self) -> None:
+        self._q.clear()
+        self._sorted = []
+        self.value = None
+
+    def push(self, x: float, ts: float = None) -> float:
+        q, s = self._q, self._sorted
+        if len(q) == self.n:
+            del s[bisect.bisect_left(s, q.popleft())]
+        q.append(x)
+        bisect.insort(s, x)
+        k = len(s)
+        self.value = s[k // 2] if k & 1 else 0.5 * (s[k // 2 - 1] + s[k // 2])
+        return self.value
+
+    def batch(self, xs, ts=None):
+        if not HAS_NUMPY:
+            return [self.push(x) for x in xs]
+        xs = np.asarray(xs, dtype=np.float64)
+        warm = min(len(xs), self.n - len(self._q))
+        head = [self.push(float(x)) for x in xs[:warm]]   # window still filling
+        rest = xs[warm:]
+        if not len(rest):
+            return np.asarray(head, dtype=np.float64)
+        hist = np.asarray(self._q, dtype=np.float64)
+        full = np.concatenate([hist[1:], rest])
+        med = np.median(np.lib.stride_tricks.sliding_window_view(full, self.n), axis=1)
+        tail = full[-self.n:].tolist()
+        self._q = deque(tail)
+        self._sorted = sorted(tail)
+        self.value = float(med[-1])
+        return np.concatenate([np.asarray(head, dtype=np.float64), med])
+
+class Boxcar:
+    """Mean of each block of n samples; push() returns None inside a block."""
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("Boxcar: n must be >= 1")
+        self.n = int(n)
+        self._sum = 0.0
+        self._k = 0
+        self.value = None
+
+    def reset(self) -> None:
+        self._sum = 0.0
+        self._k = 0
+        self.value = None
+
+    def push(self, x: float, ts: float = None):
+        self._sum += x
+        self._k += 1
+        if self._k < self.n:
+            return None
+        self.value = self._sum / self.n
+        self._sum = 0.0
+        self._k = 0
+        return self.value
+
+    def batch(self, xs, ts=None):
+        if not HAS_NUMPY:
+            return [y for y in (self.push(x) for x in xs) if y is not None]
+        xs = np.asarray(xs, dtype=np.float64)
+        out = []
+        i = 0
+        while self._k and i < len(xs):           # finish the block already started
+            y = self.push(float(xs[i])); i += 1
+            if y is not None:
+                out.append(y)
+        rest = xs[i:]
+        m = len(rest) // self.n * self.n
+        blocks = rest[:m].reshape(-1, self.n).mean(axis=1)
+        for x in rest[m:]:
+            self.push(float(x))
+        if len(blocks):
+            self.value = float(blocks[-1])
+        return np.concatenate([np.asarray(out, dtype=np.float64), blocks])
+
+class FilterChain:
+    """Stages run in order; a stage returning None (decimation) ends that sample."""
+    def __init__(self, *stages):
+        self.stages = list(stages)
+        self.value = None
+
+    def reset(self) -> None:
+        for st in self.stages:
+            st.reset()
+        self.value = None
+
+    def push(self, x: float, ts: float = None):
+        for st in self.stages:
+            x = st.push(x, ts)
+            if x is None:
+                return None
+        self.value = x
+        return x
+
+    def batch(self, xs, ts=None):
+        """All outputs for xs (same values push() would have returned, without the Nones)."""
+        decimated = any(isinstance(st, Boxcar) for st in self.stages[:-1])
+        if ts is not None and decimated:
+            # timestamps after a decimating stage: keep it simple and exact
+            out = [y for y in (self.push(x, t) for x, t in zip(xs, ts)) if y is not None]
+            return np.asarray(out, dtype=np.float64) if HAS_NUMPY else out
+        for st in self.stages:
+            xs = st.batch(xs, ts)
+        if len(xs):
+            self.value = float(xs[-1])
+        return xs
+
+def parse_chain(spec: str) -> FilterChain:
+    """
+    "median:5,ema:0.25" -> FilterChain(Median(5), EMA(tau_s=0.25))
+    ema:<tau_s>  ema_a:<alpha>  median:<n>  boxcar:<n>
+    """
+    stages = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, arg = part.partition(":")
+        name = name.lower()
+        if name == "ema":
+            stages.append(EMA(tau_s=float(arg)))
+        elif name == "ema_a":
+            stages.append(EMA(alpha=float(arg)))
+        elif name == "median":
+            stages.append(Median(int(arg)))
+        elif name == "boxcar":
+            stages.append(Boxcar(int(arg)))
+        else:
+            raise ValueError(f"unknown filter stage: {name!r}")
+    return FilterChain(*stages)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# counts -> bar -> Newtons through precomputed tables over the full int16 range
+# - ForceConverter.bar(raw) / .newtons(raw)              scalar lookup
+# - ForceConverter.bar_array(raws) / .newtons_array(raws) batch (NumPy if available)
+# Tables are rebuilt only when set_calibration() changes fs_min/fs_max/n_per_bar/zero_offset_n
+# or set_table() a multi-point calibration (calibration.py) – that is compiled into the same
+# tables, so a non-linear sensor costs nothing extra per sample.
+#
+# Run this file directly for a timing of scalar and batch conversion.
+
+from array import array
+from calibration import Curve
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+RAW_MIN = -32768
+RAW_SPAN = 65536
+
+class ForceConverter:
+    """
+    Same math as counts_to_bar() + bar_to_newtons() in the scripts:
+        bar = [fs_min +] (raw + 16000) * (fs_max - fs_min) / 32000
+        N   = bar * n_per_bar + zero_offset_n
+    offset_by_fs_min=False matches the Final.py/variant2.py variant without fs_min.
+    table: calibration.Calibration – its counts_bar / bar_n curves replace the
+    linear maps above (a curve it does not have keeps the linear one).
+    Change the calibration through set_calibration() / set_table() so the tables follow.
+    """
+    def __init__(self, fs_min: float, fs_max: float, n_per_bar: float,
+                 zero_offset_n: float = 0.0, offset_by_fs_min: bool = True, table=None):
+        self.offset_by_fs_min = offset_by_fs_min
+        self.table = table
+        self._key = None
+        self.rebuilds = 0
+        self.set_calibration(fs_min, fs_max, n_per_bar, zero_offset_n)
+
+    @property
+    def calibration(self):
+        """(fs_min, fs_max, n_per_bar, zero_offset_n) the tables were built from."""
+        return self._key
+
+    def set_calibration(self, fs_min: float = None, fs_max: float = None,
+                        n_per_bar: float = None, zero_offset_n: float = None) -> bool:
+        """Update any of the parameters; returns True if the tables were rebuilt."""
+        old = self._key or (None, None, None, None)
+        key = tuple(float(o if n is None else n) for n, o in
+                    zip((fs_min, fs_max, n_per_bar, zero_offset_n), old))
+        if key == self._key:
+            return False
+        self.fs_min, self.fs_max, self.n_per_bar, self.zero_offset_n = key
+        self._build(*key)
+        self._key = key
+        self.rebuilds += 1
+        return True
+
+    def set_table(self, table) -> bool:
+        """Switch to another multi-point calibration (None = linear); True if the tables were rebuilt."""
+        if table == self.table:
+            return False
+        self.table = table
+        self._build(*self._key)
+        self.rebuilds += 1
+        return True
+
+    def _build(self, fs_min, fs_max, n_per_bar, off_n) -> None:
+        k = (fs_max - fs_min) / 32000.0
+        base = fs_min if self.offset_by_fs_min else 0.0
+        if self.table is not None:
+            self._build_curves(k, base, n_per_bar, off_n)
+        elif HAS_NUMPY:
+            raw = np.arange(RAW_MIN, RAW_MIN + RAW_SPAN, dtype=np.float64)
+            self._bar = base + (raw + 16000.0) * k
+            self._n = self._bar * n_per_bar + off_n
+            # plain lists index fastest from Python for the scalar path
+            self._bar_list = self._bar.tolist()
+            self._n_list = self._n.tolist()
+        else:
+            self._bar_list = array('d', [base + (r + 16000) * k for r in range(RAW_MIN, RAW_MIN + RAW_SPAN)])
+            self._n_list = array('d', [b * n_per_bar + off_n for b in self._bar_list])
+            self._bar = self._bar_list
+            self._n = self._n_list
+
+    def _build_curves(self, k, base, n_per_bar, off_n) -> None:
+        counts_bar = self.table.counts_bar or Curve.linear(k, base + 16000.0 * k)
+        bar_n = self.table.bar_n or Curve.linear(n_per_bar, off_n)
+        bar = counts_bar.table(RAW_MIN, RAW_SPAN)
+        n = bar_n.array(bar)
+        if HAS_NUMPY:
+            self._bar, self._n = bar, n
+            self._bar_list = bar.tolist()
+            self._n_list = n.tolist()
+        else:
+            self._bar = self._bar_list = array('d', bar)
+            self._n = self._n_list = array('d', n)
+
+    # ---- scalar ----
+    def bar(self, raw: int) -> float:
+        return self._bar_list[raw - RAW_MIN]
+
+    def newtons(self, raw: int) -> float:
+        return self._n_list[raw - RAW_MIN]
+
+    def convert(self, raw: int):
+        """(bar, N) for one raw value."""
+        i = raw - RAW_MIN
+        return self._bar_list[i], self._n_list[i]
+
+    # ---- batch ----
+    def bar_array(self, raws):
+        if HAS_NUMPY:
+            return np.take(self._bar, np.asarray(raws, dtype=np.int32) - RAW_MIN)
+        t = self._bar_list
+        return [t[r - RAW_MIN] for r in raws]
+
+    def newtons_array(self, raws):
+        if HAS_NUMPY:
+            return np.take(self._n, np.asarray(raws, dtype=np.int32) - RAW_MIN)
+        t = self._n_list
+        return [t[r - RAW_MIN] for r in raws]
+
+def _bench(n: int = 2_000_000) -> None:
+    import random, time
+    t0 = time.perf_counter()
+    fc = ForceConverter(0.0, 40.0, 1500.0 / 3.3)
+    t1 = time.perf_counter()
+    print(f"table build            {(t1 - t0) * 1e3:8.2f} ms")
+
+    def counts_to_bar(counts, fs_min_bar, fs_max_bar):
+        return fs_min_bar + (counts + 16000) * ((fs_max_bar - fs_min_bar) / 32000.0)
+
+    def bar_to_newtons(p):
+        return p * fc.n_per_bar + fc.zero_offset_n
+
+    raws = [random.randint(-16000, 16000) for _ in range(100_000)]
+    t0 = time.perf_counter()
+    for r in raws:
+        fc.newtons(r)
+    t1 = time.perf_counter()
+    print(f"scalar lookup          {(t1 - t0) / len(raws) * 1e9:8.0f} ns/sample")
+    t0 = time.perf_counter()
+    for r in raws:
+        bar_to_newtons(counts_to_bar(r, 0.0, 40.0))
+    t1 = time.perf_counter()
+    print(f"scalar functions       {(t1 - t0) / len(raws) * 1e9:8.0f} ns/sample")
+    if HAS_NUMPY:
+        big = np.random.randint(-16000, 16000, size=n).astype(np.int16)
+        t0 = time.perf_counter(); fc.newtons_array(big); t1 = time.perf_counter()
+        print(f"batch {n} samples   {(t1 - t0) * 1e3:8.2f} ms")
+
+if __name__ == "__main__":
+    _bench()
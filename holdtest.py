@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# Hold-test state machine (Schmitt trigger, OFF grace, countdown, success hold)
+# pulled out of variant2 so it can run without Tk.
+# - HoldTest     the logic; time only comes from a clock object
+# - TkClock      clock for the GUI (root.after + time.monotonic)
+# - SimClock     virtual clock, callbacks run as fast as the replay feeds it
+# - replay()     feed recorded force samples through the same display cadence
+#                as the GUI and collect the events it would have shown
+#
+# Example: python holdtest.py shift.rec --schmitt 3000:2700
+
+import heapq, time
+from window_stats import WindowStats
+
+TIMER_SECONDS       = 10
+SUCCESS_HOLD_SEC    = 10
+DISPLAY_PERIOD_MS   = 500
+OFF_CANCEL_GRACE_MS = 800
+
+# ---------------- clocks ----------------
+class TkClock:
+    def __init__(self, root):
+        self.root = root
+
+    def now(self) -> float:
+        return time.monotonic()   # same clock as the sample timestamps, immune to NTP steps
+
+    def call_later(self, delay_s: float, fn):
+        return self.root.after(int(round(delay_s * 1000)), fn)
+
+    def cancel(self, handle) -> None:
+        self.root.after_cancel(handle)
+
+class SimClock:
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._heap = []
+        self._seq = 0
+        self._cancelled = set()
+
+    def now(self) -> float:
+        return self._now
+
+    def call_later(self, delay_s: float, fn):
+        self._seq += 1
+        heapq.heappush(self._heap, (self._now + delay_s, self._seq, fn))
+        return self._seq
+
+    def cancel(self, handle) -> None:
+        self._cancelled.add(handle)
+
+    def advance_to(self, t: float) -> None:
+        """Run every callback due up to t (in time order), then set now = t."""
+        heap = self._heap
+        while heap and heap[0][0] <= t:
+            due, seq, fn = heapq.heappop(heap)
+            if seq in self._cancelled:
+                self._cancelled.discard(seq)
+                continue
+            self._now = due
+            fn()
+        self._now = max(self._now, t)
+
+# ---------------- state machine ----------------
+class HoldTest:
+    """
+    Call update(avg_force) once per display period. Events go to
+    on_event(kind, t, value):
+        trigger_on / trigger_off     Schmitt state change (value = avg force)
+        timer_start                  countdown started (value = seconds)
+        timer_tick                   countdown text changed (value = seconds left)
+        timer_cancel                 countdown stopped
+        success                      countdown reached 0 -> green screen
+        success_end                  green hold time over
+    """
+    def __init__(self, clock, schmitt_on: float, schmitt_off: float,
+                 timer_s: int = TIMER_SECONDS, success_hold_s: float = SUCCESS_HOLD_SEC,
+                 off_grace_s: float = OFF_CANCEL_GRACE_MS / 1000.0, on_event=None):
+        self.clock = clock
+        self.schmitt_on = schmitt_on
+        self.schmitt_off = schmitt_off
+        self.timer_s = timer_s
+        self.success_hold_s = success_hold_s
+        self.off_grace_s = off_grace_s
+        self.on_event = on_event or (lambda kind, t, value: None)
+
+        self.trigger_state = False       # Schmitt ON/OFF
+        self.timer_remaining = 0         # s
+        self.timer_job = None
+        self._timer_due = 0.0            # clock time of the next countdown tick
+        self.off_since = None            # start of OFF (for the grace period)
+        self.success_job = None
+        self.success_until = 0.0
+
+    def set_thresholds(self, schmitt_on: float, schmitt_off: float) -> None:
+        self.schmitt_on = schmitt_on
+        self.schmitt_off = schmitt_off
+
+    def _emit(self, kind: str, value=None) -> None:
+        self.on_event(kind, self.clock.now(), value)
+
+    @property
+    def timer_running(self) -> bool:
+        return self.timer_job is not None or self.timer_remaining != 0
+
+    def is_success_hold_active(self, now: float = None) -> bool:
+        if now is None:
+            now = self.clock.now()
+        return now < self.success_until
+
+    def update(self, avg_force: float) -> None:
+        now = self.clock.now()
+        prev_state = self.trigger_state
+        if self.trigger_state:
+            # ON: only switch OFF when the average stays below OFF for the grace time
+            if avg_force <= self.schmitt_off:
+                if self.off_since is None:
+                    self.off_since = now
+                if now - self.off_since >= self.off_grace_s and not self.is_success_hold_active(now):
+                    self.trigger_state = False
+                    self.off_since = None
+            else:
+                self.off_since = None
+        else:
+            if avg_force >= self.schmitt_on:
+                self.trigger_state = True
+                self.off_since = None
+
+        if not prev_state and self.trigger_state:
+            self._emit("trigger_on", avg_force)
+            if not self.is_success_hold_active(now) and self.timer_job is None and self.timer_remaining == 0:
+                self.start_timer(self.timer_s)
+        elif prev_state and not self.trigger_state:
+            self._emit("trigger_off", avg_force)
+            # same condition as the GUI has always used; off_since was just cleared above
+            if self.timer_job is not None and self.off_since is not None:
+                self.cancel_timer()
+
+    # ---- countdown / success ----
+    def start_timer(self, seconds: int) -> None:
+        self.timer_remaining = int(seconds)
+        self._timer_due = self.clock.now()
+        self._emit("timer_start", self.timer_remaining)
+        self._tick()
+
+    def _tick(self) -> None:
+        self._emit("timer_tick", self.timer_remaining)
+        if self.timer_remaining <= 0:
+            self.timer_job = None
+            self._success()
+            return
+        self.timer_remaining -= 1
+        # ticks on whole seconds from the start, so late callbacks do not stretch the countdown
+        self._timer_due += 1.0
+        self.timer_job = self.clock.call_later(max(0.0, self._timer_due - self.clock.now()), self._tick)
+
+    def cancel_timer(self) -> None:
+        if self.timer_job is not None:
+            self.clock.cancel(self.timer_job)
+            self.timer_job = None
+        self.timer_remaining = 0
+        self._emit("timer_cancel")
+
+    def _success(self) -> None:
+        self.success_until = self.clock.now() + self.success_hold_s
+        if self.success_job is not None:
+            self.clock.cancel(self.success_job)
+        self.success_job = self.clock.call_later(self.success_hold_s, self._success_end)
+        self._emit("success")
+
+    def _success_end(self) -> None:
+        self.success_job = None
+        self._emit("success_end")
+
+    def close(self) -> None:
+        for job in (self.timer_job, self.success_job):
+            if job is not None:
+                self.clock.cancel(job)
+        self.timer_job = self.success_job = None
+
+# ---------------- replay ----------------
+def replay(samples, schmitt_on: float, schmitt_off: float,
+           display_period_s: float = DISPLAY_PERIOD_MS / 1000.0, **hold_kw) -> list:
+    """
+    samples: iterable of (ts_s, force_n) in time order (e.g. from a recording).
+    Returns the event list [(kind, t, value), ...] the GUI would have produced,
+    evaluating the window average every display_period_s like _display_update.
+    """
+    events = []
+    clock = SimClock()
+    hold = HoldTest(clock, schmitt_on, schmitt_off,
+                    on_event=lambda k, t, v: events.append((k, t, v)), **hold_kw)
+    win = WindowStats(display_period_s)
+    next_tick = None
+    for ts, force in samples:
+        if next_tick is None:
+            next_tick = ts + display_period_s
+            clock.advance_to(ts)
+        while ts > next_tick:
+            clock.advance_to(next_tick)
+            win.evict(next_tick)
+            if win.count:
+                hold.update(win.mean)
+            next_tick += display_period_s
+        win.add(ts, max(0.0, force))
+    if next_tick is not None:
+        clock.advance_to(next_tick)
+        win.evict(next_tick)
+        if win.count:
+            hold.update(win.mean)
+        clock.advance_to(next_tick + hold.timer_s + hold.success_hold_s)  # let timers finish
+    return events
+
+def samples_from_recording(path: str):
+    """(ts_s, force_n) from a sample_recorder file."""
+    from sample_recorder import SampleFile, HAS_NUMPY
+    sf = SampleFile(path)
+    if HAS_NUMPY:
+        ts = sf.records["ts_ns"] / 1e9
+        return zip(ts.tolist(), sf.force_n().tolist())
+    newtons = sf.converter().newtons
+    return ((r[0] / 1e9, newtons(r[1])) for r in sf.iter_records())
+
+if __name__ == "__main__":
+    import argparse, sys
+    ap = argparse.ArgumentParser(description="Replay a recording through the hold-test logic (headless)")
+    ap.add_argument("path", help="Recording from sample_recorder.py / variant2 --record.")
+    ap.add_argument("--schmitt", type=str, required=True, help="ON:OFF thresholds in N, e.g. 3000:2700.")
+    ap.add_argument("--timer", type=int, default=TIMER_SECONDS, help=f"Hold time in s (default {TIMER_SECONDS}).")
+    ap.add_argument("--quiet", action="store_true", help="Only print the summary.")
+    args = ap.parse_args()
+    try:
+        on, off = map(float, args.schmitt.split(":"))
+    except Exception:
+        print("Bad --schmitt format, expected like 3000:2700", file=sys.stderr)
+        sys.exit(2)
+
+    t0 = time.perf_counter()
+    events = replay(samples_from_recording(args.path), on, off, timer_s=args.timer)
+    dt = time.perf_counter() - t0
+    if not args.quiet:
+        for kind, t, value in events:
+            if kind != "timer_tick":
+                print(f"{t:12.3f}  {kind:<13} {'' if value is None else value}")
+    n = {k: sum(1 for e in events if e[0] == k) for k in ("trigger_on", "timer_start", "success")}
+    print(f"triggers {n['trigger_on']}, timers {n['timer_start']}, successes {n['success']} "
+          f"(replayed in {dt:.2f} s)")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# One driver for every front end – probes the sensor once, then a single hot path
+# - probe()            finds the sensor on 0x6D (CRC) / 0x6C (plain), tells CRC mode
+#                      from the reply's CRC byte, the CRC byte order from STAT/PRESS
+#                      plausibility, and whether PRESS+STAT can be read as one block
+# - PTE7300Driver.open(busnum)  cached probe result (state file) -> driver on a
+#                      ResilientBus; re-probes only if the cached setup stops answering
+# - driver.sample()    START, wait for data-ready, read (status, raw) – the hot path,
+#                      with every bound helper picked once in __init__
+# - driver.reset() / start() / idle() / sleep() / read_status() / read_press()
+#
+# State file: $PTE7300_STATE or ~/.cache/pte7300/devices.json, one entry per bus
+# (and per address when one is forced).
+#
+# Example:
+#     dev = PTE7300Driver.open(0)          # or addr=0x6D, byteorder="little", ...
+#     dev.init()                           # reset, START, learn conversion time
+#     status, raw = dev.sample()
+#     python pte7300_driver.py --bus 0 --reprobe     (print what was found)
+
+import errno, json, os, sys, time
+from collections import namedtuple
+from functools import partial
+from smbus2 import SMBus, i2c_msg
+from pte_crc import crc8_word, req_crc
+from pte_conversion import ConversionWaiter, ContinuousReader, STAT_DATA_READY
+from pte_i2c import (ADDR_PLAIN, ADDR_CRC, REG_CMD, REG_PRESS, REG_STAT,
+                     CMD_RESET, CMD_START, CMD_IDLE, CMD_SLEEP, to_s16,
+                     read_word, write_word, crc_write_word, crc_read_word, crc_read_stat_press,
+                     read_press_stat_block, crc_read_press_stat_block)
+from pte_resilient import ResilientBus
+from pte_profile import profiler
+
+DEFAULT_STATE = os.environ.get("PTE7300_STATE", os.path.expanduser("~/.cache/pte7300/devices.json"))
+COUNTS_LIMIT = 17000      # |PRESS| stays within about ±16000 counts over the full scale
+RESET_SETTLE_S = 0.005
+
+Config = namedtuple("Config", "addr crc byteorder burst")
+
+# ---------------- probing ----------------
+def _raw_crc_word(bus, addr: int, reg: int) -> bytes:
+    write = i2c_msg.write(addr, [reg, req_crc(reg)])
+    read = i2c_msg.read(addr, 3)
+    bus.i2c_rdwr(write, read)
+    return bytes(read)
+
+def _answers(fn, tries: int = 3):
+    """Return fn() from the first try that does not raise an OSError, else None. NACK on every try -> None."""
+    for _ in range(tries):
+        try:
+            return fn()
+        except OSError:
+            continue
+    return None
+
+def _crc_ok(bus, addr: int, tries: int = 4) -> bool:
+    """Device at addr frames its replies with a valid CRC-8 (at least once, noise allowed)."""
+    for _ in range(tries):
+        try:
+            b = _raw_crc_word(bus, addr, REG_STAT)
+        except OSError:
+            continue
+        if crc8_word(b[0], b[1]) == b[2]:
+            return True
+    return False
+
+def detect_byteorder(bus, addr: int, reads: int = 8):
+    """
+    CRC replies are checked over the bytes as they arrive, so the CRC cannot tell
+    the order. STAT only uses its low byte (idle 0x0001, data-ready 0x0008): the
+    order that puts the non-zero byte low wins. If STAT is all zero, PRESS decides:
+    the order whose values stay within the count range and change least.
+    Returns "big" / "little", or None when nothing was conclusive.
+    """
+    votes = {"big": 0, "little": 0}
+    for attempt in range(2):
+        for _ in range(reads):
+            try:
+                b = _raw_crc_word(bus, addr, REG_STAT)
+            except OSError:
+                continue
+            if crc8_word(b[0], b[1]) != b[2]:
+                continue
+            if b[0] == 0 and b[1] != 0:
+                votes["big"] += 1
+            elif b[1] == 0 and b[0] != 0:
+                votes["little"] += 1
+        if votes["big"] != votes["little"]:
+            return max(votes, key=votes.get)
+        # STAT was 0: start a conversion so data-ready gets set, then look again
+        try:
+            crc_write_word(bus, addr, REG_CMD, CMD_START)
+        except OSError:
+            pass
+        time.sleep(RESET_SETTLE_S)
+
+    words = []
+    for _ in range(reads):
+        try:
+            b = _raw_crc_word(bus, addr, REG_PRESS)
+        except OSError:
+            continue
+        if crc8_word(b[0], b[1]) == b[2]:
+            words.append(b)
+    best, best_span = None, None
+    for order in ("big", "little"):
+        vals = [to_s16((b[0] << 8) | b[1] if order == "big" else (b[1] << 8) | b[0]) for b in words]
+        if not vals or any(abs(v) > COUNTS_LIMIT for v in vals):
+            continue
+        span = max(vals) - min(vals)
+        if best_span is None or span < best_span:
+            best, best_span = order, span
+    return best
+
+def _burst_ok(bus, addr: int, crc: bool, byteorder: str) -> bool:
+    """PRESS+STAT block read works and agrees with word reads."""
+    for _ in range(3):
+        try:
+            if crc:
+                crc_read_press_stat_block(bus, addr, byteorder)   # both words CRC-checked
+                return True
+            status_w = read_word(bus, addr, REG_STAT)
+            press_w = to_s16(read_word(bus, addr, REG_PRESS))
+            status_b, press_b = read_press_stat_block(bus, addr)
+        except OSError:
+            continue
+        mask = ~STAT_DATA_READY & 0xFFFF     # reading PRESS clears data-ready
+        return (status_b & mask) == (status_w & mask) and abs(press_b - press_w) < 2000
+    return False
+
+def probe(bus, addrs=(ADDR_CRC, ADDR_PLAIN), byteorder: str = None) -> Config:
+    """First address in addrs that answers like a PTE7300 -> Config. OSError(ENODEV) if none does."""
+    for addr in addrs:
+        if _answers(lambda: read_word(bus, addr, REG_STAT)) is None and \
+           _answers(lambda: _raw_crc_word(bus, addr, REG_STAT)) is None:
+            continue                       # nobody home
+        crc = _crc_ok(bus, addr)
+        if addr == ADDR_CRC and not crc:
+            continue                       # answers on the CRC address without CRC framing: not ours
+        order = "little"                   # plain words are LSB first (read_word_data)
+        if crc:
+            order = byteorder or detect_byteorder(bus, addr)
+            if order is None:
+                # guessing would silently swap the bytes of every sample
+                raise OSError(errno.EIO, f"PTE7300 at 0x{addr:02X}: CRC reply byte order not detectable, "
+                                         "give it explicitly (byteorder / --order)")
+        return Config(addr, crc, order, _burst_ok(bus, addr, crc, order))
+    raise OSError(errno.ENODEV, "no PTE7300 found at " + ", ".join(f"0x{a:02X}" for a in addrs))
+
+def verify(bus, cfg: Config) -> bool:
+    """Cached setup still answers (one STAT read, CRC-checked in CRC mode)."""
+    if cfg.crc:
+        return _crc_ok(bus, cfg.addr, tries=2)
+    return _answers(lambda: read_word(bus, cfg.addr, REG_STAT), tries=2) is not None
+
+# ---------------- state file ----------------
+def load_state(path: str = DEFAULT_STATE) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state: dict, path: str = DEFAULT_STATE) -> None:
+    """Atomic rewrite; a read-only home just means no cache."""
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _key(busnum: int, addr: int = None) -> str:
+    return f"i2c-{busnum}" if addr is None else f"i2c-{busnum}@0x{addr:02x}"
+
+# ---------------- driver ----------------
+class PTE7300Driver:
+    def __init__(self, bus, config: Config, busnum: int = None):
+        self.bus = bus
+        self.config = config
+        self.busnum = busnum
+        self.addr, self.crc, self.byteorder, self.burst = config
+        self.conv = None
+        self.cont = None
+        self.prof = profiler()
+        call = bus.call if isinstance(bus, ResilientBus) else (lambda fn, *a: fn(*a))
+        a = self.addr
+        # every helper bound once; the hot path is attribute lookups and one call
+        if self.crc:
+            self._command = partial(crc_write_word, bus, a, REG_CMD)
+            status = partial(crc_read_word, bus, a, REG_STAT, self.byteorder)
+            press = lambda: to_s16(crc_read_word(bus, a, REG_PRESS, self.byteorder))
+            both = partial(crc_read_press_stat_block if self.burst else crc_read_stat_press,
+                           bus, a, self.byteorder)
+        else:
+            self._command = partial(write_word, bus, a, REG_CMD)
+            status = partial(read_word, bus, a, REG_STAT)
+            press = lambda: to_s16(read_word(bus, a, REG_PRESS))
+            both = (partial(read_press_stat_block, bus, a) if self.burst
+                    else lambda: (read_word(bus, a, REG_STAT), to_s16(read_word(bus, a, REG_PRESS))))
+        self.read_status = partial(call, status)
+        self.read_press = partial(call, press)
+        self.read_stat_press = partial(call, both)        # -> (status, raw)
+        self.command = partial(call, self._command)
+
+    @classmethod
+    def open(cls, busnum: int, addr: int = None, byteorder: str = None, burst: bool = None,
+             state_path: str = DEFAULT_STATE, reprobe: bool = False, resilient: bool = True,
+             bus_factory=SMBus):
+        """
+        Open bus `busnum` and find the sensor (addr=None tries 0x6D, then 0x6C).
+        The probe result is cached in state_path; byteorder / burst given here
+        override what was detected but are not cached (other programs share the file).
+        """
+        raw = bus_factory(busnum)
+        key = _key(busnum, addr)
+        state = load_state(state_path) if state_path else {}
+        cfg = None
+        if not reprobe and key in state:
+            try:
+                cfg = Config(**{f: state[key][f] for f in Config._fields})
+            except (KeyError, TypeError):
+                cfg = None
+            if cfg is not None and not verify(raw, cfg):
+                cfg = None
+        if cfg is None:
+            addrs = (addr,) if addr is not None else (ADDR_CRC, ADDR_PLAIN)
+            detected = True
+            try:
+                try:
+                    cfg = probe(raw, addrs)
+                except OSError as e:
+                    if byteorder is None or e.errno != errno.EIO:
+                        raise
+                    cfg = probe(raw, addrs, byteorder)    # order not detectable: the given one, uncached
+                    detected = False
+            except OSError:
+                raw.close()
+                raise
+            if state_path and detected:
+                state[key] = dict(cfg._asdict(), probed=time.strftime("%Y-%m-%d %H:%M:%S"))
+                save_state(state, state_path)
+        if byteorder is not None and cfg.crc:
+            cfg = cfg._replace(byteorder=byteorder)
+        if burst is not None:
+            cfg = cfg._replace(burst=burst)
+        bus = raw
+        if resilient:
+            bus = ResilientBus(raw, cfg.addr, crc=cfg.crc, bus_factory=lambda: bus_factory(busnum))
+        return cls(bus, cfg, busnum)
+
+    # ---- commands ----
+    def reset(self) -> None:
+        self.command(CMD_RESET)
+        if self.cont is not None:
+            self.cont.disarm()
+
+    def start(self) -> None:
+        self.command(CMD_START)
+        if self.cont is not None:
+            self.cont.mark_armed()
+
+    def idle(self) -> None:
+        self.command(CMD_IDLE)
+        if self.cont is not None:
+            self.cont.pause()
+
+    def sleep(self) -> None:
+        self.command(CMD_SLEEP)
+        if self.cont is not None:
+            self.cont.pause()
+
+    def init(self, calibrate: bool = True, continuous: bool = False) -> None:
+        """Soft reset, START, learn the conversion time; continuous=True keeps converting after one START."""
+        self.command(CMD_RESET)
+        time.sleep(RESET_SETTLE_S)
+        self.command(CMD_START)
+        self.conv = ConversionWaiter(self.read_status)
+        if calibrate:
+            self.conv.calibrate(partial(self.command, CMD_START))
+        if continuous:
+            self.cont = ContinuousReader(partial(self.command, CMD_START), self.read_stat_press)
+            if isinstance(self.bus, ResilientBus):
+                self.bus.on_reset = self.cont.mark_armed   # its recovery already sent START
+
+    # ---- hot path ----
+    def sample(self):
+        """One measurement -> (status, raw). On demand: START, wait for data-ready, read."""
+        prof = self.prof
+        if self.cont is not None:
+            with prof.span("read"):
+                return self.cont.read()
+        with prof.span("start"):
+            self.command(CMD_START)
+        with prof.span("conv_wait"):
+            status = self.conv.wait() if self.conv is not None else None
+        with prof.span("read"):
+            if self.burst or status is None:
+                return self.read_stat_press()
+            return status, self.read_press()
+
+    def describe(self) -> str:
+        mode = f"CRC, {self.byteorder} endian" if self.crc else "no CRC"
+        return f"PTE7300 at 0x{self.addr:02X} ({mode}, {'block' if self.burst else 'word'} reads)"
+
+    def close(self) -> None:
+        self.bus.close()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Probe a PTE7300 and show the cached driver setup")
+    ap.add_argument("--bus", type=int, default=0, help="I2C bus number (default 0).")
+    ap.add_argument("--addr", type=lambda x: int(x, 0), default=None, help="Only try this address.")
+    ap.add_argument("--order", choices=("big", "little"), default=None,
+                    help="CRC reply byte order (default: detected).")
+    ap.add_argument("--reprobe", action="store_true", help="Ignore the state file and probe again.")
+    ap.add_argument("--state", type=str, default=None,
+                    help=f"State file (default {DEFAULT_STATE}; none with --fake).")
+    ap.add_argument("-n", type=int, default=0, help="Also take n samples and report the rate.")
+    ap.add_argument("--fake", type=str, default=None, metavar="ADDR:ORDER",
+                    help="Probe the simulated sensor instead, e.g. 0x6d:little.")
+    args = ap.parse_args()
+
+    factory = SMBus
+    if args.fake:
+        from fake_pte7300 import FakePTE7300, FakeSMBus
+        a, _, order = args.fake.partition(":")
+        fake = FakePTE7300(int(a, 0), byteorder=order or "big")
+        factory = lambda n: FakeSMBus(n, [fake])
+    if args.state is None:
+        args.state = None if args.fake else DEFAULT_STATE   # never cache the simulated sensor
+    t0 = time.perf_counter()
+    try:
+        dev = PTE7300Driver.open(args.bus, args.addr, byteorder=args.order, state_path=args.state,
+                                 reprobe=args.reprobe, bus_factory=factory)
+    except OSError as e:
+        print(f"i2c-{args.bus}: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"i2c-{args.bus}: {dev.describe()}  ({(time.perf_counter() - t0) * 1e3:.1f} ms)")
+    if args.n:
+        dev.init()
+        t0 = time.perf_counter()
+        for _ in range(args.n):
+            status, raw = dev.sample()
+        dt = time.perf_counter() - t0
+        print(f"{args.n / dt:.0f} samples/s, last status 0x{status:04X} raw {raw:+d}")
+    dev.close()
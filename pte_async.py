@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# asyncio PTE7300 driver – many sensors on one host
+# - BusWorker      one thread per /dev/i2c-N; every call for that bus runs there,
+#                  so transfers on one bus are serialized and buses run in parallel
+# - AsyncPTE7300   one sensor (bus worker + address): read_pressure(), read_status(),
+#                  start()/idle()/sleep()/reset()
+# - sample_stream() samples a list of sensors concurrently and yields one merged stream
+#
+# The conversion wait is an asyncio.sleep(), so while one sensor converts the
+# bus worker is free for the others.
+#
+# Example: python pte_async.py --sensor 0:0x6c --sensor 1:0x6d
+
+import asyncio, time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from smbus2 import SMBus
+from pte_i2c import (ADDR_CRC, REG_CMD, REG_PRESS, REG_STAT,
+                     CMD_RESET, CMD_START, CMD_IDLE, CMD_SLEEP,
+                     read_word, write_word, crc_read_word, crc_write_word,
+                     crc_read_stat_press, to_s16)
+
+Sample = namedtuple("Sample", "ts bus addr status raw")
+
+class BusWorker:
+    def __init__(self, busnum: int, bus_factory=SMBus):
+        self.busnum = busnum
+        self._factory = bus_factory
+        self._bus = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"i2c-{busnum}")
+
+    def _call(self, fn, args):
+        if self._bus is None:
+            self._bus = self._factory(self.busnum)  # opened in the worker thread
+        return fn(self._bus, *args)
+
+    async def call(self, fn, *args):
+        """Run fn(bus, *args) on this bus' worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    def _close_bus(self):
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
+
+    def close(self):
+        """Blocking close, for use outside the event loop."""
+        self._executor.submit(self._close_bus).result()
+        self._executor.shutdown(wait=True)
+
+    async def aclose(self):
+        """Close from the event loop: waits for the worker without blocking other tasks."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_bus)
+        self._executor.shutdown(wait=False)   # nothing queued behind the close any more
+
+class AsyncPTE7300:
+    def __init__(self, worker: BusWorker, addr: int, crc: bool = None,
+                 byteorder: str = "big", conversion_s: float = 0.003):
+        self.worker = worker
+        self.addr = addr
+        self.crc = (addr == ADDR_CRC) if crc is None else crc
+        self.byteorder = byteorder
+        self.conversion_s = conversion_s
+
+    # ---- register access ----
+    async def _read_u16(self, reg: int) -> int:
+        if self.crc:
+            return await self.worker.call(crc_read_word, self.addr, reg, self.byteorder)
+        return await self.worker.call(read_word, self.addr, reg)
+
+    async def _command(self, value: int) -> None:
+        fn = crc_write_word if self.crc else write_word
+        await self.worker.call(fn, self.addr, REG_CMD, value)
+
+    async def read_pressure(self) -> int:
+        return to_s16(await self._read_u16(REG_PRESS))
+
+    async def read_status(self) -> int:
+        return await self._read_u16(REG_STAT)
+
+    async def read_stat_press(self):
+        """(status, raw) – one worker round trip (one i2c_rdwr call in CRC mode)."""
+        if self.crc:
+            return await self.worker.call(crc_read_stat_press, self.addr, self.byteorder)
+        def _both(bus, addr):
+            return read_word(bus, addr, REG_STAT), to_s16(read_word(bus, addr, REG_PRESS))
+        return await self.worker.call(_both, self.addr)
+
+    # ---- commands ----
+    async def start(self):
+        await self._command(CMD_START)
+
+    async def idle(self):
+        await self._command(CMD_IDLE)
+
+    async def sleep(self):
+        await self._command(CMD_SLEEP)
+
+    async def reset(self):
+        await self._command(CMD_RESET)
+
+    async def reset_then_start(self):
+        await self.reset()
+        await asyncio.sleep(0.005)
+        await self.start()
+
+    async def sample(self) -> Sample:
+        """START, wait for the conversion without holding the bus, read STAT + PRESS."""
+        await self.start()
+        await asyncio.sleep(self.conversion_s)
+        status, raw = await self.read_stat_press()
+        return Sample(time.monotonic(), self.worker.busnum, self.addr, status, raw)
+
+async def _poll_sensor(sensor: AsyncPTE7300, interval_s: float, out: asyncio.Queue, errors: dict):
+    loop = asyncio.get_running_loop()
+    next_t = loop.time()
+    while True:
+        try:
+            await out.put(await sensor.sample())
+        except Exception:
+            key = (sensor.worker.busnum, sensor.addr)
+            errors[key] = errors.get(key, 0) + 1
+        next_t += interval_s
+        await asyncio.sleep(max(0.0, next_t - loop.time()))
+
+async def sample_stream(sensors, interval_s: float, errors: dict = None, maxsize: int = 1024):
+    """
+    Async generator: samples every sensor every interval_s seconds (concurrently)
+    and yields Sample tuples in arrival order. Read errors are counted in
+    errors[(bus, addr)] and skipped.
+    """
+    out = asyncio.Queue(maxsize)
+    if errors is None:
+        errors = {}
+    tasks = [asyncio.create_task(_poll_sensor(s, interval_s, out, errors)) for s in sensors]
+    try:
+        while True:
+            yield await out.get()
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _main(specs, interval_s: float, duration_s: float):
+    workers = {}
+    sensors = []
+    for busnum, addr in specs:
+        if busnum not in workers:
+            workers[busnum] = BusWorker(busnum)
+        sensors.append(AsyncPTE7300(workers[busnum], addr))
+    for s in sensors:
+        await s.reset_then_start()
+
+    errors = {}
+    n = 0
+    t_end = time.monotonic() + duration_s
+    stream = sample_stream(sensors, interval_s, errors)
+    try:
+        async for smp in stream:
+            n += 1
+            print(f"{smp.ts:.3f} bus {smp.bus} 0x{smp.addr:02X}  STAT 0x{smp.status:04X}  RAW {smp.raw:+d}")
+            if time.monotonic() >= t_end:
+                break
+    finally:
+        # stop the poll tasks before their workers go away (break leaves the generator open)
+        await stream.aclose()
+        for w in workers.values():
+            await w.aclose()
+    print(f"{n} samples in {duration_s:.1f} s ({n / duration_s:.1f}/s), errors: {errors}")
+
+if __name__ == "__main__":
+    import argparse
+    def sensor_spec(txt):
+        bus, addr = txt.split(":")
+        return int(bus), int(addr, 0)
+    ap = argparse.ArgumentParser(description="Poll several PTE7300 sensors with asyncio")
+    ap.add_argument("--sensor", type=sensor_spec, action="append", required=True,
+                    help="bus:addr, e.g. 0:0x6c (repeat for more sensors).")
+    ap.add_argument("--interval", type=int, default=80, help="Sample interval per sensor in ms (default 80).")
+    ap.add_argument("--duration", type=float, default=5.0, help="Run time in s (default 5).")
+    args = ap.parse_args()
+    asyncio.run(_main(args.sensor, args.interval / 1000.0, args.duration))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Adaptive conversion wait for the PTE7300
+# Instead of a fixed sleep after START, poll the status register until the
+# "new pressure value" bit is set. The typical conversion time is learned per
+# device at startup (calibrate()) and refined while running, so we sleep for
+# most of it and only poll over the last part.
+#
+# If the status bit is never seen (other firmware / wrong mask), the waiter
+# falls back to the old fixed sleep, so it is always safe to use. A wait that
+# times out raises ConversionTimeout (PRESS would be stale – skip the sample);
+# max_timeouts of them in a row also switch to the fixed sleep.
+#
+# ContinuousReader is the other option: START once, then only read.
+
+import time
+import pte_metrics
+
+# STATUS_SYNC (0x32) bit 3: DSP_S updated since the last read
+STAT_DATA_READY = 0x0008
+
+class ConversionTimeout(IOError):
+    """Data-ready never showed up: the pressure register still holds the previous value."""
+
+class ConversionWaiter:
+    def __init__(self, read_status, ready_mask: int = STAT_DATA_READY,
+                 default_s: float = 0.003, timeout_s: float = 0.020,
+                 poll_s: float = 0.0002, min_s: float = 0.0003, max_timeouts: int = 5):
+        self.read_status = read_status   # callable -> STATUS word
+        self.ready_mask = ready_mask
+        self.default_s = default_s       # old fixed sleep, used when polling is off
+        self.timeout_s = timeout_s
+        self.poll_s = poll_s
+        self.min_s = min_s               # never look before this (stale flag guard)
+        self.learned_s = None            # typical conversion time of this device
+        self.max_timeouts = max_timeouts # timeouts in a row before falling back to the fixed sleep
+        self.polling = True
+        self.timeouts = 0
+        self.timeouts_in_row = 0
+        self.polls = 0
+
+    def _poll_until_ready(self, t0: float, first_delay: float):
+        """Returns (status, elapsed_s) or (last_status, None) on timeout."""
+        if first_delay > 0:
+            time.sleep(first_delay)
+        status = None
+        while True:
+            status = self.read_status()
+            self.polls += 1
+            elapsed = time.perf_counter() - t0
+            if status & self.ready_mask:
+                return status, elapsed
+            if elapsed >= self.timeout_s:
+                return status, None
+            time.sleep(self.poll_s)
+
+    def calibrate(self, start, trials: int = 8) -> float:
+        """
+        Measure the conversion time: START, poll from min_s on, repeat.
+        Sets learned_s to the median; turns polling off if the bit never shows up.
+        """
+        times = []
+        for _ in range(trials):
+            start()
+            t0 = time.perf_counter()
+            try:
+                _, elapsed = self._poll_until_ready(t0, self.min_s)
+            except Exception:
+                continue
+            if elapsed is not None:
+                times.append(elapsed)
+        if not times:
+            self.polling = False
+            self.learned_s = None
+            return self.default_s
+        times.sort()
+        self.learned_s = times[len(times) // 2]
+        return self.learned_s
+
+    def period(self) -> float:
+        """Best known conversion time in seconds."""
+        return self.learned_s if self.learned_s is not None else self.default_s
+
+    def wait(self):
+        """
+        Block until the conversion started just before is done.
+        Returns the STATUS word read while polling, or None when running in
+        fixed-sleep mode (the caller then reads STAT itself if it needs it).
+        Raises ConversionTimeout when the data-ready bit did not come in timeout_s.
+        """
+        if not self.polling:
+            time.sleep(self.default_s)
+            return None
+        t0 = time.perf_counter()
+        guess = self.learned_s if self.learned_s is not None else self.min_s
+        # sleep for most of the expected time, poll the rest
+        status, elapsed = self._poll_until_ready(t0, max(self.min_s, guess * 0.85))
+        if elapsed is None:
+            self.timeouts += 1
+            self.timeouts_in_row += 1
+            if pte_metrics.registry is not None:
+                pte_metrics.registry.inc("conversion_timeout")
+            if self.timeouts_in_row >= self.max_timeouts:
+                # the bit stopped showing up: do not wait out the timeout on every sample
+                self.polling = False
+                if pte_metrics.registry is not None:
+                    pte_metrics.registry.inc("conversion_fixed_fallback")
+            raise ConversionTimeout(f"no data-ready after {self.timeout_s * 1e3:.0f} ms (STAT 0x{status:04X})")
+        self.timeouts_in_row = 0
+        if self.learned_s is not None:
+            self.learned_s += 0.05 * (elapsed - self.learned_s)
+        return status
+
+class ContinuousReader:
+    """
+    Continuous-conversion acquisition: START is sent once (arm) and after that
+    every sample is just a read. The reader re-arms by itself when
+    - nothing has armed it yet or the sensor was reset (disarm()),
+    - no new conversion showed up for stall_s: with (status, raw) reads a new
+      conversion is the data-ready bit; until that bit has been seen once on
+      this read path (a block read from PRESS may clear it first) a changed
+      value is the only proof, so a perfectly steady reading re-arms every stall_s.
+    An unchanged value alone is not a stall – a steady pressure gives the same counts.
+    pause() (after IDLE/SLEEP) stops automatic re-arming until the next START.
+    read_fn may return anything comparable (raw, or (status, raw)).
+    """
+    def __init__(self, start, read_fn, stall_s: float = 1.0, ready_mask: int = STAT_DATA_READY,
+                 clock=time.monotonic):
+        self.start = start
+        self.read_fn = read_fn
+        self.stall_s = stall_s
+        self.ready_mask = ready_mask
+        self.clock = clock
+        self.armed = False
+        self.paused = False
+        self.sees_ready = False          # read_fn's status has shown data-ready at least once
+        self.rearms = 0
+        self.stalls = 0
+        self._last = None
+        self._fresh_t = None             # when the last new conversion was seen
+
+    def arm(self) -> None:
+        self.start()
+        self.mark_armed()
+        self.rearms += 1
+
+    def mark_armed(self) -> None:
+        """Caller has just sent START itself."""
+        self.armed = True
+        self.paused = False
+        self._last = None
+        self._fresh_t = self.clock()
+
+    def disarm(self) -> None:
+        """Sensor was reset; the next read re-arms it."""
+        self.armed = False
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def _fresh(self, value) -> bool:
+        """value comes from a conversion the previous read did not see."""
+        if isinstance(value, tuple):
+            if value[0] & self.ready_mask:
+                self.sees_ready = True
+                return True
+            if self.sees_ready:
+                return False
+        return value != self._last
+
+    def read(self):
+        if not self.armed and not self.paused:
+            self.arm()
+        value = self.read_fn()
+        now = self.clock()
+        if self._fresh(value):
+            self._fresh_t = now
+        elif not self.paused and self._fresh_t is not None and now - self._fresh_t >= self.stall_s:
+            self.stalls += 1
+            if pte_metrics.registry is not None:
+                pte_metrics.registry.inc("continuous_stall")
+            self.arm()
+        self._last = value
+        return value
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# PTE7300 CRC-8 (poly 0x31, init 0xFF) – table driven
+# - crc8()              drop-in replacement for the old bit-loop version
+# - REQ_CRC / req_crc() cached CRC of the register byte sent before a CRC read
+# - check_frames()      checks many [b0, b1, crc] frames from one buffer in a single call
+#
+# Run this file directly for a micro-benchmark against the bit-loop implementation.
+
+CRC8_POLY = 0x31
+CRC8_INIT = 0xFF
+
+REG_CMD   = 0x22
+REG_PRESS = 0x30
+REG_STAT  = 0x32
+
+def _make_table(poly: int = CRC8_POLY) -> bytes:
+    table = bytearray(256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ poly) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+        table[i] = crc
+    return bytes(table)
+
+CRC8_TABLE = _make_table()
+
+# CRC of a 2-byte word, indexed by (b0 << 8) | b1 – built lazily, 64 KiB
+_WORD_TABLE = None
+
+def crc8(data) -> int:
+    """CRC-8 over bytes/bytearray/memoryview (or a list of ints)."""
+    crc = CRC8_INIT
+    t = CRC8_TABLE
+    for byte in data:
+        crc = t[crc ^ byte]
+    return crc
+
+def crc8_word(b0: int, b1: int) -> int:
+    """CRC-8 of exactly two data bytes, in the order they are on the wire."""
+    t = CRC8_TABLE
+    return t[t[CRC8_INIT ^ b0] ^ b1]
+
+# Register byte CRCs for the fixed registers; the request frame is [reg, crc(reg)]
+REQ_CRC = {reg: crc8(bytes([reg])) for reg in (REG_CMD, REG_PRESS, REG_STAT)}
+
+def req_crc(reg: int) -> int:
+    """CRC of a single register byte (cached for REG_CMD/REG_PRESS/REG_STAT)."""
+    c = REQ_CRC.get(reg)
+    if c is None:
+        c = CRC8_TABLE[CRC8_INIT ^ reg]
+        REQ_CRC[reg] = c
+    return c
+
+def _word_table() -> bytes:
+    global _WORD_TABLE
+    if _WORD_TABLE is None:
+        t = CRC8_TABLE
+        rows = [t[CRC8_INIT ^ b0] for b0 in range(256)]
+        _WORD_TABLE = bytes(t[r ^ b1] for r in rows for b1 in range(256))
+    return _WORD_TABLE
+
+def check_frames(buf, frame_size: int = 3) -> list:
+    """
+    Check a buffer of consecutive [b0, b1, crc] frames (e.g. a block read in CRC mode).
+    Returns the indexes of the frames whose CRC does not match (empty list = all good).
+    Trailing bytes that do not fill a whole frame are ignored.
+    """
+    mv = memoryview(buf).cast("B")
+    wt = _word_table()
+    bad = []
+    n = len(mv) - len(mv) % frame_size
+    idx = 0
+    for i in range(0, n, frame_size):
+        if wt[(mv[i] << 8) | mv[i + 1]] != mv[i + 2]:
+            bad.append(idx)
+        idx += 1
+    return bad
+
+def frames_ok(buf, frame_size: int = 3) -> bool:
+    """True when every 3-byte frame in buf has a valid CRC."""
+    mv = memoryview(buf).cast("B")
+    wt = _word_table()
+    n = len(mv) - len(mv) % frame_size
+    for i in range(0, n, frame_size):
+        if wt[(mv[i] << 8) | mv[i + 1]] != mv[i + 2]:
+            return False
+    return True
+
+# ---------------- micro-benchmark ----------------
+def _crc8_bitloop(data: bytes) -> int:
+    # original implementation from PTE7300.py / Proov1
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x31) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+    return crc
+
+def _bench(n_frames: int = 20000) -> None:
+    import os, time
+
+    payload = bytearray(os.urandom(2 * n_frames))
+    buf = bytearray()
+    for i in range(n_frames):
+        w = bytes(payload[2 * i:2 * i + 2])
+        buf += w + bytes([_crc8_bitloop(w)])
+    buf = bytes(buf)
+    assert all(crc8(bytes([i, j])) == _crc8_bitloop(bytes([i, j]))
+               for i in range(256) for j in (0, 0x5A, 0xFF))
+    assert frames_ok(buf)
+
+    def timeit(label, fn):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        print(f"{label:<34} {dt * 1e3:8.2f} ms   {dt / n_frames * 1e9:8.0f} ns/frame")
+
+    def per_frame(f):
+        def run():
+            for i in range(0, len(buf), 3):
+                if f(buf[i:i + 2]) != buf[i + 2]:
+                    raise IOError("CRC mismatch")
+        return run
+
+    def per_frame_word():
+        for i in range(0, len(buf), 3):
+            if crc8_word(buf[i], buf[i + 1]) != buf[i + 2]:
+                raise IOError("CRC mismatch")
+
+    _word_table()  # build outside the timed section
+    print(f"{n_frames} frames of [b0, b1, crc]")
+    timeit("bit-loop crc8 (old)", per_frame(_crc8_bitloop))
+    timeit("table crc8", per_frame(crc8))
+    timeit("crc8_word", per_frame_word)
+    timeit("check_frames (bulk)", lambda: check_frames(buf))
+    timeit("frames_ok (bulk)", lambda: frames_ok(buf))
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="CRC-8 micro-benchmark (table vs bit-loop)")
+    ap.add_argument("--frames", type=int, default=20000, help="Number of 3-byte frames (default 20000).")
+    _bench(ap.parse_args().frames)
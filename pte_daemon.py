@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# Headless acquisition daemon – owns the bus, serves samples over a Unix socket
+# - PTE7300Daemon  samples one sensor in an AcquisitionThread, answers requests
+#                  from any number of local clients (one select() loop)
+# - DaemonClient   blocking client: info(), latest(), subscribe() + samples()
+# - DaemonFeed     thread for the GUIs: subscribes and fills their SampleRing
+#
+# Wire format (little endian). Requests are one opcode byte:
+#     0x01 INFO   0x02 LATEST   0x03 SUBSCRIBE   0x04 UNSUBSCRIBE
+# Replies/stream are frames [type u8][len u8][payload]:
+#     0x81 INFO    bus u8, addr u8, crc u8, fs_min_in_bar u8,
+#                  fs_min, fs_max, n_per_bar, zero_offset_n, interval_s (f64)
+#     0x82 SAMPLE  seq u64, ts_ns i64 (time.monotonic_ns, same clock as the GUIs and shm_ring), raw i16, status u16
+#     0x83 NONE    no sample yet (reply to LATEST)
+# Each sample is encoded once and the same bytes go to every subscriber; clients
+# never cause I2C traffic.
+#
+# Example:
+#     python pte_daemon.py --bus 0 --fs 0:40        (sensor probed on 0x6d/0x6c, cached)
+#     python pte_daemon.py --client                (print the stream)
+#     python pte_daemon.py --shm pte7300           (also fill a shared-memory ring)
+#     python variant2.py --daemon /tmp/pte7300.sock
+
+import os, selectors, socket, struct, sys, threading, time
+from collections import namedtuple
+from smbus2 import SMBus
+from acquisition import SampleRing, AcquisitionThread
+from force_lut import ForceConverter
+from calibration import load_calibration, sensor_key
+from pte7300_driver import PTE7300Driver, DEFAULT_STATE
+from pte_profile import profiler
+from shm_ring import ShmRingWriter
+
+DEFAULT_SOCKET = os.environ.get("PTE7300_SOCKET", "/tmp/pte7300.sock")
+
+OP_INFO        = 0x01
+OP_LATEST      = 0x02
+OP_SUBSCRIBE   = 0x03
+OP_UNSUBSCRIBE = 0x04
+
+T_INFO   = 0x81
+T_SAMPLE = 0x82
+T_NONE   = 0x83
+
+FRAME_HDR   = struct.Struct("<BB")
+INFO_FMT    = struct.Struct("<BBBBddddd")
+SAMPLE_FMT  = struct.Struct("<QqhH")
+SAMPLE_FRAME = FRAME_HDR.size + SAMPLE_FMT.size   # 22 bytes
+
+MAX_BACKLOG = 64 * 1024   # bytes queued for one slow subscriber before it is dropped
+
+DaemonSample = namedtuple("DaemonSample", "seq ts status raw")
+
+def _frame(kind: int, payload: bytes = b"") -> bytes:
+    return FRAME_HDR.pack(kind, len(payload)) + payload
+
+def encode_sample(seq: int, ts: float, status: int, raw: int) -> bytes:
+    return FRAME_HDR.pack(T_SAMPLE, SAMPLE_FMT.size) + SAMPLE_FMT.pack(seq, int(ts * 1e9), raw, status)
+
+# ---------------- server ----------------
+class _Client:
+    __slots__ = ("sock", "out", "subscribed")
+    def __init__(self, sock):
+        self.sock = sock
+        self.out = bytearray()
+        self.subscribed = False
+
+class PTE7300Daemon:
+    def __init__(self, busnum: int, addr: int = None, interval_s: float = 0.08,
+                 fs_min: float = 0.0, fs_max: float = 40.0, n_per_bar: float = 1500.0 / 3.3,
+                 zero_offset_n: float = 0.0, offset_by_fs_min: bool = False,
+                 byteorder: str = None, socket_path: str = DEFAULT_SOCKET,
+                 ring_size: int = 4096, shm_name: str = None, bus_factory=SMBus,
+                 state_path: str = DEFAULT_STATE, calibration_path: str = None):
+        self.busnum = busnum
+        self.interval_s = interval_s
+        self.socket_path = socket_path
+        # address / CRC mode / byte order probed (or taken from the state file); the driver's bus
+        # retries CRC/NACK, backs off and soft-resets + STARTs the sensor when errors persist
+        self.dev = PTE7300Driver.open(busnum, addr, byteorder=byteorder, state_path=state_path,
+                                      bus_factory=bus_factory)
+        self.addr = self.dev.addr
+        # multi-point curves for this sensor replace the linear maps in the tables; INFO still
+        # carries the linear parameters, clients wanting the same N load the same file
+        table = load_calibration(calibration_path, sensor_key(busnum, self.addr)) if calibration_path else None
+        self.lut = ForceConverter(fs_min, fs_max, n_per_bar, zero_offset_n, offset_by_fs_min, table=table)
+        self._info = _frame(T_INFO, INFO_FMT.pack(busnum & 0xFF, self.addr & 0xFF, int(self.dev.crc),
+                                                  int(offset_by_fs_min), fs_min, fs_max, n_per_bar,
+                                                  zero_offset_n, interval_s))
+        self.ring = SampleRing(ring_size)
+        self.dev.init()
+
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        # optional shared-memory ring for zero-copy local readers (see shm_ring.py)
+        self.shm = None
+        self._publish = None
+        if shm_name:
+            self.shm = ShmRingWriter(shm_name, ring_size, fs_min, fs_max, n_per_bar, zero_offset_n)
+            self._publish = self.shm.publish_from(self.ring)
+        self.acq = AcquisitionThread(self._sample_once, self.ring, interval_s, on_sample=self._on_sample)
+        self._sel = selectors.DefaultSelector()
+        self._clients = {}
+        self._sent_seq = 0
+        self._running = False
+        self.dropped_clients = 0
+        self.prof = profiler()
+
+    # ---- acquisition (runs in the AcquisitionThread) ----
+    def _sample_once(self):
+        status, raw = self.dev.sample()     # start / conv_wait / read spans in the driver
+        with self.prof.span("convert"):
+            p_bar, force = self.lut.convert(raw)
+        return time.monotonic(), force, status, raw, p_bar
+
+    def _on_sample(self) -> None:
+        with self.prof.span("publish"):
+            if self._publish is not None:
+                self._publish()
+            self._wake()
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass   # loop is already behind and will see every sample anyway
+
+    # ---- socket side ----
+    def _listen(self) -> socket.socket:
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        srv.bind(self.socket_path)
+        srv.listen(128)
+        srv.setblocking(False)
+        return srv
+
+    def _accept(self, srv) -> None:
+        while True:
+            try:
+                sock, _ = srv.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            c = _Client(sock)
+            self._clients[sock.fileno()] = c
+            self._sel.register(sock, selectors.EVENT_READ, c)
+
+    def _drop(self, c: _Client) -> None:
+        self._clients.pop(c.sock.fileno(), None)
+        try:
+            self._sel.unregister(c.sock)
+        except (KeyError, ValueError):
+            pass
+        c.sock.close()
+
+    def _send(self, c: _Client, data: bytes) -> None:
+        if c.out:
+            c.out += data
+        else:
+            try:
+                n = c.sock.send(data)
+            except BlockingIOError:
+                n = 0
+            except OSError:
+                self._drop(c)
+                return
+            if n < len(data):
+                c.out += data[n:]
+        if len(c.out) > MAX_BACKLOG:
+            self.dropped_clients += 1
+            self._drop(c)
+        elif c.out:
+            self._sel.modify(c.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, c)
+
+    def _flush(self, c: _Client) -> None:
+        try:
+            n = c.sock.send(c.out)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(c)
+            return
+        del c.out[:n]
+        if not c.out:
+            self._sel.modify(c.sock, selectors.EVENT_READ, c)
+
+    def _latest_frame(self) -> bytes:
+        latest = self.ring.latest_seq()     # seq and sample from the same slot
+        if latest is None:
+            return _frame(T_NONE)
+        seq, s = latest
+        return encode_sample(seq, s[0], s[2], s[3])
+
+    def _handle(self, c: _Client) -> None:
+        try:
+            data = c.sock.recv(256)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(c)
+            return
+        for op in data:
+            if op == OP_INFO:
+                self._send(c, self._info)
+            elif op == OP_LATEST:
+                self._send(c, self._latest_frame())
+            elif op == OP_SUBSCRIBE:
+                c.subscribed = True
+            elif op == OP_UNSUBSCRIBE:
+                c.subscribed = False
+            if c.sock.fileno() not in self._clients:
+                return
+
+    def _broadcast(self) -> None:
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        nxt, fresh = self.ring.read_from(self._sent_seq)
+        self._sent_seq = nxt
+        if not fresh:
+            return
+        first = nxt - len(fresh)
+        data = b"".join(encode_sample(first + i, s[0], s[2], s[3]) for i, s in enumerate(fresh))
+        for c in list(self._clients.values()):
+            if c.subscribed:
+                self._send(c, data)
+
+    def serve_forever(self) -> None:
+        srv = self._listen()
+        self._sel.register(srv, selectors.EVENT_READ, "listen")
+        self._sel.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._running = True
+        self.acq.start()
+        try:
+            while self._running:
+                for key, mask in self._sel.select(timeout=1.0):
+                    if key.data == "listen":
+                        self._accept(srv)
+                    elif key.data == "wake":
+                        self._broadcast()
+                    else:
+                        c = key.data
+                        if mask & selectors.EVENT_WRITE and c.out:
+                            self._flush(c)
+                        if mask & selectors.EVENT_READ and c.sock.fileno() in self._clients:
+                            self._handle(c)
+        finally:
+            self.close(srv)
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake()
+
+    def close(self, srv=None) -> None:
+        self.acq.stop()
+        for c in list(self._clients.values()):
+            self._drop(c)
+        if srv is not None:
+            srv.close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self._sel.close()
+        if self.shm is not None:
+            self.shm.close()
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        try:
+            self.dev.close()
+        except Exception:
+            pass
+
+# ---------------- client ----------------
+class DaemonClient:
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: float = 2.0):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._buf = bytearray()
+        self._info = None
+        self._pending = []     # stream samples that arrived while waiting for a reply
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _recv_frame(self):
+        buf = self._buf
+        while True:
+            if len(buf) >= 2:
+                kind, n = buf[0], buf[1]
+                if len(buf) >= 2 + n:
+                    payload = bytes(buf[2:2 + n])
+                    del buf[:2 + n]
+                    return kind, payload
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("pte7300 daemon closed the connection")
+            buf += chunk
+
+    def _request(self, op: int, want: tuple):
+        self.sock.sendall(bytes([op]))
+        while True:
+            kind, payload = self._recv_frame()
+            if kind in want:
+                return kind, payload
+            if kind == T_SAMPLE:
+                self._pending.append(self._decode(payload))
+
+    @staticmethod
+    def _decode(payload: bytes) -> DaemonSample:
+        seq, ts_ns, raw, status = SAMPLE_FMT.unpack(payload)
+        return DaemonSample(seq, ts_ns / 1e9, status, raw)
+
+    def info(self) -> dict:
+        if self._info is None:
+            _, p = self._request(OP_INFO, (T_INFO,))
+            bus, addr, crc, with_min, fs_min, fs_max, npb, off, interval = INFO_FMT.unpack(p)
+            self._info = {"bus": bus, "addr": addr, "crc": bool(crc), "offset_by_fs_min": bool(with_min),
+                          "fs_min": fs_min, "fs_max": fs_max, "n_per_bar": npb,
+                          "zero_offset_n": off, "interval_s": interval}
+        return self._info
+
+    def converter(self, table=None) -> ForceConverter:
+        """Tables for the daemon's linear calibration; table = the multi-point curves it was started with."""
+        i = self.info()
+        return ForceConverter(i["fs_min"], i["fs_max"], i["n_per_bar"], i["zero_offset_n"],
+                              i["offset_by_fs_min"], table=table)
+
+    def latest(self):
+        """Newest DaemonSample or None if the daemon has no sample yet."""
+        kind, p = self._request(OP_LATEST, (T_SAMPLE, T_NONE))
+        return self._decode(p) if kind == T_SAMPLE else None
+
+    def subscribe(self) -> None:
+        self.sock.sendall(bytes([OP_SUBSCRIBE]))
+
+    def unsubscribe(self) -> None:
+        self.sock.sendall(bytes([OP_UNSUBSCRIBE]))
+
+    def samples(self):
+        """Stream after subscribe(): yields DaemonSample forever (blocks)."""
+        self.sock.settimeout(None)
+        while True:
+            while self._pending:
+                yield self._pending.pop(0)
+            kind, p = self._recv_frame()
+            if kind == T_SAMPLE:
+                yield self._decode(p)
+
+class DaemonFeed(threading.Thread):
+    """
+    GUI side: subscribe to the daemon and append to_sample(status, raw) to ring,
+    i.e. the same thing AcquisitionThread does with a local bus. Reconnects
+    every retry_s while the daemon is down; failures are counted in `errors`.
+    """
+    def __init__(self, path: str, ring: SampleRing, to_sample, retry_s: float = 1.0):
+        super().__init__(name="pte7300-daemon-feed", daemon=True)
+        self.path = path
+        self.ring = ring
+        self.to_sample = to_sample
+        self.retry_s = retry_s
+        self.errors = 0
+        self.last_error = None
+        self._client = None
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.is_set():
+            try:
+                self._client = DaemonClient(self.path)
+                self._client.subscribe()
+                for s in self._client.samples():
+                    if self._stop_evt.is_set():
+                        break
+                    self.ring.append(*self.to_sample(s.status, s.raw))
+            except (OSError, ConnectionError) as e:
+                if not self._stop_evt.is_set():
+                    self.errors += 1
+                    self.last_error = e
+            finally:
+                if self._client is not None:
+                    self._client.close()
+                    self._client = None
+            self._stop_evt.wait(self.retry_s)
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_evt.set()
+        c = self._client
+        if c is not None:
+            try:
+                c.sock.shutdown(socket.SHUT_RDWR)   # unblocks recv()
+            except OSError:
+                pass
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+def _watch(path: str) -> None:
+    with DaemonClient(path) as c:
+        info = c.info()
+        conv = c.converter()
+        print(f"bus {info['bus']} addr 0x{info['addr']:02X} crc={info['crc']} "
+              f"fs {info['fs_min']:g}:{info['fs_max']:g} bar, every {info['interval_s'] * 1000:.0f} ms")
+        c.subscribe()
+        for s in c.samples():
+            print(f"{s.seq:8d} {s.ts:.3f}  0x{s.status:04X} {s.raw:+6d} {conv.newtons(s.raw):10.1f} N")
+
+if __name__ == "__main__":
+    import argparse, signal
+    import pte_profile
+    ap = argparse.ArgumentParser(description="PTE7300 acquisition daemon (Unix socket)")
+    ap.add_argument("--socket", type=str, default=DEFAULT_SOCKET, help=f"Socket path (default {DEFAULT_SOCKET}).")
+    ap.add_argument("--client", action="store_true", help="Connect to a running daemon and print the stream.")
+    ap.add_argument("--bus", type=int, default=0, help="I2C bus number (default 0).")
+    ap.add_argument("--addr", type=lambda x: int(x, 0), default=None,
+                    help="7-bit I2C address (0x6c no-CRC, 0x6d CRC). Default: probe both, result is cached.")
+    ap.add_argument("--order", choices=("big", "little"), default=None,
+                    help="CRC reply byte order (default: detected).")
+    ap.add_argument("--interval", type=int, default=80, help="Sample interval in ms (default 80).")
+    ap.add_argument("--fs", type=str, default="0:40", help="Full-scale range in bar as min:max (default 0:40).")
+    ap.add_argument("--n-per-bar", type=float, default=1500.0 / 3.3, help="N per bar (default 1500/3.3).")
+    ap.add_argument("--offset", type=float, default=0.0, help="Zero force offset in N (default 0).")
+    ap.add_argument("--calibration", type=str, default=None, metavar="PATH",
+                    help="Multi-point counts->bar / bar->N calibration (JSON, see calibration.py).")
+    ap.add_argument("--shm", type=str, default=None, metavar="NAME",
+                    help="Also publish samples to a shared-memory ring with this name (shm_ring.py).")
+    ap.add_argument("--metrics", type=str, default=None, metavar="PATH",
+                    help="Write Prometheus metrics to this file every 5 s (textfile collector).")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics.")
+    ap.add_argument("--profile", action="store_true",
+                    help="Time each pipeline stage; breakdown on SIGUSR1 and at exit (pte_profile.py).")
+    ap.add_argument("--fake", action="store_true", help="Use the simulated sensor (fake_pte7300) instead of I2C.")
+    args = ap.parse_args()
+
+    if args.client:
+        try:
+            _watch(args.socket)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    try:
+        fs_min, fs_max = map(float, args.fs.split(":"))
+    except Exception:
+        print("Bad --fs format, expected like 0:40", file=sys.stderr)
+        sys.exit(2)
+
+    if args.metrics or args.metrics_port:
+        import pte_metrics
+        m = pte_metrics.enable(1000.0 / args.interval)
+        if args.metrics:
+            m.start_textfile(args.metrics)
+        if args.metrics_port:
+            m.serve(args.metrics_port)
+
+    if args.profile:
+        pte_profile.enable()
+    pte_profile.install_signal()
+
+    factory, state = SMBus, DEFAULT_STATE
+    if args.fake:
+        from fake_pte7300 import FakePTE7300, FakeSMBus
+        from pte_i2c import ADDR_PLAIN
+        fake = FakePTE7300(args.addr or ADDR_PLAIN, byteorder=args.order or "big")
+        factory, state = (lambda n: FakeSMBus(n, [fake])), None   # never cache the simulated sensor
+    try:
+        d = PTE7300Daemon(args.bus, args.addr, args.interval / 1000.0, fs_min, fs_max, args.n_per_bar,
+                          args.offset, byteorder=args.order, socket_path=args.socket, shm_name=args.shm,
+                          bus_factory=factory, state_path=state, calibration_path=args.calibration)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"i2c-{args.bus}: {e}", file=sys.stderr)
+        sys.exit(1)
+    signal.signal(signal.SIGTERM, lambda *a: d.stop())
+    print(f"serving {d.dev.describe()} on bus {args.bus} on {args.socket}", file=sys.stderr)
+    try:
+        d.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# PTE7300 register access – one ioctl per transaction
+# - crc_read_word()   [reg, crc] write + 3-byte read joined with a repeated start
+# - crc_read_words()  several register reads queued into one i2c_rdwr call
+# - read_stat_press_burst()  PRESS+STAT fetched as one block (0x6C plain or 0x6D CRC)
+# - read_word() / write_word() / crc_write_word()  plain word access and commands
+# Byte order of the reply differs between our scripts ("big" in PTE7300.py,
+# "little" in Proov1), so it is a parameter here.
+# Every transfer reports latency and errors to pte_metrics when it is enabled.
+#
+# Run this file directly to report sample throughput for each read path.
+
+from smbus2 import SMBus, i2c_msg
+from pte_crc import crc8, crc8_word, req_crc, check_frames
+from pte_metrics import timed
+
+ADDR_PLAIN = 0x6C  # no CRC
+ADDR_CRC   = 0x6D  # CRC framing on every word
+
+REG_CMD   = 0x22
+REG_PRESS = 0x30
+REG_STAT  = 0x32   # follows REG_PRESS, so one block from 0x30 covers both
+
+CMD_RESET = 0xB169
+CMD_START = 0x8B93
+CMD_IDLE  = 0x7BBA
+CMD_SLEEP = 0x6C32
+
+class CRCError(IOError):
+    """CRC byte of a reply did not match its data."""
+
+def to_s16(value: int) -> int:
+    return value - 0x10000 if value & 0x8000 else value
+
+def _decode(b: bytes, byteorder: str) -> int:
+    crc_calc = crc8_word(b[0], b[1])
+    if crc_calc != b[2]:
+        raise CRCError(f"CRC mismatch: got {b[2]:02X}, expected {crc_calc:02X}")
+    if byteorder == "big":
+        return (b[0] << 8) | b[1]
+    return (b[1] << 8) | b[0]
+
+# ---------------- no-CRC (0x6C) ----------------
+@timed("read_word")
+def read_word(bus: SMBus, addr: int, reg: int) -> int:
+    """16-bit UNSIGNED register, decoded like the scripts' read_u16_be (read_word_data)."""
+    return bus.read_word_data(addr, reg) & 0xFFFF
+
+@timed("write_word")
+def write_word(bus: SMBus, addr: int, reg: int, value: int) -> None:
+    """16-bit command/register write, MSB first."""
+    bus.write_i2c_block_data(addr, reg, [(value >> 8) & 0xFF, value & 0xFF])
+
+# ---------------- CRC (0x6D) ----------------
+@timed("crc_write_word")
+def crc_write_word(bus: SMBus, addr: int, reg: int, value: int) -> None:
+    """16-bit write MSB,LSB followed by CRC over [reg, MSB, LSB]."""
+    msb, lsb = (value >> 8) & 0xFF, value & 0xFF
+    bus.i2c_rdwr(i2c_msg.write(addr, [reg, msb, lsb, crc8(bytes([reg, msb, lsb]))]))
+
+@timed("crc_read_word")
+def crc_read_word(bus: SMBus, addr: int, reg: int, byteorder: str = "big") -> int:
+    """Read one 16-bit UNSIGNED register with CRC in a single write+read transaction."""
+    write = i2c_msg.write(addr, [reg, req_crc(reg)])
+    read = i2c_msg.read(addr, 3)
+    bus.i2c_rdwr(write, read)  # repeated start between the two messages
+    return _decode(bytes(read), byteorder)
+
+@timed("crc_read_words")
+def crc_read_words(bus: SMBus, addr: int, regs, byteorder: str = "big") -> list:
+    """
+    Read several 16-bit UNSIGNED registers with CRC in one i2c_rdwr call.
+    Returns the values in the same order as regs.
+    """
+    msgs = []
+    reads = []
+    for reg in regs:
+        read = i2c_msg.read(addr, 3)
+        msgs.append(i2c_msg.write(addr, [reg, req_crc(reg)]))
+        msgs.append(read)
+        reads.append(read)
+    bus.i2c_rdwr(*msgs)
+    return [_decode(bytes(r), byteorder) for r in reads]
+
+def crc_read_stat_press(bus: SMBus, addr: int, byteorder: str = "big"):
+    """(status, raw) – STAT unsigned, PRESS signed – in one i2c_rdwr call."""
+    status, press = crc_read_words(bus, addr, (REG_STAT, REG_PRESS), byteorder)
+    return status, to_s16(press)
+
+# ---------------- burst (block) read of PRESS + STAT ----------------
+@timed("read_block")
+def read_press_stat_block(bus: SMBus, addr: int):
+    """
+    No-CRC mode: 4 bytes from REG_PRESS in one transfer -> (status, raw).
+    Words are decoded like read_word_data() (low byte first).
+    """
+    b = bus.read_i2c_block_data(addr, REG_PRESS, 4)
+    raw = to_s16(b[0] | (b[1] << 8))
+    status = b[2] | (b[3] << 8)
+    return status, raw
+
+@timed("crc_read_block")
+def crc_read_press_stat_block(bus: SMBus, addr: int, byteorder: str = "big"):
+    """
+    CRC mode: [0x30, crc] + 6-byte read ([PRESS b0 b1 crc][STAT b0 b1 crc])
+    in one transaction. Both words are CRC-checked from the one buffer.
+    """
+    write = i2c_msg.write(addr, [REG_PRESS, req_crc(REG_PRESS)])
+    read = i2c_msg.read(addr, 6)
+    bus.i2c_rdwr(write, read)
+    b = bytes(read)
+    bad = check_frames(b)
+    if bad:
+        raise CRCError(f"CRC mismatch in block read (word {', '.join(map(str, bad))})")
+    if byteorder == "big":
+        press = (b[0] << 8) | b[1]
+        status = (b[3] << 8) | b[4]
+    else:
+        press = (b[1] << 8) | b[0]
+        status = (b[4] << 8) | b[3]
+    return status, to_s16(press)
+
+def read_stat_press_burst(bus: SMBus, addr: int, crc: bool = None, byteorder: str = "big"):
+    """(status, raw) in one bus transfer. crc=None picks the mode from the address."""
+    if crc is None:
+        crc = addr == ADDR_CRC
+    if crc:
+        return crc_read_press_stat_block(bus, addr, byteorder)
+    return read_press_stat_block(bus, addr)
+
+# ---------------- throughput report ----------------
+def _crc_read_word_split(bus: SMBus, addr: int, reg: int, byteorder: str = "big") -> int:
+    # previous behaviour: register write and data read as two separate ioctls
+    bus.i2c_rdwr(i2c_msg.write(addr, [reg, req_crc(reg)]))
+    read = i2c_msg.read(addr, 3)
+    bus.i2c_rdwr(read)
+    return _decode(bytes(read), byteorder)
+
+def bench_paths(bus: SMBus, addr: int, byteorder: str = "big", n: int = 500) -> dict:
+    """Samples/s (one sample = STAT + PRESS) for the split, combined, batched and burst paths."""
+    import time
+
+    def split():
+        _crc_read_word_split(bus, addr, REG_STAT, byteorder)
+        _crc_read_word_split(bus, addr, REG_PRESS, byteorder)
+
+    def combined():
+        crc_read_word(bus, addr, REG_STAT, byteorder)
+        crc_read_word(bus, addr, REG_PRESS, byteorder)
+
+    def batched():
+        crc_read_stat_press(bus, addr, byteorder)
+
+    def burst():
+        crc_read_press_stat_block(bus, addr, byteorder)
+
+    result = {}
+    for name, fn in (("split (2 ioctl/reg)", split),
+                     ("combined (1 ioctl/reg)", combined),
+                     ("batched (1 ioctl/sample)", batched),
+                     ("burst (1 block/sample)", burst)):
+        errors = 0
+        t0 = time.perf_counter()
+        for _ in range(n):
+            try:
+                fn()
+            except IOError:
+                errors += 1
+        dt = time.perf_counter() - t0
+        result[name] = (n / dt, errors)
+    return result
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="PTE7300 CRC read path throughput")
+    ap.add_argument("--bus", type=int, default=0, help="I2C bus number (default 0).")
+    ap.add_argument("--addr", type=lambda x: int(x, 0), default=0x6d,
+                    help="7-bit I2C address (default 0x6d for CRC).")
+    ap.add_argument("--order", choices=("big", "little"), default="big",
+                    help="Reply byte order (big = PTE7300.py, little = Proov1).")
+    ap.add_argument("-n", type=int, default=500, help="Samples per path (default 500).")
+    args = ap.parse_args()
+
+    with SMBus(args.bus) as bus:
+        for name, (rate, errors) in bench_paths(bus, args.addr, args.order, args.n).items():
+            print(f"{name:<26} {rate:8.1f} samples/s   CRC errors: {errors}")
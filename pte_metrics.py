@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# Bus health and sample timing metrics, Prometheus text format
+# - Metrics.observe(op, ns)   latency histogram per I2C operation
+# - Metrics.error(op, exc)    error counter per operation and kind (crc / nack / other)
+# - Metrics.inc(name)         plain counters (retries, rearms, ...)
+# - Metrics.sample(late_ns)   one acquisition tick: achieved rate and scheduler lateness
+# - to_prometheus() / write_textfile(path) / serve(port)
+#
+# Disabled by default: `registry` is None and every hook is a single global
+# check. Enable in code with enable(), or from the environment for any script:
+#     PTE7300_METRICS=/var/lib/node_exporter/pte7300.prom   (rewritten every 5 s)
+#     PTE7300_METRICS_PORT=9731                              (http://host:9731/metrics)
+
+import bisect, errno, os, threading, time
+from collections import deque
+
+# seconds; I2C transfers are ~0.1..2 ms, a conversion wait up to ~20 ms
+LATENCY_BUCKETS = (50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3, 0.1, 0.5)
+LATENESS_BUCKETS = (100e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3, 0.1, 0.5)
+
+_NACK_ERRNOS = {errno.EREMOTEIO, errno.ENXIO, errno.EIO, errno.ETIMEDOUT}
+
+registry = None   # the active Metrics, or None when disabled
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # last = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+def error_kind(exc: BaseException) -> str:
+    """crc / nack / other – CRC errors are pte_i2c.CRCError (an IOError)."""
+    if type(exc).__name__ == "CRCError" or "CRC mismatch" in str(exc):
+        return "crc"
+    if isinstance(exc, OSError) and exc.errno in _NACK_ERRNOS:
+        return "nack"
+    return "other"
+
+class Metrics:
+    def __init__(self, target_rate: float = None, rate_window: int = 64):
+        self._lock = threading.Lock()
+        self.latency = {}          # op -> Histogram (seconds)
+        self.errors = {}           # (op, kind) -> count
+        self.counters = {}         # name -> count
+        self.lateness = Histogram(LATENESS_BUCKETS)
+        self.samples = 0
+        self.target_rate = target_rate
+        self._ticks = deque(maxlen=rate_window)
+        self.started = time.time()
+
+    # ---- hooks ----
+    def observe(self, op: str, ns: int) -> None:
+        with self._lock:
+            h = self.latency.get(op)
+            if h is None:
+                h = self.latency[op] = Histogram(LATENCY_BUCKETS)
+            h.observe(ns / 1e9)
+
+    def error(self, op: str, exc: BaseException) -> None:
+        key = (op, error_kind(exc))
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def inc(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_target_rate(self, hz: float) -> None:
+        self.target_rate = hz
+
+    def sample(self, late_ns: int = 0) -> None:
+        with self._lock:
+            self.samples += 1
+            self._ticks.append(time.monotonic())
+            self.lateness.observe(max(0, late_ns) / 1e9)
+
+    # ---- derived ----
+    def achieved_rate(self) -> float:
+        t = self._ticks
+        if len(t) < 2 or t[-1] <= t[0]:
+            return 0.0
+        return (len(t) - 1) / (t[-1] - t[0])
+
+    # ---- export ----
+    def to_prometheus(self) -> str:
+        out = []
+        with self._lock:
+            out.append("# HELP pte7300_i2c_latency_seconds I2C operation latency")
+            out.append("# TYPE pte7300_i2c_latency_seconds histogram")
+            for op, h in sorted(self.latency.items()):
+                acc = 0
+                for b, c in zip(h.bounds, h.counts):
+                    acc += c
+                    out.append(f'pte7300_i2c_latency_seconds_bucket{{op="{op}",le="{b:g}"}} {acc}')
+                out.append(f'pte7300_i2c_latency_seconds_bucket{{op="{op}",le="+Inf"}} {h.count}')
+                out.append(f'pte7300_i2c_latency_seconds_sum{{op="{op}"}} {h.sum:.9f}')
+                out.append(f'pte7300_i2c_latency_seconds_count{{op="{op}"}} {h.count}')
+            out.append("# HELP pte7300_i2c_errors_total I2C errors by operation and kind (crc, nack, other)")
+            out.append("# TYPE pte7300_i2c_errors_total counter")
+            for (op, kind), n in sorted(self.errors.items()):
+                out.append(f'pte7300_i2c_errors_total{{op="{op}",kind="{kind}"}} {n}')
+            out.append("# HELP pte7300_events_total Recovery and bookkeeping counters")
+            out.append("# TYPE pte7300_events_total counter")
+            for name, n in sorted(self.counters.items()):
+                out.append(f'pte7300_events_total{{event="{name}"}} {n}')
+            out.append("# TYPE pte7300_samples_total counter")
+            out.append(f"pte7300_samples_total {self.samples}")
+            out.append("# TYPE pte7300_sample_rate_hz gauge")
+            out.append(f"pte7300_sample_rate_hz {self.achieved_rate():.3f}")
+            if self.target_rate:
+                out.append("# TYPE pte7300_sample_rate_target_hz gauge")
+                out.append(f"pte7300_sample_rate_target_hz {self.target_rate:.3f}")
+            h = self.lateness
+            out.append("# HELP pte7300_schedule_lateness_seconds How late each acquisition tick started")
+            out.append("# TYPE pte7300_schedule_lateness_seconds histogram")
+            acc = 0
+            for b, c in zip(h.bounds, h.counts):
+                acc += c
+                out.append(f'pte7300_schedule_lateness_seconds_bucket{{le="{b:g}"}} {acc}')
+            out.append(f'pte7300_schedule_lateness_seconds_bucket{{le="+Inf"}} {h.count}')
+            out.append(f"pte7300_schedule_lateness_seconds_sum {h.sum:.9f}")
+            out.append(f"pte7300_schedule_lateness_seconds_count {h.count}")
+        return "\n".join(out) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomic rewrite (node_exporter textfile collector style)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def start_textfile(self, path: str, every_s: float = 5.0) -> threading.Thread:
+        def loop():
+            while True:
+                try:
+                    self.write_textfile(path)
+                except OSError:
+                    pass
+                time.sleep(every_s)
+        t = threading.Thread(target=loop, name="pte7300-metrics-file", daemon=True)
+        t.start()
+        return t
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics over HTTP from a daemon thread; returns the server."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        srv = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=srv.serve_forever, name="pte7300-metrics-http", daemon=True).start()
+        return srv
+
+def enable(target_rate: float = None) -> Metrics:
+    global registry
+    if registry is None:
+        registry = Metrics(target_rate)
+    elif target_rate is not None:
+        registry.set_target_rate(target_rate)
+    return registry
+
+def disable() -> None:
+    global registry
+    registry = None
+
+def timed(op: str):
+    """Decorator for bus helpers: latency + error kind into the registry when enabled."""
+    def deco(fn):
+        def wrapper(*args, **kwargs):
+            m = registry
+            if m is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                r = fn(*args, **kwargs)
+            except Exception as e:
+                m.error(op, e)
+                raise
+            m.observe(op, time.perf_counter_ns() - t0)
+            return r
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return deco
+
+def _from_env() -> None:
+    path = os.environ.get("PTE7300_METRICS")
+    port = os.environ.get("PTE7300_METRICS_PORT")
+    if not (path or port):
+        return
+    m = enable()
+    if path:
+        m.start_textfile(path)
+    if port:
+        m.serve(int(port))
+
+_from_env()
+
+if __name__ == "__main__":
+    # overhead of the hooks, disabled vs enabled
+    @timed("noop")
+    def noop():
+        return None
+    n = 200_000
+    for label in ("disabled", "enabled"):
+        if label == "enabled":
+            enable()
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            noop()
+        print(f"{label:<9} {(time.perf_counter_ns() - t0) / n:6.0f} ns per wrapped call")
+    print(registry.to_prometheus().splitlines()[2])
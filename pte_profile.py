@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Opt-in per-stage profiling for the sample-to-screen pipeline
+# - profiler()            the active profiler (a no-op one unless enabled)
+# - with prof.span("read"): ...   time one stage with perf_counter_ns
+# - each stage keeps its last `capacity` durations in a ring buffer
+# - report() gives count / mean / p50 / p99 / max per stage; dumped at exit,
+#   on F9 in the GUIs (bind_key) and on SIGUSR1 (install_signal)
+#
+# Enable with PTE7300_PROFILE=1 in the environment (or enable() in code).
+# Take profiler() once at startup; when disabled every span is a shared no-op.
+
+import atexit, os, sys, time
+from array import array
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class NullProfiler:
+    enabled = False
+    def span(self, stage: str):
+        return _NULL_SPAN
+    def add(self, stage: str, dt_ns: int) -> None:
+        pass
+    def report(self) -> str:
+        return "profiling disabled (set PTE7300_PROFILE=1)"
+    def dump(self, file=None) -> None:
+        pass
+    def reset(self) -> None:
+        pass
+
+class _Span:
+    __slots__ = ("prof", "stage", "t0")
+    def __init__(self, prof, stage):
+        self.prof = prof
+        self.stage = stage
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+    def __exit__(self, *exc):
+        self.prof.add(self.stage, time.perf_counter_ns() - self.t0)
+        return False
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = int(capacity)
+        self._rings = {}      # stage -> [array('q'), total written]
+        self._order = []      # stages in first-seen order (pipeline order)
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def add(self, stage: str, dt_ns: int) -> None:
+        r = self._rings.get(stage)
+        if r is None:
+            r = self._rings[stage] = [array('q', bytes(8 * self.capacity)), 0]
+            self._order.append(stage)
+        r[0][r[1] % self.capacity] = dt_ns
+        r[1] += 1
+
+    def reset(self) -> None:
+        self._rings.clear()
+        self._order.clear()
+
+    def stats(self) -> dict:
+        """stage -> dict(count, mean_us, p50_us, p99_us, max_us) over the ring contents."""
+        out = {}
+        for stage in list(self._order):
+            buf, n = self._rings[stage]
+            vals = sorted(buf[:min(n, self.capacity)])
+            if not vals:
+                continue
+            k = len(vals)
+            out[stage] = {"count": n,
+                          "mean_us": sum(vals) / k / 1e3,
+                          "p50_us": vals[(k - 1) // 2] / 1e3,
+                          "p99_us": vals[min(k - 1, int(0.99 * (k - 1) + 0.5))] / 1e3,
+                          "max_us": vals[-1] / 1e3}
+        return out
+
+    def report(self) -> str:
+        st = self.stats()
+        if not st:
+            return "profile: no spans recorded"
+        total = sum(s["mean_us"] for s in st.values()) or 1.0
+        lines = [f"{'stage':<18} {'count':>8} {'mean us':>10} {'p50 us':>10} {'p99 us':>10} {'max us':>10} {'share':>6}"]
+        for stage, s in st.items():
+            lines.append(f"{stage:<18} {s['count']:8d} {s['mean_us']:10.1f} {s['p50_us']:10.1f} "
+                         f"{s['p99_us']:10.1f} {s['max_us']:10.1f} {100 * s['mean_us'] / total:5.1f}%")
+        return "\n".join(lines)
+
+    def dump(self, file=None) -> None:
+        print(self.report(), file=file or sys.stderr, flush=True)
+
+_active = NullProfiler()
+
+def profiler():
+    return _active
+
+def enable(capacity: int = 4096, dump_at_exit: bool = True) -> Profiler:
+    global _active
+    if not isinstance(_active, Profiler):
+        _active = Profiler(capacity)
+        if dump_at_exit:
+            atexit.register(lambda: _active.dump())
+    return _active
+
+def bind_key(root, key: str = "<F9>") -> None:
+    """Tk: print the breakdown when key is pressed (only when enabled)."""
+    if _active.enabled:
+        root.bind(key, lambda e: _active.dump())
+
+def install_signal(signum=None) -> None:
+    """Print the breakdown on SIGUSR1 (headless processes)."""
+    import signal
+    if _active.enabled:
+        signal.signal(signum or signal.SIGUSR1, lambda *a: _active.dump())
+
+if os.environ.get("PTE7300_PROFILE", "") not in ("", "0"):
+    enable()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# Resilient bus access for one PTE7300 – keeps sampling through a noisy cable
+# - ResilientBus(bus, addr)   drop-in for the SMBus object (same methods), plus
+#   call(fn, *args)           run one transfer helper with recovery:
+#     1. CRC mismatch / NACK -> up to `retries` immediate retries (no sleep)
+#     2. still failing       -> the error is raised; if the sensor did not answer
+#                               (NACK) twice in a row the bus backs off exponentially
+#                               (backoff_s .. backoff_max_s): calls during the
+#                               backoff fail fast with BusBackoff, no transfer.
+#                               CRC failures do not back off – the sensor answered,
+#                               the next sample may well get through
+#     3. every reset_after failed operations in a row -> soft reset (0xB169),
+#                               START again, on_reset() (e.g. re-arm continuous
+#                               mode); if even the reset write fails, the bus
+#                               device is reopened (with bus_factory)
+#   Other exceptions (not CRC / NACK) are raised at once.
+#   Every action is counted (stats()) and goes to pte_metrics when enabled.
+#
+# Example:
+#     self.bus = ResilientBus(SMBus(busnum), addr, bus_factory=lambda: SMBus(busnum))
+#     status, raw = self.bus.call(read_stat_press_burst, self.bus, addr)
+
+import time
+import pte_metrics
+from pte_metrics import error_kind
+from pte_i2c import ADDR_CRC, REG_CMD, CMD_RESET, CMD_START, write_word, crc_write_word
+
+RETRY_KINDS = ("crc", "nack")
+
+class BusBackoff(IOError):
+    """Skipped without a transfer: the bus is backing off after repeated failures."""
+
+class ResilientBus:
+    def __init__(self, bus, addr: int, crc: bool = None, retries: int = 2, reset_after: int = 3,
+                 backoff_s: float = 0.005, backoff_max_s: float = 0.5, reset_settle_s: float = 0.005,
+                 on_reset=None, bus_factory=None):
+        self.addr = addr
+        self.crc = (addr == ADDR_CRC) if crc is None else crc
+        self.retries = retries
+        self.reset_after = reset_after
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.reset_settle_s = reset_settle_s
+        self.on_reset = on_reset
+        self._factory = bus_factory
+        self.failures = 0            # failed operations in a row (after retries)
+        self.nacks = 0               # ... of which the sensor did not answer
+        self._hold_until = 0.0       # monotonic end of the current backoff
+        self.counts = {"retry": 0, "retry_recovered": 0, "failure": 0, "backoff_skip": 0,
+                       "soft_reset": 0, "restart": 0, "reset_failed": 0, "bus_reopen": 0}
+        self._bind(bus)
+
+    # ---- SMBus interface (what pte_i2c and the scripts use) ----
+    def _bind(self, bus) -> None:
+        self.bus = bus
+        self.read_word_data = bus.read_word_data
+        self.write_i2c_block_data = bus.write_i2c_block_data
+        self.read_i2c_block_data = bus.read_i2c_block_data
+        self.i2c_rdwr = bus.i2c_rdwr
+
+    def __getattr__(self, name):
+        return getattr(self.bus, name)
+
+    def close(self) -> None:
+        self.bus.close()
+
+    # ---- recovery ----
+    def _count(self, event: str, n: int = 1) -> None:
+        self.counts[event] += n
+        if pte_metrics.registry is not None:
+            pte_metrics.registry.inc(f"bus_{event}", n)
+
+    def call(self, fn, *args, **kwargs):
+        if self.nacks and time.monotonic() < self._hold_until:
+            self._count("backoff_skip")
+            raise BusBackoff(f"bus backing off after {self.nacks} unanswered operations")
+        attempt = 0
+        while True:
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if error_kind(e) not in RETRY_KINDS:
+                    raise
+                if attempt < self.retries:
+                    attempt += 1
+                    self._count("retry")
+                    continue
+                self._failed(error_kind(e))
+                raise
+            if attempt:
+                self._count("retry_recovered")
+            self.failures = self.nacks = 0
+            return result
+
+    def _failed(self, kind: str) -> None:
+        self.failures += 1
+        self._count("failure")
+        if kind == "nack":
+            self.nacks += 1
+        if self.failures % self.reset_after == 0:
+            self.recover()
+        if kind == "nack" and self.nacks >= 2:
+            delay = min(self.backoff_max_s, self.backoff_s * (2 ** (self.nacks - 2)))
+            self._hold_until = time.monotonic() + delay
+
+    def _command(self, cmd: int) -> None:
+        if self.crc:
+            crc_write_word(self, self.addr, REG_CMD, cmd)
+        else:
+            write_word(self, self.addr, REG_CMD, cmd)
+
+    def recover(self) -> bool:
+        """Soft reset + START (reopen the bus if the sensor does not answer). True if the sensor took it."""
+        self._count("soft_reset")
+        try:
+            self._command(CMD_RESET)
+            time.sleep(self.reset_settle_s)
+            self._command(CMD_START)
+        except Exception:
+            self._count("reset_failed")
+            if self._factory is not None:
+                try:
+                    self.bus.close()
+                except Exception:
+                    pass
+                try:
+                    self._bind(self._factory())
+                    self._count("bus_reopen")
+                except OSError:
+                    pass
+            return False
+        self._count("restart")
+        if self.on_reset is not None:
+            self.on_reset()
+        return True
+
+    def stats(self) -> dict:
+        return dict(self.counts, failures_in_row=self.failures)
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"bus: {c['retry']} retries ({c['retry_recovered']} recovered), {c['failure']} failed ops, "
+                f"{c['backoff_skip']} backoff skips, {c['soft_reset']} soft resets, "
+                f"{c['bus_reopen']} bus reopens")
+
+if __name__ == "__main__":
+    # degraded bus: simulated sensor with bit errors, sampled every --period-ms, with and without the layer
+    import argparse
+    from fake_pte7300 import FakePTE7300, FakeSMBus
+    from pte_i2c import crc_read_press_stat_block
+    ap = argparse.ArgumentParser(description="Sample success rate on a noisy simulated bus")
+    ap.add_argument("--ber", type=float, default=0.01, help="Bit error probability per reply byte (default 0.01).")
+    ap.add_argument("-n", type=int, default=2000, help="Samples (default 2000).")
+    ap.add_argument("--period-ms", type=float, default=1.0, help="Sample period (default 1 ms).")
+    args = ap.parse_args()
+    for label in ("plain", "resilient"):
+        bus = FakeSMBus(0, [FakePTE7300(ADDR_CRC, bit_error_rate=args.ber, seed=1)])
+        crc_write_word(bus, ADDR_CRC, REG_CMD, CMD_START)
+        rb = ResilientBus(bus, ADDR_CRC) if label == "resilient" else None
+        ok = 0
+        t0 = time.perf_counter()
+        for _ in range(args.n):
+            time.sleep(args.period_ms / 1000.0)
+            try:
+                if rb is None:
+                    crc_read_press_stat_block(bus, ADDR_CRC)
+                else:
+                    rb.call(crc_read_press_stat_block, rb, ADDR_CRC)
+                ok += 1
+            except IOError:
+                pass
+        dt = time.perf_counter() - t0
+        print(f"{label:<10} {100.0 * ok / args.n:6.2f}% samples ok   {ok / dt:7.0f} samples/s")
+        if rb is not None:
+            print("          " + rb.summary())
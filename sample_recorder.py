@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# Binary recorder for raw sample streams (whole shifts at full rate)
+# - SampleRecorder  appends fixed-size records to a preallocated, memory-mapped file
+# - SampleFile      opens a recording; .records is a zero-copy NumPy structured array
+#
+# Record (16 bytes, little endian):  ts_ns int64 (time.monotonic_ns), raw int16,
+#                                    status uint16, device uint16, pad
+# Only raw counts are stored; bar / N are computed on read from the calibration
+# saved in the header (fs_min/fs_max, N/bar, offset, whether bar includes fs_min).
+# Header version 2 is 128 bytes plus an optional extension block; records start at
+# data_offset; the extension holds the multi-point calibration (calibration.py) as
+# JSON when one was used. Version 1 files (64-byte header, written by variant2 only) are read
+# as offset_by_fs_min=False.
+#
+# Example: python sample_recorder.py shift.rec   (prints a summary)
+
+import json, mmap, os, struct, time
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+MAGIC = b"PTEREC1\0"
+VERSION = 2
+HEADER_FMT = "<8sIIQQdddd"           # magic, version, rec_size, capacity, count, fs_min, fs_max, n_per_bar, offset_n
+HEADER_V2_FMT = "<IIQ"               # flags, ext_len, data_offset – follows HEADER_FMT in version 2
+HEADER_V1_SIZE = 64
+HEADER_SIZE = 128
+FLAG_OFFSET_BY_FS_MIN = 0x1
+RECORD_FMT = "<qhHHxx"
+RECORD_SIZE = struct.calcsize(RECORD_FMT)
+_COUNT_OFFSET = 24                    # byte offset of `count` inside the header
+
+if HAS_NUMPY:
+    RECORD_DTYPE = np.dtype([("ts_ns", "<i8"), ("raw", "<i2"), ("status", "<u2"),
+                             ("device", "<u2"), ("_pad", "V2")])
+
+def device_id(bus: int, addr: int) -> int:
+    return ((bus & 0xFF) << 8) | (addr & 0xFF)
+
+def _read_header(buf) -> dict:
+    """Header fields of a recording (version 1 or 2); ValueError if it is not one."""
+    if len(buf) < HEADER_V1_SIZE:
+        raise ValueError("not a sample recording")
+    magic, version, rec_size, capacity, count, fs_min, fs_max, npb, off = struct.unpack_from(HEADER_FMT, buf, 0)
+    if magic != MAGIC or rec_size != RECORD_SIZE or version not in (1, VERSION):
+        raise ValueError("not a sample recording")
+    h = {"version": version, "capacity": capacity, "count": count, "fs_min": fs_min, "fs_max": fs_max,
+         "n_per_bar": npb, "zero_offset_n": off, "offset_by_fs_min": False, "ext": b"",
+         "data_offset": HEADER_V1_SIZE}
+    if version >= 2:
+        flags, ext_len, data_offset = struct.unpack_from(HEADER_V2_FMT, buf, HEADER_V1_SIZE)
+        h["offset_by_fs_min"] = bool(flags & FLAG_OFFSET_BY_FS_MIN)
+        h["ext"] = bytes(buf[HEADER_SIZE:HEADER_SIZE + ext_len])
+        h["data_offset"] = data_offset
+    return h
+
+class SampleRecorder:
+    """
+    Append-only recorder. The file is preallocated for `capacity` records and
+    grown by the same amount whenever it fills up. The header count is updated
+    on every append; flush() (msync) runs every sync_every records or sync_s seconds.
+    Appending to an existing file requires the same calibration (ValueError otherwise),
+    so every record in a file converts with its header.
+    """
+    def __init__(self, path: str, fs_min: float, fs_max: float, n_per_bar: float,
+                 zero_offset_n: float = 0.0, offset_by_fs_min: bool = False, table=None,
+                 capacity: int = 1 << 20, sync_every: int = 4096, sync_s: float = 1.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_s = sync_s
+        calib = {"fs_min": float(fs_min), "fs_max": float(fs_max), "n_per_bar": float(n_per_bar),
+                 "zero_offset_n": float(zero_offset_n), "offset_by_fs_min": bool(offset_by_fs_min)}
+        ext = b""
+        if table is not None:
+            ext = json.dumps({"name": table.name, "calibration": table.to_dict()}, sort_keys=True).encode()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size >= HEADER_V1_SIZE:
+            try:
+                hdr = _read_header(os.pread(self._fd, HEADER_SIZE + 65536, 0))
+                bad = [k for k, v in calib.items() if hdr[k] != v] + (["table"] if hdr["ext"] != ext else [])
+                if bad:
+                    raise ValueError("recorded with another calibration (" + ", ".join(bad) + ")")
+            except ValueError as e:
+                os.close(self._fd)
+                raise ValueError(f"{path}: {e}") from None
+            self.capacity, self.count = hdr["capacity"], hdr["count"]
+            self._data = hdr["data_offset"]
+        else:
+            self.capacity, self.count = int(capacity), 0
+            self._data = HEADER_SIZE + (len(ext) + 15) // 16 * 16
+            os.ftruncate(self._fd, self._data + self.capacity * RECORD_SIZE)
+            flags = FLAG_OFFSET_BY_FS_MIN if offset_by_fs_min else 0
+            os.pwrite(self._fd, (struct.pack(HEADER_FMT, MAGIC, VERSION, RECORD_SIZE, self.capacity, 0,
+                                             fs_min, fs_max, n_per_bar, zero_offset_n)
+                                 + struct.pack(HEADER_V2_FMT, flags, len(ext), self._data))
+                      .ljust(HEADER_SIZE, b"\0") + ext, 0)
+        self._grow_by = max(1, int(capacity))
+        self._mm = mmap.mmap(self._fd, self._data + self.capacity * RECORD_SIZE)
+        self._since_sync = 0
+        self._last_sync = time.monotonic()
+
+    def _grow(self):
+        self._mm.flush()
+        self._mm.close()
+        self.capacity += self._grow_by
+        os.ftruncate(self._fd, self._data + self.capacity * RECORD_SIZE)
+        self._mm = mmap.mmap(self._fd, self._data + self.capacity * RECORD_SIZE)
+        struct.pack_into("<Q", self._mm, 16, self.capacity)
+
+    def append(self, ts_ns: int, raw: int, status: int, device: int = 0) -> None:
+        if self.count >= self.capacity:
+            self._grow()
+        struct.pack_into(RECORD_FMT, self._mm, self._data + self.count * RECORD_SIZE,
+                         ts_ns, raw, status, device)
+        self.count += 1
+        struct.pack_into("<Q", self._mm, _COUNT_OFFSET, self.count)  # publish
+        self._since_sync += 1
+        if self._since_sync >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_s:
+            self.flush()
+
+    def flush(self) -> None:
+        self._mm.flush()
+        self._since_sync = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        self.flush()
+        self._mm.close()
+        self._mm = None
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SampleFile:
+    """
+    Read-only view of a recording (can be opened while the recorder is writing).
+    .records          NumPy structured array (ts_ns, raw, status, device) – no copy
+    .pressure_bar()   raw -> bar using the header calibration
+    .force_n()        raw -> N
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            h = _read_header(self._mm)
+        except ValueError as e:
+            self._mm.close()
+            raise ValueError(f"{path}: {e}") from None
+        self.version, self.capacity = h["version"], h["capacity"]
+        self.fs_min, self.fs_max = h["fs_min"], h["fs_max"]
+        self.n_per_bar, self.zero_offset_n = h["n_per_bar"], h["zero_offset_n"]
+        self.offset_by_fs_min = h["offset_by_fs_min"]
+        self._data = h["data_offset"]
+        self.table = None          # multi-point calibration the recorder used
+        if h["ext"]:
+            from calibration import Calibration
+            ext = json.loads(h["ext"])
+            self.table = Calibration.from_dict(ext["calibration"], ext.get("name", ""))
+        self._conv = None
+
+    @property
+    def count(self) -> int:
+        n = struct.unpack_from("<Q", self._mm, _COUNT_OFFSET)[0]
+        return min(n, (len(self._mm) - self._data) // RECORD_SIZE)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def records(self):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is needed for SampleFile.records; use iter_records()")
+        return np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self.count, offset=self._data)
+
+    def iter_records(self):
+        """(ts_ns, raw, status, device) tuples, no NumPy needed."""
+        for i in range(self.count):
+            yield struct.unpack_from(RECORD_FMT, self._mm, self._data + i * RECORD_SIZE)
+
+    def counts_to_bar(self, raw):
+        if self.table is not None:
+            return self.converter().bar(raw)
+        base = self.fs_min if self.offset_by_fs_min else 0.0
+        return base + (raw + 16000) * ((self.fs_max - self.fs_min) / 32000.0)
+
+    def converter(self):
+        """ForceConverter (lookup tables) for the header calibration."""
+        if self._conv is None:
+            from force_lut import ForceConverter
+            self._conv = ForceConverter(self.fs_min, self.fs_max, self.n_per_bar, self.zero_offset_n,
+                                        self.offset_by_fs_min, table=self.table)
+        return self._conv
+
+    def pressure_bar(self):
+        return self.converter().bar_array(self.records["raw"])
+
+    def force_n(self):
+        return self.converter().newtons_array(self.records["raw"])
+
+    def close(self):
+        self._mm.close()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Summarize a PTE7300 sample recording")
+    ap.add_argument("path")
+    args = ap.parse_args()
+    sf = SampleFile(args.path)
+    n = len(sf)
+    print(f"{args.path}: {n} records, fs {sf.fs_min:g}:{sf.fs_max:g} bar, {sf.n_per_bar:g} N/bar")
+    if n and HAS_NUMPY:
+        rec = sf.records
+        dur = (rec["ts_ns"][-1] - rec["ts_ns"][0]) / 1e9
+        f = sf.force_n()
+        print(f"duration {dur:.1f} s, rate {n / max(dur, 1e-9):.1f}/s, "
+              f"force min/mean/max {f.min():.1f}/{f.mean():.1f}/{f.max():.1f} N")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# Shared-memory sample ring for local consumers (kiosk GUI, logger, analytics)
+# - ShmRingWriter  one publisher; append() packs straight into shared memory
+# - ShmRingReader  any number of processes; .records is a NumPy structured view
+#                  of the ring (no copy), read() returns everything new since the
+#                  last call with one vectorized copy and reports overruns
+#
+# Layout: 64-byte header, then `capacity` slots of 32 bytes
+#     header  magic 8s, version u32, capacity u32, slot size u32, pad u32,
+#             seq u64 (samples published), fs_min, fs_max, n_per_bar, zero_offset_n (f64)
+#     slot    stamp u64, ts_ns i64 (time.monotonic_ns), force f64, raw i16, status u16, pad
+# Per-slot seqlock: the writer sets stamp = 2*k+1 before writing sample k and
+# 2*k+2 after it, then bumps seq. A reader only trusts slot k if its stamp is
+# 2*k+2 and, after copying, seq has not passed k + capacity - 1 (the writer may
+# be in that slot by then, and the stamp is copied before the payload).
+#
+# Example:
+#     python shm_ring.py --watch pte7300      (print what a publisher writes)
+
+import struct, time
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+MAGIC = b"PTESHM1\0"
+HEADER_FMT = "<8sIIIIQdddd"
+HEADER_SIZE = 64
+SLOT_FMT = "<QqdhH4x"
+SLOT_SIZE = struct.calcsize(SLOT_FMT)
+_SEQ_OFFSET = 24
+_SEQ = struct.Struct("<Q")
+_STAMP = struct.Struct("<Q")
+_DATA = struct.Struct("<qdhH")        # slot without the stamp
+
+if HAS_NUMPY:
+    SLOT_DTYPE = np.dtype([("stamp", "<u8"), ("ts_ns", "<i8"), ("force", "<f8"),
+                           ("raw", "<i2"), ("status", "<u2"), ("_pad", "V4")])
+
+class ShmRingWriter:
+    def __init__(self, name: str, capacity: int = 4096, fs_min: float = 0.0, fs_max: float = 0.0,
+                 n_per_bar: float = 0.0, zero_offset_n: float = 0.0):
+        self.capacity = int(capacity)
+        size = HEADER_SIZE + self.capacity * SLOT_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # stale segment from a crashed publisher
+            old = shared_memory.SharedMemory(name=name)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        struct.pack_into(HEADER_FMT, self.buf, 0, MAGIC, 1, self.capacity, SLOT_SIZE, 0, 0,
+                         fs_min, fs_max, n_per_bar, zero_offset_n)
+        self.seq = 0
+
+    def append(self, ts_ns: int, force: float, raw: int, status: int) -> None:
+        k = self.seq
+        off = HEADER_SIZE + (k % self.capacity) * SLOT_SIZE
+        buf = self.buf
+        _STAMP.pack_into(buf, off, 2 * k + 1)          # writing
+        _DATA.pack_into(buf, off + 8, ts_ns, force, raw, status)
+        _STAMP.pack_into(buf, off, 2 * k + 2)          # done
+        self.seq = k + 1
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self.seq)     # publish
+
+    def publish_from(self, ring):
+        """on_sample hook for AcquisitionThread: publish the ring's newest sample."""
+        def hook():
+            s = ring.latest()
+            if s is not None:
+                self.append(int(s[0] * 1e9), s[1], s[3], s[2])
+        return hook
+
+    def close(self, unlink: bool = True) -> None:
+        if self.shm is None:
+            return
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        self.shm = None
+
+def _attach(name: str):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # older Pythons would unlink the publisher's segment when this reader exits
+        from multiprocessing import resource_tracker
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+class ShmRingReader:
+    def __init__(self, name: str, from_start: bool = False):
+        self.shm = _attach(name)
+        buf = self.shm.buf
+        (magic, self.version, self.capacity, slot_size, _, seq,
+         self.fs_min, self.fs_max, self.n_per_bar, self.zero_offset_n) = struct.unpack_from(HEADER_FMT, buf, 0)
+        if magic != MAGIC or slot_size != SLOT_SIZE:
+            self.shm.close()
+            raise ValueError(f"{name}: not a PTE7300 sample ring")
+        self.next_seq = max(0, seq - self.capacity) if from_start else seq
+        self.overruns = 0        # samples lost because the reader fell behind
+        self._records = None
+        if HAS_NUMPY:
+            self._records = np.ndarray((self.capacity,), dtype=SLOT_DTYPE, buffer=buf, offset=HEADER_SIZE)
+
+    @property
+    def seq(self) -> int:
+        return _SEQ.unpack_from(self.shm.buf, _SEQ_OFFSET)[0]
+
+    @property
+    def records(self):
+        """The whole ring as a structured array over the shared memory (no copy; slot k at k % capacity)."""
+        if self._records is None:
+            raise ImportError("numpy is needed for ShmRingReader.records; use read()")
+        return self._records
+
+    def read(self):
+        """
+        New samples since the last call -> (samples, missed). With NumPy samples is a
+        structured array (one copy for the whole batch), otherwise a list of
+        (ts_ns, force, raw, status). missed counts samples overwritten before we got them.
+        """
+        end = self.seq
+        cap = self.capacity
+        start = max(self.next_seq, end - cap)
+        missed = start - self.next_seq
+        # slots below `end` were complete when seq was published; the writer can only
+        # have overwritten the oldest ones since, so bad slots form a prefix
+        if HAS_NUMPY:
+            ks = np.arange(start, end, dtype=np.uint64)
+            out = self._records[(ks % cap).astype(np.intp)]     # the copy
+            ok = out["stamp"] == 2 * ks + 2
+        else:
+            out, ok = [], []
+            buf = self.shm.buf
+            for k in range(start, end):
+                stamp, ts_ns, force, raw, status = struct.unpack_from(
+                    SLOT_FMT, buf, HEADER_SIZE + (k % cap) * SLOT_SIZE)
+                out.append((ts_ns, force, raw, status))
+                ok.append(stamp == 2 * k + 2)
+        # a stamp copied before the writer lapped the slot still looks good: drop
+        # whatever the writer could have reached during the copy, as SampleRing.read_from
+        first = max(0, self.seq - cap + 1 - start)
+        while first < len(out) and not ok[first]:
+            first += 1
+        if first:
+            first = min(first, len(out))
+            missed += first
+            out = out[first:]
+        self.next_seq = end
+        self.overruns += missed
+        return out, missed
+
+    def close(self) -> None:
+        self._records = None
+        self.shm.close()
+
+def _watch(name: str) -> None:
+    r = ShmRingReader(name)
+    print(f"{name}: capacity {r.capacity}, seq {r.seq}")
+    total = 0
+    t0 = time.monotonic()
+    try:
+        while True:
+            time.sleep(0.5)
+            samples, missed = r.read()
+            total += len(samples)
+            if len(samples):
+                last = samples[-1]
+                force = last["force"] if HAS_NUMPY else last[1]
+                print(f"+{len(samples):5d} (missed {missed})  last {float(force):10.1f} N  "
+                      f"rate {total / (time.monotonic() - t0):6.1f}/s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        r.close()
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Watch a PTE7300 shared-memory sample ring")
+    ap.add_argument("--watch", type=str, required=True, metavar="NAME", help="Shared memory name.")
+    _watch(ap.parse_args().watch)
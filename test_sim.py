@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# Behaviour tests on the simulated bus (fake_pte7300) – no hardware needed
+# - CRC-8 table, ring lap rules (local and shared memory), filters, deadline grid,
+#   continuous-mode stalls, bus retries/recovery, driver probing and its state cache,
+#   the LUT vs linear conversion and the remote-key drain
+#
+# Example: python -m pytest -q test_sim.py
+
+import errno, json, os, struct, time
+import pytest
+
+from fake_pte7300 import FakePTE7300, FakeSMBus
+from acquisition import SampleRing
+import shm_ring
+from shm_ring import ShmRingReader, ShmRingWriter
+from calibration import Calibration, Curve
+from deadline import Deadline
+from evdev_bridge import EvdevBridge
+from force_filters import EMA, Median, Boxcar, parse_chain
+from force_lut import ForceConverter
+from pte_crc import CRC8_INIT, CRC8_POLY, crc8, crc8_word, check_frames
+from pte_conversion import STAT_DATA_READY, ContinuousReader
+from pte_i2c import REG_STAT, CRCError, crc_read_press_stat_block, read_word
+from pte_resilient import BusBackoff, ResilientBus
+from pte7300_driver import PTE7300Driver, probe
+
+def const(raw: int):
+    return lambda t: raw
+
+# ---------------- CRC ----------------
+def _crc8_bitwise(data) -> int:
+    crc = CRC8_INIT
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ CRC8_POLY) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+def test_crc8_matches_bit_loop():
+    for b0 in range(256):
+        for b1 in (0x00, 0x01, 0x5A, 0xFF):
+            assert crc8(bytes([b0, b1])) == _crc8_bitwise([b0, b1]) == crc8_word(b0, b1)
+
+def test_crc8_known_vector():
+    assert crc8(b"\xbe\xef") == 0x92          # Sensirion-style CRC-8 check value
+
+def test_check_frames_reports_bad_words():
+    good = bytes([0x12, 0x34, crc8_word(0x12, 0x34)])
+    bad = bytes([0x12, 0x35, crc8_word(0x12, 0x34)])
+    assert check_frames(good + good + b"\x00") == []
+    assert check_frames(good + bad + good) == [1]
+
+# ---------------- ring ----------------
+def _fill(ring, n):
+    for k in range(n):
+        ring.append(float(k), 0.0, 0, k, 0.0)
+
+def test_ring_drops_lapped_slot():
+    r = SampleRing(4)
+    _fill(r, 10)
+    # slot seq - cap may be the one being written: only cap - 1 are trusted
+    assert [s[3] for s in r.snapshot()] == [7, 8, 9]
+    assert [s[3] for s in r.snapshot(since_ts=8.0)] == [8, 9]
+
+def test_ring_read_from_skips_missed():
+    r = SampleRing(4)
+    _fill(r, 3)
+    seq, out = r.read_from(0)
+    assert (seq, [s[3] for s in out]) == (3, [0, 1, 2])
+    _fill(r, 7)                                # writer laps the reader at seq 3
+    seq, out = r.read_from(seq)
+    assert (seq, [s[3] for s in out]) == (10, [4, 5, 6])
+    assert r.read_from(seq) == (10, [])
+
+def test_ring_latest_seq():
+    r = SampleRing(4)
+    assert r.latest_seq() is None
+    _fill(r, 6)
+    seq, s = r.latest_seq()
+    assert seq == 5 and s[3] == 5
+
+# ---------------- shared-memory ring ----------------
+class _LapDuringCopy:
+    """struct stand-in for ShmRingReader: the writer laps the ring while the first slot is copied."""
+    def __init__(self, writer, n: int):
+        self.writer, self.n = writer, n
+
+    def __getattr__(self, name):
+        return getattr(struct, name)
+
+    def unpack_from(self, fmt, buf, offset=0):
+        rec = struct.unpack_from(fmt, buf, offset)
+        if self.n:
+            for _ in range(self.n):
+                k = self.writer.seq
+                self.writer.append(k, float(k), k, 0)
+            self.n = 0
+            rec = rec[:1] + struct.unpack_from(fmt, buf, offset)[1:]   # old stamp, next lap's payload
+        return rec
+
+def test_shm_reader_drops_slots_lapped_during_copy(monkeypatch):
+    w = ShmRingWriter(f"pte-test-{os.getpid()}", capacity=4)
+    r = ShmRingReader(w.name, from_start=True)
+    try:
+        for k in range(2):
+            w.append(k, float(k), k, 0)
+        monkeypatch.setattr(shm_ring, "HAS_NUMPY", False)
+        monkeypatch.setattr(shm_ring, "struct", _LapDuringCopy(w, 4))
+        out, missed = r.read()
+        assert (out, missed) == ([], 2)        # slot 0 kept its old stamp but holds sample 4
+        out, missed = r.read()
+        assert [s[2] for s in out] == [3, 4, 5]
+        assert r.overruns == 3
+    finally:
+        r.close()
+        w.close()
+
+# ---------------- filters ----------------
+def test_parse_chain_stages():
+    chain = parse_chain("median:3, ema_a:0.5")
+    assert [type(s) for s in chain.stages] == [Median, EMA]
+    assert chain.stages[0].n == 3 and chain.stages[1].alpha == 0.5
+    with pytest.raises(ValueError):
+        parse_chain("lowpass:3")
+
+def test_median_rejects_spike():
+    m = Median(3)
+    assert [m.push(x) for x in (1.0, 1.0, 100.0, 1.0)] == [1.0, 1.0, 1.0, 1.0]
+
+def test_ema_time_constant_follows_sample_spacing():
+    e = EMA(tau_s=1.0)
+    assert e.push(0.0, 0.0) == 0.0
+    y = e.push(1.0, 1.0)
+    assert y == pytest.approx(1.0 - 1.0 / 2.718281828459045)
+
+def test_boxcar_decimates_and_batch_matches_push():
+    b = Boxcar(3)
+    assert [b.push(x) for x in range(6)] == [None, None, 1.0, None, None, 4.0]
+    c1, c2 = parse_chain("median:3,ema_a:0.25"), parse_chain("median:3,ema_a:0.25")
+    xs = [0.0, 5.0, 1.0, 9.0, 2.0, 2.0, 3.0]
+    assert list(c1.batch(xs)) == pytest.approx([c2.push(x) for x in xs])
+
+# ---------------- deadline ----------------
+def test_deadline_skips_missed_slots_without_drift():
+    now = [0]
+    d = Deadline(0.010, clock_ns=lambda: now[0])
+    d.start()
+    assert d.tick() == (0, 0)
+    now[0] = 35_000_000                        # 2.5 periods late
+    assert d.tick() == (5_000_000, 2)
+    now[0] = 41_000_000
+    assert d.tick() == (1_000_000, 0)
+    assert d.next_ns == 50_000_000             # still on the t0 + k * period grid
+    assert (d.ticks, d.missed) == (3, 2)
+    now[0] = 45_000_000
+    assert d.remaining() == pytest.approx(0.005)
+
+def test_deadline_rejects_zero_period():
+    with pytest.raises(ValueError):
+        Deadline(0.0)
+
+# ---------------- continuous mode ----------------
+def test_continuous_steady_pressure_is_not_a_stall():
+    now, value = [0.0], [(STAT_DATA_READY, 100)]
+    cr = ContinuousReader(lambda: None, lambda: value[0], stall_s=0.1, clock=lambda: now[0])
+    for _ in range(100):                       # same counts, but every read is a new conversion
+        now[0] += 0.01
+        assert cr.read() == (STAT_DATA_READY, 100)
+    assert (cr.rearms, cr.stalls) == (1, 0)
+    value[0] = (0, 100)                        # data-ready stops: conversions stalled
+    for _ in range(10):
+        now[0] += 0.01
+        cr.read()
+    assert (cr.rearms, cr.stalls) == (2, 1)
+
+def test_continuous_without_ready_bit_uses_value_changes():
+    now, value = [0.0], [0]
+    cr = ContinuousReader(lambda: None, lambda: (0, value[0]), stall_s=0.1, clock=lambda: now[0])
+    for k in range(50):
+        now[0] += 0.01
+        value[0] = k % 3
+        cr.read()
+    assert (cr.sees_ready, cr.stalls) == (False, 0)
+    cr.pause()
+    for _ in range(50):
+        now[0] += 0.01
+        cr.read()
+    assert cr.stalls == 0                      # paused after IDLE/SLEEP: no re-arm
+
+# ---------------- resilient bus ----------------
+def test_crc_errors_are_retried():
+    dev = FakePTE7300(0x6D, source=const(1234), bit_error_rate=0.01, seed=3)
+    rb = ResilientBus(FakeSMBus(devices=[dev]), 0x6D)
+    raws = []
+    for _ in range(300):
+        try:
+            raws.append(rb.call(crc_read_press_stat_block, rb, 0x6D)[1])
+        except CRCError:
+            pass
+    assert dev.stats["bit_errors"] > 0
+    assert rb.counts["retry"] > 0 and rb.counts["retry_recovered"] > 0
+    assert set(raws) <= {0, 1234}              # a corrupted word never gets through
+
+def test_nack_backs_off_then_reopens_bus():
+    dev = FakePTE7300(0x6C, source=const(0))
+    rb = ResilientBus(FakeSMBus(), 0x6C, reset_after=2, backoff_s=10.0,
+                      bus_factory=lambda: FakeSMBus(devices=[dev]))
+    with pytest.raises(OSError) as e:
+        rb.call(read_word, rb, 0x6C, REG_STAT)
+    assert e.value.errno == errno.EREMOTEIO and rb.counts["retry"] == rb.retries
+    with pytest.raises(OSError):
+        rb.call(read_word, rb, 0x6C, REG_STAT)  # second failure: reset fails, bus reopened
+    assert rb.counts["reset_failed"] == 1 and rb.counts["bus_reopen"] == 1
+    with pytest.raises(BusBackoff):
+        rb.call(read_word, rb, 0x6C, REG_STAT)
+    rb._hold_until = 0.0                       # backoff over
+    assert rb.call(read_word, rb, 0x6C, REG_STAT) == 0x0001   # idle, answered on the new bus
+    assert rb.stats()["failures_in_row"] == 0
+
+# ---------------- driver probing ----------------
+class _Unreadable(FakePTE7300):
+    """STAT reads zero and PRESS is out of range in either byte order."""
+    def _status(self) -> int:
+        return 0
+
+@pytest.mark.parametrize("addr, order, crc, expect_order", [
+    (0x6D, "big", True, "big"),
+    (0x6D, "little", True, "little"),
+    (0x6C, "big", False, "little"),            # plain words are always LSB first
+])
+def test_probe_detects_address_and_order(addr, order, crc, expect_order):
+    bus = FakeSMBus(devices=[FakePTE7300(addr, byteorder=order, source=const(-4321))])
+    cfg = probe(bus)
+    assert (cfg.addr, cfg.crc, cfg.byteorder) == (addr, crc, expect_order)
+    assert cfg.burst
+
+def test_probe_inconclusive_order_raises():
+    bus = FakeSMBus(devices=[_Unreadable(0x6D, source=const(0x8080))])
+    with pytest.raises(OSError) as e:
+        probe(bus)
+    assert e.value.errno == errno.EIO
+    assert probe(bus, byteorder="little").byteorder == "little"
+
+def test_probe_nobody_home():
+    with pytest.raises(OSError) as e:
+        probe(FakeSMBus())
+    assert e.value.errno == errno.ENODEV
+
+@pytest.mark.parametrize("addr, order", [(0x6C, "big"), (0x6D, "big"), (0x6D, "little")])
+@pytest.mark.parametrize("continuous", [False, True])
+def test_driver_samples_source_value(addr, order, continuous):
+    bus = FakeSMBus(devices=[FakePTE7300(addr, byteorder=order, source=const(-4321))])
+    drv = PTE7300Driver.open(0, state_path=None, bus_factory=lambda n: bus)
+    try:
+        drv.init(calibrate=False, continuous=continuous)
+        assert drv.addr == addr
+        drv.sample()                           # continuous: arms on the first read
+        time.sleep(0.005)                      # ... and the first conversion has to finish
+        for _ in range(5):
+            assert drv.sample()[1] == -4321
+    finally:
+        drv.close()
+
+def test_forced_byteorder_is_not_cached(tmp_path):
+    state = str(tmp_path / "devices.json")
+    bus = FakeSMBus(devices=[FakePTE7300(0x6D, byteorder="big", source=const(-4321))])
+    drv = PTE7300Driver.open(0, byteorder="little", state_path=state, bus_factory=lambda n: bus)
+    assert drv.byteorder == "little"
+    with open(state) as f:
+        assert json.load(f)["i2c-0"]["byteorder"] == "big"
+    drv = PTE7300Driver.open(0, state_path=state, bus_factory=lambda n: bus)
+    assert drv.byteorder == "big"
+    # not detectable at all: the given order is used, and still not cached
+    bus = FakeSMBus(devices=[_Unreadable(0x6D, source=const(0x8080))])
+    drv = PTE7300Driver.open(1, byteorder="little", state_path=state, bus_factory=lambda n: bus)
+    assert drv.byteorder == "little"
+    with open(state) as f:
+        assert "i2c-1" not in json.load(f)
+
+# ---------------- conversion ----------------
+RAWS = (-16000, -12345, -1, 0, 7, 9999, 16000)
+
+def _linear_bar(raw, fs_min, fs_max, offset_by_fs_min=True):
+    return (fs_min if offset_by_fs_min else 0.0) + (raw + 16000) * (fs_max - fs_min) / 32000.0
+
+@pytest.mark.parametrize("offset_by_fs_min", [True, False])
+def test_lut_matches_linear_formula(offset_by_fs_min):
+    fc = ForceConverter(2.0, 40.0, 400.0, zero_offset_n=-5.0, offset_by_fs_min=offset_by_fs_min)
+    for raw in RAWS:
+        bar = _linear_bar(raw, 2.0, 40.0, offset_by_fs_min)
+        assert fc.convert(raw) == pytest.approx((bar, bar * 400.0 - 5.0))
+    assert list(fc.newtons_array(RAWS)) == pytest.approx([fc.newtons(r) for r in RAWS])
+
+def test_two_point_table_equals_linear():
+    linear = ForceConverter(2.0, 40.0, 400.0)
+    cal = Calibration(Curve([(-16000, 2.0), (16000, 40.0)]), Curve.linear(400.0, 0.0))
+    table = ForceConverter(2.0, 40.0, 400.0, table=cal)
+    for raw in RAWS:
+        assert table.convert(raw) == pytest.approx(linear.convert(raw))
+
+def test_multi_point_table_and_set_table():
+    cal = Calibration(Curve([(-16000, 0.0), (0, 10.0), (16000, 40.0)]))
+    fc = ForceConverter(0.0, 40.0, 400.0)
+    assert fc.bar(-8000) == pytest.approx(10.0)
+    assert fc.set_table(cal) and not fc.set_table(cal)
+    assert fc.bar(-8000) == pytest.approx(5.0)
+    assert fc.bar(8000) == pytest.approx(25.0)
+    assert fc.newtons(8000) == pytest.approx(25.0 * 400.0)   # bar_n missing: linear N_PER_BAR
+    assert fc.set_table(None)
+    assert fc.bar(-8000) == pytest.approx(10.0)
+
+# ---------------- remote keys ----------------
+def test_evdev_drain_stops_when_handler_closes():
+    calls = []
+    def handler(code, count):
+        calls.append((code, count))
+        if code == "KEY_ESC":
+            bridge.stop()                      # what variant2's on_close() does before root.destroy()
+    bridge = EvdevBridge(None, handler, [])
+    bridge._pending.extend(["KEY_LEFT", "KEY_LEFT", "KEY_ESC", "KEY_RIGHT"])
+    bridge._drain()
+    assert calls == [("KEY_LEFT", 2), ("KEY_ESC", 1)]
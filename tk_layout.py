@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Debounced font scaling for the fullscreen windows
+# - reacts only to <Configure> of the root window itself (children's geometry
+#   changes are ignored) and only when its size really changed
+# - several size changes before the next idle are applied once
+# - font sizes are computed once per window size and cached
+# - a font is only reconfigured when its size differs
+#
+# Example:
+#     self.layout = FontScaler(self.root, [(self.font_force, 0.12, 24),
+#                                          (self.font_info, 0.035, 12)])
+#     self.layout.attach()
+
+import sys
+
+class FontScaler:
+    """
+    rules: [(tkfont.Font, factor, min_size), ...]; size = max(min_size, int(short_side * factor))
+    on_apply(sizes): optional hook after fonts changed (sizes in rule order)
+    """
+    def __init__(self, root, rules, on_apply=None):
+        self.root = root
+        self.rules = list(rules)
+        self.on_apply = on_apply
+        self._size = None          # (w, h) last applied
+        self._pending = None       # (w, h) waiting for the idle callback
+        self._job = None
+        self._cache = {}           # short side -> sizes
+        self._fonts = [None] * len(self.rules)   # sizes currently set
+        # instrumentation
+        self.events = 0            # <Configure> events seen
+        self.ignored = 0           # child widgets or unchanged size
+        self.applies = 0           # idle callbacks that ran
+        self.font_configs = 0      # Font.configure() calls made
+        self.cache_hits = 0
+
+    def attach(self, initial_delay_ms: int = 50) -> None:
+        self.root.bind("<Configure>", self._on_configure, add="+")
+        # first layout once the window has its real size
+        self.root.after(initial_delay_ms, self.refresh)
+
+    def _on_configure(self, event) -> None:
+        self.events += 1
+        if event.widget is not self.root:
+            self.ignored += 1
+            return
+        size = (max(event.width, 1), max(event.height, 1))
+        if size == (self._pending or self._size):
+            self.ignored += 1
+            return
+        self._pending = size
+        if self._job is None:
+            self._job = self.root.after_idle(self._apply)
+
+    def refresh(self) -> None:
+        """Re-read the window size and apply now (startup, fullscreen toggle)."""
+        self._pending = (max(self.root.winfo_width(), 1), max(self.root.winfo_height(), 1))
+        self._apply()
+
+    def sizes_for(self, short: int):
+        sizes = self._cache.get(short)
+        if sizes is None:
+            sizes = tuple(max(mn, int(short * k)) for _, k, mn in self.rules)
+            self._cache[short] = sizes
+        else:
+            self.cache_hits += 1
+        return sizes
+
+    def _apply(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+        size, self._pending = self._pending, None
+        if size is None:
+            return
+        self._size = size
+        self.applies += 1
+        sizes = self.sizes_for(min(size))
+        changed = False
+        for i, ((font, _, _), s) in enumerate(zip(self.rules, sizes)):
+            if self._fonts[i] != s:
+                font.configure(size=s)
+                self._fonts[i] = s
+                self.font_configs += 1
+                changed = True
+        if changed and self.on_apply is not None:
+            self.on_apply(sizes)
+
+    def cancel(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def summary(self) -> str:
+        return (f"layout: {self.events} <Configure> events, {self.ignored} ignored, "
+                f"{self.applies} applied, {self.font_configs} font changes, {self.cache_hits} cache hits")
+
+    def print_summary(self, file=None) -> None:
+        print(self.summary(), file=file or sys.stderr)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Dirty-tracking render layer for the Tk displays
+# - Renderer.set(widget, text=..., bg=...)  remembers the last value per widget/option
+#   and only reconfigures what actually changed
+# - all changes made during one tick are applied together in a single after_idle()
+# - Renderer.show(widget, visible)          grid()/grid_remove() only on change
+# - counters: requested / applied / skipped, skipped per second = redraws saved
+#
+# Example:
+#     self.render = Renderer(self.root)
+#     self.render.set(self.lbl_force, text=f"{force:.0f} N")
+#     self.render.set_bg((self.root, self.wrapper, self.lbl_force), "green")
+
+import sys, time
+import tkinter as tk
+from pte_profile import profiler
+
+_MISSING = object()
+
+class Renderer:
+    def __init__(self, root):
+        self.root = root
+        self._state = {}      # (widget, option) -> value on screen
+        self._pending = {}    # (widget, option) -> value to apply at the next flush
+        self._visible = {}    # widget -> bool on screen
+        self._pending_vis = {}
+        self._job = None
+        self.requested = 0    # option values passed to set()
+        self.applied = 0      # option values actually configured
+        self.skipped = 0      # unchanged values dropped (a redraw saved)
+        self.flushes = 0
+        self._t0 = time.monotonic()
+
+    def _current(self, widget, option):
+        key = (widget, option)
+        v = self._pending.get(key, _MISSING)
+        if v is _MISSING:
+            v = self._state.get(key, _MISSING)
+        if v is _MISSING:
+            # first use: take what the widget was created with
+            try:
+                v = self._state[key] = widget.cget(option)
+            except tk.TclError:
+                v = None
+        return v
+
+    def set(self, widget, **options) -> None:
+        for option, value in options.items():
+            self.requested += 1
+            key = (widget, option)
+            if value == self._current(widget, option):
+                self.skipped += 1
+                continue
+            if value == self._state.get(key, _MISSING):
+                self._pending.pop(key, None)   # changed back before it was drawn
+                self.skipped += 1
+            else:
+                self._pending[key] = value
+                self._schedule()
+
+    def set_bg(self, widgets, color: str) -> None:
+        for w in widgets:
+            self.set(w, bg=color)
+
+    def show(self, widget, visible: bool = True) -> None:
+        """grid() / grid_remove() the widget; widgets start as visible unless told otherwise."""
+        self.requested += 1
+        cur = self._pending_vis.get(widget, self._visible.get(widget, True))
+        if cur == visible:
+            self.skipped += 1
+            return
+        if self._visible.get(widget, True) == visible:
+            self._pending_vis.pop(widget, None)
+            self.skipped += 1
+            return
+        self._pending_vis[widget] = visible
+        self._schedule()
+
+    def hidden(self, widget) -> None:
+        """Tell the renderer a widget was grid_remove()d at construction."""
+        self._visible[widget] = False
+
+    def _schedule(self) -> None:
+        if self._job is None:
+            self._job = self.root.after_idle(self.flush)
+
+    def flush(self) -> None:
+        """Apply all pending changes now (one configure() per widget)."""
+        self._job = None
+        prof = profiler()
+        with prof.span("tk_flush"):
+            self._apply()
+        if prof.enabled:
+            # we are already in an idle callback; time the redraw it triggers
+            with prof.span("tk_redraw"):
+                self.root.update_idletasks()
+
+    def _apply(self) -> None:
+        pending, self._pending = self._pending, {}
+        by_widget = {}
+        for (w, option), value in pending.items():
+            by_widget.setdefault(w, {})[option] = value
+        for w, opts in by_widget.items():
+            try:
+                w.configure(**opts)
+            except tk.TclError:
+                continue   # widget gone (window closing)
+            for option, value in opts.items():
+                self._state[(w, option)] = value
+            self.applied += len(opts)
+        vis, self._pending_vis = self._pending_vis, {}
+        for w, visible in vis.items():
+            try:
+                w.grid() if visible else w.grid_remove()
+            except tk.TclError:
+                continue
+            self._visible[w] = visible
+            self.applied += 1
+        self.flushes += 1
+
+    def cancel(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+
+    def rates(self) -> dict:
+        dt = max(1e-9, time.monotonic() - self._t0)
+        return {"requested_per_s": self.requested / dt, "applied_per_s": self.applied / dt,
+                "saved_per_s": self.skipped / dt, "flushes_per_s": self.flushes / dt}
+
+    def summary(self) -> str:
+        r = self.rates()
+        pct = 100.0 * self.skipped / self.requested if self.requested else 0.0
+        return (f"render: {self.requested} updates, {self.applied} applied, {self.skipped} skipped "
+                f"({pct:.0f}%), {r['saved_per_s']:.1f} redraws/s saved, {r['flushes_per_s']:.1f} flushes/s")
+
+    def print_summary(self, file=None) -> None:
+        print(self.summary(), file=file or sys.stderr)
@@ -9,76 +9,79 @@ SUCCESS_HOLD_SEC  = 10                                   # s roheline ekraan pä
 SAMPLE_INTERVAL_MS = 80                                  # kui tihti toome ühe proovilugemi (~12.5 Hz)
 DISPLAY_PERIOD_MS  = 500                                 # kui tihti arvutame keskmise ja värskendame GUI-d
 OFF_CANCEL_GRACE_MS = 800                                # kui kaua peab OFF püsima, et tühistada loendur
+SAMPLE_RING_SIZE   = 1024                                # proovide ringpuhvri suurus (eraldatakse kohe)
 
-# EVDEV pult (vasak/parem/enter/esc) – valikuline
-DEVICE_PATH = "/dev/input/event6"  # muuda vastavalt
+# EVDEV pult (vasak/parem/enter/esc) – valikuline, mitu seadet lubatud (--input)
+DEVICE_PATHS = ["/dev/input/event6"]  # muuda vastavalt
 
-import argparse, struct, time, sys, threading, queue
-from smbus2 import SMBus
+import argparse, time, sys
 import tkinter as tk
 from tkinter import font as tkfont
-
-# --- evdev on valikuline (võib puududa Windowsis vms) ---
-try:
-    from evdev import InputDevice, categorize, ecodes
-    HAS_EVDEV = True
-except Exception:
-    HAS_EVDEV = False
-
-REG_CMD   = 0x22
-REG_PRESS = 0x30
-REG_STAT  = 0x32
-
-# -------------------- EDIT HERE: conversion logic --------------------
-def counts_to_bar(counts: int, fs_min_bar: float, fs_max_bar: float) -> float:
-    return (counts + 16000) * ((fs_max_bar - fs_min_bar) / 32000.0)
-
+from pte7300_driver import PTE7300Driver
+from acquisition import SampleRing, AcquisitionThread
+from window_stats import MultiWindow
+from sample_recorder import SampleRecorder, device_id
+from holdtest import HoldTest, TkClock
+from force_lut import ForceConverter
+from calibration import load_calibration, sensor_key
+from force_filters import parse_chain
+from tk_render import Renderer
+from tk_layout import FontScaler
+from pte_daemon import DaemonFeed, DaemonClient
+from shm_ring import ShmRingWriter
+from pte_profile import profiler, bind_key
+from deadline import TkPeriodic
+from evdev_bridge import EvdevBridge   # evdev on valikuline (võib puududa Windowsis vms)
+
+# -------------------- EDIT HERE: conversion constants --------------------
+# Teisendus käib ForceConverter'i tabelist (force_lut.py), mis ehitatakse nendest konstantidest:
+#   bar = (counts + 16000) * (fs_max - fs_min) / 32000      (--fs, ilma fs_min nihketa)
+#   N   = bar * N_PER_BAR + ZERO_FORCE_OFFSET_N
+# Mittelineaarne silinder: mitmepunktiline kalibreering failist (--calibration, calibration.py).
 N_PER_BAR = 386  # ≈ 454.545 N/bar
 ZERO_FORCE_OFFSET_N = 0.0
-
-def bar_to_newtons(pressure_bar: float) -> float:
-    return pressure_bar * N_PER_BAR + ZERO_FORCE_OFFSET_N
-# --------------------------------------------------------------------
-
-def read_s16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)
-    val_be = struct.unpack('<H', struct.pack('<H', raw))[0]
-    return struct.unpack('<h', struct.pack('<H', val_be))[0]
-
-def read_u16_be(bus: SMBus, addr: int, reg: int) -> int:
-    raw = bus.read_word_data(addr, reg)
-    return struct.unpack('<H', struct.pack('<H', raw))[0]
-
-def write_u16_be(bus: SMBus, addr: int, reg: int, value: int) -> None:
-    msb, lsb = (value >> 8) & 0xFF, value & 0xFF
-    bus.write_i2c_block_data(addr, reg, [msb, lsb])
-
-# --- EVDEV lugemine eraldi lõimes ---
-def evdev_reader(devpath, q: queue.Queue):
-    if not HAS_EVDEV:
-        return
-    try:
-        dev = InputDevice(devpath)
-    except Exception:
-        return
-    for event in dev.read_loop():
-        if event.type == ecodes.EV_KEY:
-            key_event = categorize(event)
-            if key_event.keystate == key_event.key_down:
-                code = key_event.keycode
-                if code in ("KEY_LEFT","KEY_RIGHT","KEY_ENTER","KEY_ESC"):
-                    q.put(code)
+# --------------------------------------------------------------------------
 
 class PTE7300Gui:
     def __init__(self, busnum: int, addr: int, fs_min: float, fs_max: float,
-                 schmitt_on: float, schmitt_off: float):
-        self.bus = SMBus(busnum)
+                 schmitt_on: float, schmitt_off: float, burst: bool = False,
+                 continuous: bool = False, record_path: str = None, filter_spec: str = None,
+                 render_stats: bool = False, daemon_path: str = None, shm_name: str = None,
+                 input_paths=None, calibration_path: str = None):
+        # daemoni kliendina siini ei avata – proovid tulevad pte_daemon'ist
+        self.daemon_path = daemon_path
+        # addr=None: proovib 0x6D/0x6C (tulemus puhverdatakse); CRC/NACK korduskatsed ja anduri taastamine draiveris
+        self.dev = None
+        if daemon_path is None:
+            # --burst: PRESS+STAT ühe plokilugemisega (muidu nagu tuvastatud)
+            self.dev = PTE7300Driver.open(busnum, addr, burst=burst or None)
+            addr = self.dev.addr
+        elif calibration_path:
+            # kalibreering on anduripõhine: siin ja aadress küsitakse deemonilt (peab töötama)
+            with DaemonClient(daemon_path) as c:
+                info = c.info()
+            busnum, addr = info["bus"], info["addr"]
         self.addr = addr
         self.fs_min = fs_min
         self.fs_max = fs_max
-
-        # Seadme algseadistus
-        self._reset(); time.sleep(0.005); self._start()
+        # counts -> bar -> N tabelist (65536 kirjet), ehitatakse uuesti ainult kalibreeringu muutumisel
+        # mitmepunktiline kalibreering (--calibration) kompileeritakse samasse tabelisse; puuduv kõver jääb lineaarseks
+        table = None
+        if calibration_path:
+            table = load_calibration(calibration_path, sensor_key(busnum, addr))
+        self.force_lut = ForceConverter(fs_min, fs_max, N_PER_BAR, ZERO_FORCE_OFFSET_N, offset_by_fs_min=False,
+                                        table=table)
+        # toorproovide salvestus (mmap fail), kirjutab ainult mõõtelõim
+        self.recorder = None
+        self.device_id = device_id(busnum, addr or 0)   # daemoni kliendina võib aadress olla teadmata
+        if record_path:
+            self.recorder = SampleRecorder(record_path, fs_min, fs_max, N_PER_BAR, ZERO_FORCE_OFFSET_N,
+                                           offset_by_fs_min=False, table=table)
+
+        if self.dev is not None:
+            # Seadme algseadistus: reset, START, konversiooniaja õppimine (STAT data-ready, mitte fikseeritud 3 ms);
+            # pidev konversioon: START ainult korra, proov on ainult lugemine (taas-START resetil/seiskumisel)
+            self.dev.init(continuous=continuous)
 
         # Siht/Schmitt
         self.presets = TARGET_PRESETS[:]
@@ -90,17 +93,15 @@ class PTE7300Gui:
             # tagame korrektsuse
             self.schmitt_on = max(self.schmitt_off + 1.0, self.schmitt_off * 1.05 or 1.0)
 
-        # Mõõtmise puhver viimase ~0.5 s keskmiseks
-        self.samples = []  # list of (timestamp, force_n)
-        self.sample_lock = threading.Lock()
-
-        # Loogika olekud
-        self.trigger_state = False       # Schmitt ON/OFF
-        self.timer_remaining = 0         # s
-        self.timer_job = None            # after-handle
-        self.off_since = None            # OFF oleku algus (grace jaoks)
-        self.success_hold_job = None     # rohelise ekraani “hoidmine”
-        self.success_until = 0.0         # epoch sekundites
+        # Mõõtmise ringpuhver; kirjutab ainult mõõtelõim, kuvamine loeb lukuta
+        self.ring = SampleRing(SAMPLE_RING_SIZE)
+        self._ring_seq = 0
+        self._last_sample = None
+        # Libisev aken (summa/arv/min/max jooksvalt) kuvamise keskmiseks; OFF grace on HoldTest'is (off_since)
+        self.stats = MultiWindow(display=DISPLAY_PERIOD_MS / 1000.0)
+        # valikuline voogfilter (nt "median:5,ema:0.25"): siis Schmitt ja kuva kasutavad filtri väljundit,
+        # mitte 0.5 s akna keskmist
+        self.filter = parse_chain(filter_spec) if filter_spec else None
 
         # GUI
         self.root = tk.Tk()
@@ -145,50 +146,71 @@ class PTE7300Gui:
         self.lbl_bar.grid(   row=2, column=0, sticky="w")
         self.lbl_thr.grid(   row=3, column=0, sticky="w")
 
+        # tekstide/värvide muutused renderdaja kaudu: ainult muutunud väärtused, üks after_idle tiku kohta
+        self.render = Renderer(self.root)
+        self.render.hidden(self.lbl_timer)
+        self.render_stats = render_stats
+
+        # etappide ajad (PTE7300_PROFILE=1), F9 prindib kokkuvõtte
+        self.prof = profiler()
+        bind_key(self.root)
+
+        # Hoiutesti loogika (Schmitt, OFF grace, loendur, roheline hoidmine) – Tk kell
+        self.hold = HoldTest(TkClock(self.root), self.schmitt_on, self.schmitt_off,
+                             timer_s=TIMER_SECONDS, success_hold_s=SUCCESS_HOLD_SEC,
+                             off_grace_s=OFF_CANCEL_GRACE_MS / 1000.0,
+                             on_event=self._on_hold_event)
+
         # Sündmused
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.bind("<F11>", self._toggle_fullscreen)
         self.root.bind("<Escape>", self._exit_fullscreen)
-        self.root.bind("<Configure>", self._on_resize)
         # Klaviatuuri vasak/parem presetite jaoks
         self.root.bind("<Left>",  lambda e: self._cycle_preset(-1))
         self.root.bind("<Right>", lambda e: self._cycle_preset(+1))
 
-        # EVDEV pult
-        self.q = queue.Queue()
-        if HAS_EVDEV:
-            t = threading.Thread(target=evdev_reader, args=(DEVICE_PATH, self.q), daemon=True)
-            t.start()
-            self.root.after(50, self._poll_evdev)
-
-        # Mõõtmise taustasilmus (kiiremad proovivõtud)
-        self._sample_loop()
-        # Kuvamise värskendus iga 0.5s
-        self.root.after(DISPLAY_PERIOD_MS, self._display_update)
-        # Esmane skaleerimine
-        self.root.after(50, self._on_resize)
+        # EVDEV pult: sisendlõim äratab Tk tsükli toru kaudu (createfilehandler), pollimist pole
+        # repeats=False: kinni hoitud nupp liigutab presetti ühe sammu, nagu varem (ainult key_down)
+        self.remote = EvdevBridge(self.root, self._on_remote_key, input_paths or DEVICE_PATHS,
+                                  keys=("KEY_LEFT", "KEY_RIGHT", "KEY_ENTER", "KEY_ESC"), repeats=False)
+        self.remote.start()
+
+        # Mõõtmine eraldi lõimes – Tk joonistamine ei sega proovivõttu
+        # valikuline ühismälu ringpuhver teistele protsessidele (logija, analüüs) – kirjutab mõõtelõim
+        self.shm = None
+        if shm_name and self.dev is not None:
+            self.shm = ShmRingWriter(shm_name, SAMPLE_RING_SIZE, fs_min, fs_max, N_PER_BAR, ZERO_FORCE_OFFSET_N)
+        if self.dev is not None:
+            self.acq = AcquisitionThread(self._sample_once, self.ring, SAMPLE_INTERVAL_MS / 1000.0,
+                                         on_sample=self.shm.publish_from(self.ring) if self.shm else None)
+        else:
+            self.acq = DaemonFeed(self.daemon_path, self.ring, self._to_sample)
+        self.acq.start()
+        # Kuvamise värskendus iga 0.5s – absoluutsete tähtaegade võrgul (monotonic), ei triivi
+        self.display = TkPeriodic(self.root, DISPLAY_PERIOD_MS / 1000.0, self._display_update)
+        self.display.start(DISPLAY_PERIOD_MS / 1000.0)
+        # Fondide skaleerimine: ainult juurakna tegeliku suuruse muutusel, kord idle kohta
+        self.layout = FontScaler(self.root, [(self.font_force, 0.12, 24),
+                                             (self.font_timer, 0.08, 18),
+                                             (self.font_info, 0.035, 12)])
+        self.layout.attach()
 
     # ------------- Seadme käsud -------------
     def _reset(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0xB169)
+        self.dev.reset()
     def _start(self):
-        write_u16_be(self.bus, self.addr, REG_CMD, 0x8B93)
+        self.dev.start()
 
     # ------------- EVDEV sündmused -------------
-    def _poll_evdev(self):
-        try:
-            while True:
-                code = self.q.get_nowait()
-                if code == "KEY_LEFT":
-                    self._cycle_preset(-1)
-                elif code == "KEY_RIGHT":
-                    self._cycle_preset(+1)
-                elif code == "KEY_ESC":
-                    self.on_close()
-                # KEY_ENTER – hetkel ei kasuta
-        except queue.Empty:
-            pass
-        self.root.after(50, self._poll_evdev)
+    def _on_remote_key(self, code, count):
+        # count > 1: korduvvajutuste (autorepeat) sari ühe kutsena
+        if code == "KEY_LEFT":
+            self._cycle_preset(-count)
+        elif code == "KEY_RIGHT":
+            self._cycle_preset(+count)
+        elif code == "KEY_ESC":
+            self.on_close()
+        # KEY_ENTER – hetkel ei kasuta
 
     # ------------- Presetid / läved -------------
     def _thr_text(self):
@@ -203,162 +225,107 @@ class PTE7300Gui:
         span = max(1.0, self.target_force * 0.1)  # 10% hüsterees vaikimisi
         self.schmitt_on  = self.target_force
         self.schmitt_off = max(0.0, self.target_force - span)
-        self.lbl_thr.config(text=self._thr_text())
+        self.hold.set_thresholds(self.schmitt_on, self.schmitt_off)
+        self.render.set(self.lbl_thr, text=self._thr_text())
 
     # ------------- Taustamõõtmine -------------
-    def _sample_loop(self):
-        """Võtab ühe mõõdu (kui õnnestub) ja lisab libiseva keskmise puhvritesse."""
-        try:
-            self._start()
-            time.sleep(0.003)  # väike ooteaeg
-            status = read_u16_be(self.bus, self.addr, REG_STAT)
-            raw    = read_s16_be(self.bus, self.addr, REG_PRESS)
-            p_bar  = counts_to_bar(raw, self.fs_min, self.fs_max)
-            force  = bar_to_newtons(p_bar)
-            ts = time.time()
-
-            # ei lase negatiivset — kärbime nullist ülespoole
-            force = max(0.0, force)
-
-            with self.sample_lock:
-                self.samples.append((ts, force, status, raw, p_bar))
-                # hoia umbes viimase 1.0 s andmeid (rohkem kui 0.5 s, et keskmist oleks alati võtta)
-                cutoff = ts - 1.0
-                while self.samples and self.samples[0][0] < cutoff:
-                    self.samples.pop(0)
-
-        except Exception as e:
-            # Üksik viga: ära tee midagi; taimerit ei katkesta
-            pass
-        finally:
-            self.root.after(SAMPLE_INTERVAL_MS, self._sample_loop)
+    def _sample_once(self):
+        """Võtab ühe mõõdu (töötab mõõtelõimes). Viga tõstetakse – lõim loendab ja jätab proovi vahele."""
+        status, raw = self.dev.sample()   # START (või pidev), data-ready, lugemine
+        return self._to_sample(status, raw)
+
+    def _to_sample(self, status: int, raw: int):
+        with self.prof.span("convert"):
+            return self._convert(status, raw)
+
+    def _convert(self, status: int, raw: int):
+        if self.recorder is not None:
+            self.recorder.append(time.monotonic_ns(), raw, status, self.device_id)
+        p_bar, force = self.force_lut.convert(raw)
+        ts = time.monotonic()  # NTP korrektsioonid ei nihuta aknaid
+
+        # ei lase negatiivset — kärbime nullist ülespoole
+        force = max(0.0, force)
+        return ts, force, status, raw, p_bar
 
     # ------------- Kuvamise värskendus (0.5 s) -------------
     def _display_update(self):
-        now = time.time()
+        now = time.monotonic()
         avg_force = None
         status = "--"; raw = 0; p_bar = 0.0
-
-        with self.sample_lock:
-            # võta viimase 0.5 s sees olevad proovid
-            window_start = now - (DISPLAY_PERIOD_MS / 1000.0)
-            window = [s for s in self.samples if s[0] >= window_start]
-            if window:
-                forces = [s[1] for s in window]
-                avg_force = sum(forces) / len(forces)
-                # viimase proovi metainfo kuvamiseks
-                _, _, status_last, raw_last, pbar_last = window[-1]
-                status = f"0x{int(status_last):04X}"
-                raw    = int(raw_last)
-                p_bar  = float(pbar_last)
+        prof = self.prof
+
+        # uued proovid ringpuhvrist libisevatesse akendesse (O(1) proovi kohta)
+        with prof.span("ring_drain"):
+            self._ring_seq, fresh = self.ring.read_from(self._ring_seq)
+            for s in fresh:
+                self.stats.add(s[0], s[1])
+                if self.filter is not None:
+                    self.filter.push(s[1], s[0])
+            if fresh:
+                self._last_sample = fresh[-1]
+            self.stats.evict(now)
+
+        # viimase 0.5 s keskmine
+        avg_force = self.stats.display.mean
+        if avg_force is not None and self.filter is not None and self.filter.value is not None:
+            avg_force = max(0.0, self.filter.value)
+        if avg_force is not None:
+            # viimase proovi metainfo kuvamiseks
+            _, _, status_last, raw_last, pbar_last = self._last_sample
+            status = f"0x{int(status_last):04X}"
+            raw    = int(raw_last)
+            p_bar  = float(pbar_last)
 
         # kui aknas 0.5 s polnud ühtki edukat proovi, hoia eelmisi näite; ära katkesta loogikat
         if avg_force is None:
-            # jäta tekstid muutmata, ajasta uuesti
-            self.root.after(DISPLAY_PERIOD_MS, self._display_update)
+            # jäta tekstid muutmata (järgmise tiku ajastab TkPeriodic)
             return
 
         # ümarda sajaste kaupa
         shown = round(avg_force / 100.0) * 100.0
-        self.lbl_force.config(text=f"{shown:.0f} N")
-        self.lbl_status.config(text=f"STATUS: {status}")
-        self.lbl_raw.config(text=f"RAW: {raw:+d}")
-        self.lbl_bar.config(text=f"PRESSURE: {p_bar:.3f} bar")
-        self.lbl_thr.config(text=self._thr_text())
-
-        # Schmitti trigger
-        prev_state = self.trigger_state
-        if self.trigger_state:
-            # olek ON; lülitu OFF ainult siis, kui keskmine on allpool OFF-läve
-            if avg_force <= self.schmitt_off:
-                # alusta OFF grace mõõtmist
-                if self.off_since is None:
-                    self.off_since = now
-                # kui OFF püsib üle grace'i ja meil pole edukas roheline “hoidmine” käimas
-                if (now - self.off_since) * 1000.0 >= OFF_CANCEL_GRACE_MS and not self._is_success_hold_active(now):
-                    self.trigger_state = False
-                    self.off_since = None
-            else:
-                self.off_since = None
-        else:
-            # olek OFF; lülitu ON, kui keskmine ületab ON-läve
-            if avg_force >= self.schmitt_on:
-                self.trigger_state = True
-                self.off_since = None
-
-        # Taimeri loogika
-        if not prev_state and self.trigger_state:
-            # läks ON -> käivita loendur ainult siis, kui parasjagu ei hoia rohelist-järgselt
-            if not self._is_success_hold_active(now) and self.timer_job is None and self.timer_remaining == 0:
-                self._start_timer(TIMER_SECONDS)
-        elif prev_state and not self.trigger_state:
-            # läks OFF -> kui loendur käib, tühista ainult siis, kui OFF püsis üle grace'i (käsitleti ülal)
-            if self.timer_job is not None and self.off_since is not None:
-                self._cancel_timer()
+        r = self.render
+        with prof.span("tk_labels"):
+            r.set(self.lbl_force, text=f"{shown:.0f} N")
+            r.set(self.lbl_status, text=f"STATUS: {status}")
+            r.set(self.lbl_raw, text=f"RAW: {raw:+d}")
+            r.set(self.lbl_bar, text=f"PRESSURE: {p_bar:.3f} bar")
+            r.set(self.lbl_thr, text=self._thr_text())
+
+        # Schmitti trigger + taimer (loogika holdtest.HoldTest'is, sündmused -> _on_hold_event)
+        with prof.span("hold_logic"):
+            self.hold.update(avg_force)
 
         # kui edukas roheline “hoidmine” on aktiivne ja aeg läbi, taasta taust
-        if self._is_success_hold_active(now):
+        if self.hold.is_success_hold_active(now):
             # mitte midagi; roheline jääb kuni success_until
             pass
         else:
             # kui mitte roheline, hoia normaalne taust
-            if self.timer_job is None and self.timer_remaining == 0:
+            if not self.hold.timer_running:
                 self._reset_bg()
 
-        self.root.after(DISPLAY_PERIOD_MS, self._display_update)
-
     # ------------- Taimer / edu -------------
-    def _start_timer(self, seconds: int):
-        self.timer_remaining = int(seconds)
-        self.lbl_timer.config(text=f"{self.timer_remaining} s")
-        self.lbl_timer.grid()
-        self._reset_bg()
-        self._tick_timer()
-
-    def _tick_timer(self):
-        self.lbl_timer.config(text=f"{self.timer_remaining} s")
-        if self.timer_remaining <= 0:
-            self.timer_job = None
-            self._on_success()
-            return
-        self.timer_remaining -= 1
-        self.timer_job = self.root.after(1000, self._tick_timer)
-
-    def _cancel_timer(self):
-        if self.timer_job is not None:
-            self.root.after_cancel(self.timer_job)
-            self.timer_job = None
-        self.timer_remaining = 0
-        self.lbl_timer.grid_remove()
-
-    def _on_success(self):
-        # roheline ekraan + hoidmine SUCCESS_HOLD_SEC
-        self._set_bg("green")
-        self.lbl_timer.grid_remove()
-        self.success_until = time.time() + SUCCESS_HOLD_SEC
-        # planeeri kontroll, millal roheline aeg läbi (lihtne heartbeat)
-        if self.success_hold_job is not None:
-            self.root.after_cancel(self.success_hold_job)
-        self.success_hold_job = self.root.after(200, self._success_hold_tick)
-
-    def _success_hold_tick(self):
-        now = time.time()
-        if now >= self.success_until:
+    def _on_hold_event(self, kind, t, value):
+        if kind == "timer_start":
+            self.render.show(self.lbl_timer)
+            self._reset_bg()
+        elif kind == "timer_tick":
+            self.render.set(self.lbl_timer, text=f"{value} s")
+        elif kind == "timer_cancel":
+            self.render.show(self.lbl_timer, False)
+        elif kind == "success":
+            # roheline ekraan + hoidmine SUCCESS_HOLD_SEC
+            self._set_bg("green")
+            self.render.show(self.lbl_timer, False)
+        elif kind == "success_end":
             self._reset_bg()
-            self.success_hold_job = None
-            return
-        self.success_hold_job = self.root.after(200, self._success_hold_tick)
-
-    def _is_success_hold_active(self, now_ts=None) -> bool:
-        if now_ts is None:
-            now_ts = time.time()
-        return now_ts < self.success_until
 
     # ------------- UI abid -------------
     def _set_bg(self, color: str):
-        for w in (self.root, self.wrapper, self.lbl_force, self.lbl_timer,
-                  self.lbl_status, self.lbl_raw, self.lbl_bar, self.lbl_thr):
-            w.configure(bg=color)
+        # muutumatu värv ei puuduta vidinaid (renderdaja vahemälu)
+        self.render.set_bg((self.root, self.wrapper, self.lbl_force, self.lbl_timer,
+                            self.lbl_status, self.lbl_raw, self.lbl_bar, self.lbl_thr), color)
 
     def _reset_bg(self):
         self._set_bg(self.default_bg)
@@ -371,25 +338,29 @@ class PTE7300Gui:
         self.fullscreen = False
         self.root.attributes("-fullscreen", False)
 
-    def _on_resize(self, event=None):
-        w = max(self.root.winfo_width(), 1)
-        h = max(self.root.winfo_height(), 1)
-        short = min(w, h)
-        size_force = max(24, int(short * 0.12))
-        size_timer = max(18, int(short * 0.08))
-        size_info  = max(12, int(short * 0.035))
-        self.font_force.configure(size=size_force)
-        self.font_timer.configure(size=size_timer)
-        self.font_info.configure(size=size_info)
-
     # ------------- Elutsükkel -------------
     def on_close(self):
+        self.render.cancel()
+        self.layout.cancel()
+        self.display.stop()
+        self.remote.stop()
+        if self.render_stats:
+            self.render.print_summary()
+            self.layout.print_summary()
+            print(self.remote.summary(), file=sys.stderr)
+            print(self.display.summary("display"), file=sys.stderr)
+            if isinstance(self.acq, AcquisitionThread):
+                print(self.acq.deadline.summary("sampling"), file=sys.stderr)
+                print(self.dev.bus.summary(), file=sys.stderr)
         try:
-            if self.timer_job is not None:
-                self.root.after_cancel(self.timer_job)
-            if self.success_hold_job is not None:
-                self.root.after_cancel(self.success_hold_job)
-            self.bus.close()
+            self.acq.stop()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.hold.close()
+            if self.shm is not None:
+                self.shm.close()
+            if self.dev is not None:
+                self.dev.close()
         except Exception:
             pass
         self.root.destroy()
@@ -401,12 +372,32 @@ class PTE7300Gui:
 def parse_args():
     ap = argparse.ArgumentParser(description="PTE7300 GUI → Newtons (avg+Schmitt+hysteresis)")
     ap.add_argument("--bus", type=int, default=0, help="I2C bus number (e.g. 0 or 1). Default 0.")
-    ap.add_argument("--addr", type=lambda x: int(x,0), default=0x6c,
-                    help="7-bit I2C address (default 0x6c for no-CRC; CRC addr is 0x6d).")
+    ap.add_argument("--addr", type=lambda x: int(x,0), default=None,
+                    help="7-bit I2C address (default: probe 0x6d (CRC), then 0x6c (no CRC); result is cached).")
     ap.add_argument("--fs", type=str, default="0:40",
                     help="Full-scale range in bar as min:max (e.g. 0:200). Default 0:40.")
     ap.add_argument("--schmitt", type=str, default=None,
                     help="Schmitt thresholds as ON:OFF in N (e.g. 160:140). If omitted, uses target & ~10% hysteresis.")
+    ap.add_argument("--burst", action="store_true",
+                    help="Read PRESS+STAT in one block transfer (CRC-checked on 0x6d).")
+    ap.add_argument("--continuous", action="store_true",
+                    help="Start the sensor once and only read registers (no START per sample).")
+    ap.add_argument("--calibration", type=str, default=None, metavar="PATH",
+                    help="Multi-point counts->bar / bar->N calibration (JSON, see calibration.py); "
+                         "entry for this sensor (i2c-BUS@0xADDR) or \"default\".")
+    ap.add_argument("--record", type=str, default=None,
+                    help="Append every raw sample to this binary recording (see sample_recorder.py).")
+    ap.add_argument("--filter", type=str, default=None,
+                    help='Streaming filter for display/Schmitt instead of the 0.5 s mean, e.g. "median:5,ema:0.25" '
+                         '(stages: ema:<tau_s>, ema_a:<alpha>, median:<n>, boxcar:<n>).')
+    ap.add_argument("--daemon", type=str, default=None, metavar="SOCKET",
+                    help="Take samples from a running pte_daemon.py instead of opening the I2C bus.")
+    ap.add_argument("--shm", type=str, default=None, metavar="NAME",
+                    help="Publish samples to a shared-memory ring for other processes (see shm_ring.py).")
+    ap.add_argument("--input", type=str, action="append", default=None, metavar="DEV",
+                    help=f"evdev remote/keypad device, repeatable (default {' '.join(DEVICE_PATHS)}).")
+    ap.add_argument("--render-stats", action="store_true",
+                    help="Print redraw and font-scaling counters when the window closes.")
     args = ap.parse_args()
 
     try:
@@ -429,7 +420,15 @@ def parse_args():
     return args.addr, fs_min, fs_max, sch_on, sch_off, args
 
 if __name__ == "__main__":
-    addr, fs_min, fs_max, sch_on, sch_off, _ = parse_args()
-    app = PTE7300Gui(busnum=0, addr=addr, fs_min=fs_min, fs_max=fs_max,
-                     schmitt_on=sch_on, schmitt_off=sch_off)
+    addr, fs_min, fs_max, sch_on, sch_off, args = parse_args()
+    try:
+        app = PTE7300Gui(busnum=0, addr=addr, fs_min=fs_min, fs_max=fs_max,
+                         schmitt_on=sch_on, schmitt_off=sch_off, burst=args.burst,
+                         continuous=args.continuous, record_path=args.record, filter_spec=args.filter,
+                         render_stats=args.render_stats, daemon_path=args.daemon,
+                         shm_name=args.shm, input_paths=args.input, calibration_path=args.calibration)
+    except (OSError, KeyError, ValueError) as e:
+        # siin puudub, vale --calibration / --record fail, deemon ei vasta
+        print(f"variant2: {e}", file=sys.stderr)
+        sys.exit(1)
     app.run()
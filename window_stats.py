@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Time-windowed running statistics, O(1) amortized per sample
+# - WindowStats  sum / count / mean / min / max over the last `span` seconds
+# - MultiWindow  several named WindowStats fed from the same sample stream
+#
+# Samples must arrive with non-decreasing timestamps. min/max use monotonic
+# deques, so every sample is pushed and popped at most once per window.
+
+from collections import deque
+
+class WindowStats:
+    def __init__(self, span: float):
+        self.span = float(span)
+        self._q = deque()       # (ts, value) inside the window
+        self._min_q = deque()   # increasing values -> front is the minimum
+        self._max_q = deque()   # decreasing values -> front is the maximum
+        self._sum = 0.0
+        self._last_ts = None
+
+    def add(self, ts: float, value: float) -> None:
+        self._q.append((ts, value))
+        self._sum += value
+        mq = self._min_q
+        while mq and mq[-1][1] > value:
+            mq.pop()
+        mq.append((ts, value))
+        xq = self._max_q
+        while xq and xq[-1][1] < value:
+            xq.pop()
+        xq.append((ts, value))
+        self._last_ts = ts
+        self.evict(ts)
+
+    def evict(self, now: float) -> None:
+        """Drop samples older than now - span."""
+        cutoff = now - self.span
+        q = self._q
+        while q and q[0][0] < cutoff:
+            _, v = q.popleft()
+            self._sum -= v
+        while self._min_q and self._min_q[0][0] < cutoff:
+            self._min_q.popleft()
+        while self._max_q and self._max_q[0][0] < cutoff:
+            self._max_q.popleft()
+        if not q:
+            self._sum = 0.0  # no float drift carried over an empty window
+
+    def clear(self) -> None:
+        self._q.clear(); self._min_q.clear(); self._max_q.clear()
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self._q)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self):
+        return self._sum / len(self._q) if self._q else None
+
+    @property
+    def min(self):
+        return self._min_q[0][1] if self._min_q else None
+
+    @property
+    def max(self):
+        return self._max_q[0][1] if self._max_q else None
+
+    def __len__(self):
+        return len(self._q)
+
+class MultiWindow:
+    """
+    Named windows over one stream, e.g.
+        MultiWindow(display=0.5, retention=1.0, grace=0.8)
+    """
+    def __init__(self, **spans):
+        self.windows = {name: WindowStats(span) for name, span in spans.items()}
+
+    def add(self, ts: float, value: float) -> None:
+        for w in self.windows.values():
+            w.add(ts, value)
+
+    def evict(self, now: float) -> None:
+        for w in self.windows.values():
+            w.evict(now)
+
+    def __getitem__(self, name: str) -> WindowStats:
+        return self.windows[name]
+
+    def __getattr__(self, name: str) -> WindowStats:
+        try:
+            return self.__dict__["windows"][name]
+        except KeyError:
+            raise AttributeError(name) from None